@@ -4,30 +4,37 @@ and support for transaction folders
 """
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, Depends, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterable, List, Optional, Any, Union, Tuple
 import os
-import json
 import logging
 import time
 import asyncio
 import traceback
 import uuid
-import glob
+import hashlib
+import codecs
+import re
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import httpx
+import msgspec
+import orjson
 import fastapi.responses
 from dotenv import load_dotenv
 from utils.neo4j_utils import Neo4jManager
-from utils.knowledge_base_utils import get_knowledge_base_structure
+from utils.knowledge_base_utils import get_knowledge_base_structure, invalidate_knowledge_base_structure
+from utils.transaction_index import TransactionIndex, encode_cursor, decode_cursor
+from utils.transaction_store import create_transaction_store
 load_dotenv()
 
 # Import transaction folder utilities
 from utils.transaction_folder import (
     get_transaction_folder, save_transaction_data, 
-    load_transaction_data, list_transaction_results
+    load_transaction_data, list_transaction_results, read_json_file
 )
 
 # Configure logging
@@ -41,6 +48,15 @@ logger = logging.getLogger(__name__)
 RESULTS_FOLDER = os.environ.get('RESULTS_FOLDER', '/opt/airflow/data/results')
 os.makedirs(RESULTS_FOLDER, exist_ok=True)
 
+# Legacy result files in the results folder: result_{run_id}.json or result_aml_run_{id}.json
+LEGACY_RESULT_FILE_RE = re.compile(r'^result_(?P<aml_run>aml_run_)?(?P<id>[^.]+)')
+
+# Transaction summary index - used to list transactions without rescanning the results folder
+TRANSACTION_INDEX_PATH = os.environ.get(
+    'TRANSACTION_INDEX_PATH', os.path.join(RESULTS_FOLDER, '.transaction_index.sqlite3')
+)
+transaction_index = TransactionIndex(TRANSACTION_INDEX_PATH)
+
 # Airflow connection settings
 AIRFLOW_HOST = os.environ.get('AIRFLOW_HOST', 'airflow-webserver')
 AIRFLOW_PORT = os.environ.get('AIRFLOW_PORT', '8080')
@@ -48,6 +64,10 @@ AIRFLOW_USER = os.environ.get('AIRFLOW_USER', 'airflow')
 AIRFLOW_PASSWORD = os.environ.get('AIRFLOW_PASSWORD', 'airflow')
 AIRFLOW_BASE_URL = f"http://{AIRFLOW_HOST}:{AIRFLOW_PORT}/airflow/api/v1"
 
+# Optional Redis connection for sharing transaction state across API workers
+REDIS_URL = os.environ.get('REDIS_URL')
+TRANSACTION_STORE_TTL = int(os.environ.get('TRANSACTION_STORE_TTL', 7 * 24 * 3600))
+
 # Callback URL for Airflow to notify when processing is complete
 API_HOST = os.environ.get('API_HOST', 'fastapi')
 API_PORT = os.environ.get('API_PORT', '8000')
@@ -57,7 +77,8 @@ API_CALLBACK_URL = f"http://{API_HOST}:{API_PORT}/api/callback"
 app = FastAPI(
     title="AML Risk Assessment API", 
     description="Anti-Money Laundering Risk Assessment API for financial transactions",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware to allow cross-origin requests
@@ -67,10 +88,97 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# In-memory storage for transaction status and metadata
-transaction_store = {}
+# Storage for transaction status and metadata (Redis-backed when REDIS_URL is set)
+transaction_store = create_transaction_store(REDIS_URL, TRANSACTION_STORE_TTL)
+
+# Completion events for requests waiting on a transaction, set by the Airflow callback
+pending_events: Dict[str, asyncio.Event] = {}
+
+# How often a waiting request re-checks the shared store, in case the callback
+# was handled by another worker process; the interval backs off exponentially
+COMPLETION_POLL_INITIAL_INTERVAL = 0.5  # seconds
+COMPLETION_POLL_MAX_INTERVAL = 5.0  # seconds
+COMPLETION_POLL_BACKOFF = 1.5
+
+# How often and for how long a waiting request retries reading the result after
+# the callback, since Airflow only finishes the run after the callback task
+COMPLETION_RESULT_RETRY_INTERVAL = 0.5  # seconds
+COMPLETION_RESULT_RETRIES = 6
+
+# In-flight completion waits, shared by all requests waiting on the same transaction
+_completion_waits: Dict[str, asyncio.Future] = {}
+
+# Maximum number of transactions of a bulk upload processed at the same time
+BULK_UPLOAD_CONCURRENCY = 16
+
+# Short-lived memoization of Airflow DAG run statuses, keyed by (dag_id, run_id)
+DAG_STATUS_TTL = 2.0  # seconds
+DAG_STATUS_CACHE_SIZE = 1024
+_dag_status_cache: Dict[tuple, tuple] = {}
+
+# DAG status lookups are coalesced for a short window and fetched per DAG with
+# a single list request to Airflow
+DAG_STATUS_BATCH_WINDOW = 0.2  # seconds
+DAG_STATUS_BATCH_SIZE = 50
+DAG_STATUS_LIST_LIMIT = 100
+_dag_status_batch: Dict[tuple, asyncio.Future] = {}
+_dag_status_flush_handle: Optional[asyncio.TimerHandle] = None
+_dag_status_batch_tasks: set = set()
+
+# Node labels shown as node types in the transaction network
+NETWORK_NODE_TYPES = ("Organization", "Person", "Transaction")
+
+# Memoized transaction network queries, keyed by transaction ID. The cache is per
+# worker process and a new transaction sharing an entity changes the networks of
+# older ones, so entries only absorb bursts of requests and expire after a few
+# seconds; the worker handling a callback also drops them right away
+NETWORK_CACHE_TTL = 5.0  # seconds
+NETWORK_CACHE_SIZE = 1024
+_network_cache: Dict[str, tuple] = {}
+
+# Short-lived cache for dashboard statistics, invalidated on callbacks
+DASHBOARD_STATS_TTL = 5  # seconds
+_stats_cache = {"ts": 0.0, "value": None}
+
+@app.on_event("startup")
+async def startup_event():
+    """Create the shared, connection-pooled Airflow and Neo4j clients and build the transaction index."""
+    app.state.airflow_client = httpx.AsyncClient(
+        base_url=AIRFLOW_BASE_URL,
+        auth=(AIRFLOW_USER, AIRFLOW_PASSWORD),
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        timeout=30.0
+    )
+    
+    # A single Neo4j driver is shared so its connection pool is reused; if Neo4j
+    # isn't reachable yet, the driver is created lazily by the first query
+    app.state.neo4j = Neo4jManager()
+    await asyncio.to_thread(app.state.neo4j.connect)
+    
+    # Build or refresh the index; it is kept current incrementally afterwards
+    await asyncio.to_thread(_sync_transaction_index)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the shared Airflow HTTP client, the Neo4j driver and the transaction store."""
+    await app.state.airflow_client.aclose()
+    await asyncio.to_thread(app.state.neo4j.close)
+    await transaction_store.close()
+
+def get_airflow_client() -> httpx.AsyncClient:
+    """
+    Get the shared Airflow HTTP client so keep-alive connections are reused across requests.
+    """
+    return app.state.airflow_client
+
+def get_neo4j_manager() -> Neo4jManager:
+    """
+    Get the shared Neo4j manager so pooled driver connections are reused across requests.
+    """
+    return app.state.neo4j
 
 # Models
 class AirflowStatus(BaseModel):
@@ -118,32 +226,379 @@ class CallbackRequest(BaseModel):
     status: str
     result_path: Optional[str] = None
 
-async def trigger_airflow_dag(transaction_data: str, transaction_id: str) -> AirflowStatus:
+def _risk_assessment_response(result: Dict[str, Any]) -> ORJSONResponse:
+    """
+    Return a stored risk assessment in the RiskAssessmentResult shape.
+    
+    Stored results are not validated against the model; its defaults are filled
+    in (successful assessments don't store a status) and other keys, such as the
+    stored entity count, are left out.
+    """
+    content = {field: result[field] for field in RiskAssessmentResult.model_fields if field in result}
+    content.setdefault("status", "completed")
+    content.setdefault("timestamp", None)
+    return ORJSONResponse(content=content)
+
+class RiskAssessmentSummary(msgspec.Struct):
+    """
+    Fields of a risk assessment file needed for the transaction index.
+    
+    The files are written from LLM output, so fields may be null or of another
+    JSON type; IDs and timestamps are converted to strings after decoding.
+    """
+    transaction_id: Optional[Union[str, int, float]] = None
+    timestamp: Optional[Union[str, int, float]] = None
+    risk_score: Optional[float] = None
+    entities_count: Optional[int] = None
+    extracted_entities: Optional[List[msgspec.Raw]] = None
+    
+    def __post_init__(self):
+        if self.transaction_id is not None:
+            self.transaction_id = str(self.transaction_id)
+        if self.timestamp is not None:
+            self.timestamp = str(self.timestamp)
+    
+    def count_entities(self) -> int:
+        """Get the number of extracted entities, preferring the count stored at write time."""
+        if self.entities_count is not None:
+            return self.entities_count
+        return len(self.extracted_entities or ())
+
+# Decodes only the summary fields of a risk assessment, skipping the rest of the file;
+# lax mode also accepts numbers stored as strings
+_risk_summary_decoder = msgspec.json.Decoder(RiskAssessmentSummary, strict=False)
+
+def _decode_risk_summary(data: bytes) -> RiskAssessmentSummary:
+    """
+    Decode the summary fields of a risk assessment file.
+    
+    Raises:
+        msgspec.ValidationError: If a summary field has an unusable value; logged
+            here, as callers treat the file as unreadable
+    """
+    try:
+        return _risk_summary_decoder.decode(data)
+    except msgspec.ValidationError as e:
+        logger.warning(f"Risk assessment summary could not be decoded: {str(e)}")
+        raise
+
+def _read_folder_index_row(transaction_id: str) -> Dict:
+    """
+    Build the index row for a transaction folder from its risk assessment and metadata.
+    
+    This performs blocking file I/O and is meant to be run in a worker thread.
+    """
+    risk_assessment = load_transaction_data(
+        RESULTS_FOLDER, transaction_id, "risk_assessment.json", decoder=_decode_risk_summary
+    )
+    metadata = load_transaction_data(RESULTS_FOLDER, transaction_id, "metadata.json") or {}
+    
+    row = {
+        "transaction_id": transaction_id,
+        "timestamp": metadata.get("timestamp") or datetime.now().isoformat(),
+        "status": metadata.get("status", "processing"),
+        "risk_score": None,
+        "entities_count": 0,
+        "result_path": None
+    }
+    
+    # If we have a risk assessment, it's completed
+    if risk_assessment:
+        if "timestamp" not in metadata and risk_assessment.timestamp:
+            row["timestamp"] = risk_assessment.timestamp
+        row["status"] = "completed"
+        row["risk_score"] = risk_assessment.risk_score if risk_assessment.risk_score is not None else 0.0
+        row["entities_count"] = risk_assessment.count_entities()
+    
+    return row
+
+def _read_legacy_result(result_file: str) -> Optional[RiskAssessmentSummary]:
+    """
+    Read the summary of a legacy result file, or None if it can't be read.
+    
+    This performs blocking file I/O and is meant to be run in a worker thread.
+    """
+    try:
+        return read_json_file(result_file, _decode_risk_summary)
+    except Exception as e:
+        logger.warning(f"Error reading result file {result_file}: {str(e)}")
+        return None
+
+def _legacy_index_row(result_file: str, result_stat: os.stat_result,
+                      result: RiskAssessmentSummary) -> Dict:
+    """
+    Build the index row for a legacy result file from its summary.
+    """
+    transaction_id = result.transaction_id or os.path.basename(result_file).split('.')[0]
+    
+    # Get file creation time as a timestamp
+    file_timestamp = datetime.fromtimestamp(result_stat.st_ctime).isoformat()
+    
+    return {
+        "transaction_id": transaction_id,
+        "timestamp": result.timestamp or file_timestamp,
+        "status": "completed",
+        "risk_score": result.risk_score,
+        "entities_count": result.count_entities(),
+        "result_path": result_file
+    }
+
+def _scan_transaction_index_rows(known_ids: Iterable[str] = ()) -> List[Dict]:
+    """
+    Scan the results folder and build index rows for all transaction folders and legacy result files.
+    
+    Files are read by a thread pool since the reads are independent and mostly
+    wait on I/O; deduplication happens afterwards in this thread.
+    
+    This performs blocking file I/O and is meant to be run in a worker thread.
+    
+    Args:
+        known_ids: IDs of transactions that are already indexed and are skipped
+    """
+    # Get all transaction folders
+    seen_ids = set(known_ids)
+    transaction_folders = [
+        transaction_id for transaction_id in list_transaction_results(RESULTS_FOLDER)
+        if transaction_id not in seen_ids
+    ]
+    seen_ids.update(transaction_folders)
+    
+    # Then look for any legacy result files not in transaction folders
+    with os.scandir(RESULTS_FOLDER) as entries:
+        legacy_result_files = []
+        for entry in entries:
+            if not (entry.name.startswith("result_") and entry.name.endswith(".json") and entry.is_file()):
+                continue
+            
+            # Skip if the transaction ID in the filename was already processed
+            match = LEGACY_RESULT_FILE_RE.match(entry.name)
+            if match and match.group("id") in seen_ids:
+                continue
+            
+            legacy_result_files.append((entry.path, entry.stat()))
+    
+    with ThreadPoolExecutor() as executor:
+        rows = list(executor.map(_read_folder_index_row, transaction_folders))
+        legacy_results = list(executor.map(_read_legacy_result, [path for path, _ in legacy_result_files]))
+    
+    for (result_file, result_stat), result in zip(legacy_result_files, legacy_results):
+        if result is None:
+            continue
+        
+        row = _legacy_index_row(result_file, result_stat, result)
+        
+        # Skip if we already have this transaction
+        if row["transaction_id"] in seen_ids:
+            continue
+        
+        rows.append(row)
+        seen_ids.add(row["transaction_id"])
+    
+    return rows
+
+def _index_untracked_transaction(transaction_id: str) -> Optional[Dict]:
+    """
+    Look for results of a transaction that is missing from the index, and index them.
+    
+    The index is only rebuilt from the results folder when it is empty, so
+    result folders and legacy result files written outside the API would
+    otherwise never be found.
+    
+    This performs blocking file I/O and is meant to be run in a worker thread.
+    
+    Args:
+        transaction_id: The transaction ID
+        
+    Returns:
+        The new index row, or None if there are no results for the transaction
+    """
+    row = None
+    
+    if os.path.isdir(os.path.join(RESULTS_FOLDER, transaction_id)):
+        row = _read_folder_index_row(transaction_id)
+    else:
+        for result_filename in (f"result_{transaction_id}.json", f"result_aml_run_{transaction_id}.json"):
+            result_file = os.path.join(RESULTS_FOLDER, result_filename)
+            if not os.path.isfile(result_file):
+                continue
+            
+            result = _read_legacy_result(result_file)
+            if result is not None:
+                row = _legacy_index_row(result_file, os.stat(result_file), result)
+                row["transaction_id"] = transaction_id
+                break
+    
+    if row:
+        transaction_index.upsert(**row)
+    
+    return row
+
+def _index_callback_result(transaction_id: str, status: str, timestamp: str) -> None:
+    """
+    Update the transaction index after an Airflow callback.
+    
+    This performs blocking file I/O and is meant to be run in a worker thread.
+    
+    Args:
+        transaction_id: The transaction ID
+        status: The status reported by the callback
+        timestamp: Timestamp to use if the transaction is not indexed yet
+    """
+    fields = {"status": status}
+    
+    risk_assessment = load_transaction_data(
+        RESULTS_FOLDER, transaction_id, "risk_assessment.json", decoder=_decode_risk_summary
+    )
+    if risk_assessment:
+        fields["status"] = "completed"
+        fields["risk_score"] = risk_assessment.risk_score if risk_assessment.risk_score is not None else 0.0
+        fields["entities_count"] = risk_assessment.count_entities()
+    
+    # Keep the original submission time for transactions that are already indexed
+    if not transaction_index.get(transaction_id):
+        fields["timestamp"] = timestamp
+    
+    transaction_index.upsert(transaction_id, **fields)
+
+def _sync_transaction_index() -> None:
+    """
+    Bring the transaction index up to date on startup.
+    
+    The results folder is only fully read when the index is empty (on first start,
+    or after the index file was deleted). Otherwise only results that are not
+    indexed yet are read, and transactions that were still in progress are
+    re-checked, in case they completed while the API was down.
+    
+    This performs blocking file I/O and is meant to be run in a worker thread.
+    """
+    transaction_index.initialize()
+    
+    if transaction_index.count() == 0:
+        transaction_index.rebuild(_scan_transaction_index_rows())
+        return
+    
+    for row in _scan_transaction_index_rows(known_ids=transaction_index.get_transaction_ids()):
+        transaction_index.upsert(**row)
+    
+    for status in ("triggered", "processing"):
+        for transaction_id in transaction_index.get_transaction_ids(status):
+            # Already indexed, so the submission timestamp is kept
+            _index_callback_result(transaction_id, status, "")
+
+def _write_transaction_file(transaction_id: str, transaction_data: str) -> str:
+    """
+    Create the transaction folder and save the raw transaction text into it.
+    
+    This performs blocking file I/O and is meant to be run in a worker thread.
+    
+    Returns:
+        The path to the transaction folder
+    """
+    transaction_folder = get_transaction_folder(RESULTS_FOLDER, transaction_id)
+    transaction_file_path = os.path.join(transaction_folder, "transaction.txt")
+    
+    # Save the transaction data
+    with open(transaction_file_path, 'wb') as f:
+        f.write(transaction_data.encode('utf-8'))
+    
+    return transaction_folder
+
+def _transcode_transaction_file(file_path: str, encoding: str) -> None:
+    """
+    Re-encode a transaction file from the given encoding to UTF-8.
+    
+    This performs blocking file I/O and is meant to be run in a worker thread.
+    """
+    with open(file_path, 'rb') as f:
+        text = f.read().decode(encoding, errors='replace')
+    
+    with open(file_path, 'wb') as f:
+        f.write(text.encode('utf-8'))
+
+async def _stream_transaction_file(request: Request, transaction_id: str) -> bool:
+    """
+    Stream the request body into the transaction file without buffering it in memory.
+    
+    The body is checked incrementally for valid UTF-8; if it isn't, the file is
+    re-encoded from latin-1 once the upload is complete.
+    
+    Args:
+        request: The incoming request
+        transaction_id: The transaction ID
+        
+    Returns:
+        False if the request body was empty (no folder is created), True otherwise
+    """
+    utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+    is_utf8 = True
+    transaction_file_path = None
+    f = None
+    
+    try:
+        async for chunk in request.stream():
+            if not chunk:
+                continue
+            
+            # Create the transaction folder once there is data to write
+            if f is None:
+                transaction_folder = await asyncio.to_thread(get_transaction_folder, RESULTS_FOLDER, transaction_id)
+                transaction_file_path = os.path.join(transaction_folder, "transaction.txt")
+                f = await asyncio.to_thread(open, transaction_file_path, 'wb')
+            
+            if is_utf8:
+                try:
+                    utf8_decoder.decode(chunk)
+                except UnicodeDecodeError:
+                    is_utf8 = False
+            
+            await asyncio.to_thread(f.write, chunk)
+    finally:
+        if f is not None:
+            await asyncio.to_thread(f.close)
+    
+    if f is None:
+        return False
+    
+    if is_utf8:
+        try:
+            utf8_decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            is_utf8 = False
+    
+    if not is_utf8:
+        await asyncio.to_thread(_transcode_transaction_file, transaction_file_path, 'latin-1')
+        logger.info("Decoded request body using latin-1 encoding")
+    
+    return True
+
+async def trigger_airflow_dag(transaction_data: Optional[str], transaction_id: str) -> AirflowStatus:
     """
     Trigger Airflow DAG directly via the REST API.
+    
+    Args:
+        transaction_data: The transaction text, or None if the transaction file
+            has already been written to the transaction folder
+        transaction_id: The transaction ID
     """
     try:
-        # Airflow API endpoint for triggering DAGs
+        # Airflow API endpoint for triggering DAGs (relative to the client's base URL)
         dag_id = "aml_risk_assessment"
         dag_run_id = f"{transaction_id}"
-        airflow_api_url = f"{AIRFLOW_BASE_URL}/dags/{dag_id}/dagRuns"
-        
-        # Authentication credentials
-        auth = (AIRFLOW_USER, AIRFLOW_PASSWORD)
+        airflow_api_path = f"/dags/{dag_id}/dagRuns"
         
-        # First, save the transaction data to its own folder
-        transaction_folder = get_transaction_folder(RESULTS_FOLDER, transaction_id)
-        transaction_file_path = os.path.join(transaction_folder, "transaction.txt")
-        
-        # Save the transaction data
-        with open(transaction_file_path, 'w', encoding='utf-8') as f:
-            f.write(transaction_data)
+        # First, save the transaction data to its own folder, off the event loop
+        if transaction_data is not None:
+            transaction_folder = await asyncio.to_thread(_write_transaction_file, transaction_id, transaction_data)
+        else:
+            transaction_folder = os.path.join(RESULTS_FOLDER, transaction_id)
         
-        # Prepare the payload according to Airflow API spec
+        # Prepare the payload according to Airflow API spec. The transaction text is
+        # only passed by path (relative to the results folder, which is mounted
+        # differently in Airflow) so it isn't also stored in Airflow's metadata DB
         payload = {
             "dag_run_id": dag_run_id,
             "conf": {
-                "transaction_data": transaction_data,
+                "transaction_path": os.path.join(transaction_id, "transaction.txt"),
                 "transaction_id": transaction_id,
                 "callback_url": f"{API_CALLBACK_URL}/{transaction_id}"
             }
@@ -151,14 +606,9 @@ async def trigger_airflow_dag(transaction_data: str, transaction_id: str) -> Air
         
         logger.info(f"Triggering Airflow DAG with payload for transaction: {transaction_id}")
         
-        # Make the API request
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                airflow_api_url, 
-                json=payload, 
-                auth=auth,
-                timeout=30.0
-            )
+        # Make the API request using the shared client
+        client = get_airflow_client()
+        response = await client.post(airflow_api_path, json=payload)
             
         if response.status_code >= 400:
             logger.error(f"Error from Airflow API: {response.text}")
@@ -169,27 +619,37 @@ async def trigger_airflow_dag(transaction_data: str, transaction_id: str) -> Air
         
         logger.info(f"Airflow DAG {dag_id} triggered with run_id {dag_run_id}")
         
-        # Store transaction metadata in the in-memory store
-        transaction_store[transaction_id] = {
+        # Store transaction metadata in the transaction store
+        timestamp = datetime.now().isoformat()
+        await transaction_store.set(transaction_id, {
             "dag_id": dag_id,
             "run_id": dag_run_id,
             "status": "triggered",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "folder": transaction_folder
-        }
+        })
         
-        # Save transaction metadata to the transaction folder
-        metadata = {
-            "transaction_id": transaction_id,
-            "dag_id": dag_id,
-            "run_id": dag_run_id,
-            "status": "triggered",
-            "timestamp": datetime.now().isoformat()
-        }
-        save_transaction_data(RESULTS_FOLDER, transaction_id, "metadata.json", metadata)
+        # The in-memory store is lost when the API restarts, so the run is also
+        # recorded in the transaction folder; with Redis the metadata is persisted
+        # once, when the callback arrives
+        if not transaction_store.persistent:
+            metadata = {
+                "transaction_id": transaction_id,
+                "dag_id": dag_id,
+                "run_id": dag_run_id,
+                "status": "triggered",
+                "timestamp": timestamp
+            }
+            await asyncio.to_thread(save_transaction_data, RESULTS_FOLDER, transaction_id, "metadata.json", metadata)
+        
+        # Add the transaction to the index
+        await asyncio.to_thread(
+            transaction_index.upsert, transaction_id,
+            timestamp=timestamp, status="triggered"
+        )
         
         # Return the Airflow status
-        return AirflowStatus(dag_id=dag_id, run_id=dag_run_id, status="triggered", transaction_id=transaction_id)
+        return AirflowStatus.model_construct(dag_id=dag_id, run_id=dag_run_id, status="triggered", transaction_id=transaction_id)
         
     except httpx.HTTPError as e:
         logger.error(f"HTTP error triggering Airflow DAG: {str(e)}")
@@ -206,17 +666,168 @@ async def trigger_airflow_dag(transaction_data: str, transaction_id: str) -> Air
  
 async def check_dag_status(dag_id: str, run_id: str) -> Dict:
     """
-    Check the status of a DAG run in Airflow
+    Check the status of a DAG run in Airflow.
+    
+    Results are memoized per DAG run for DAG_STATUS_TTL seconds, concurrent
+    callers for the same run share a single in-flight request, and lookups for
+    different runs are batched (see _request_dag_status).
+    """
+    key = (dag_id, run_id)
+    now = time.monotonic()
+    
+    cached = _dag_status_cache.get(key)
+    if cached and cached[0] > now:
+        return await asyncio.shield(cached[1])
+    
+    # Drop expired entries so the cache stays bounded
+    if len(_dag_status_cache) >= DAG_STATUS_CACHE_SIZE:
+        for expired_key in [k for k, (deadline, _) in _dag_status_cache.items() if deadline <= now]:
+            del _dag_status_cache[expired_key]
+    
+    task = _request_dag_status(dag_id, run_id)
+    if len(_dag_status_cache) < DAG_STATUS_CACHE_SIZE:
+        _dag_status_cache[key] = (now + DAG_STATUS_TTL, task)
+    
+    return await asyncio.shield(task)
+
+def invalidate_dag_status(run_id: str) -> None:
+    """
+    Drop memoized DAG statuses for a run, e.g. after its completion callback.
     """
-    # Airflow API endpoint for checking DAG run status
-    airflow_api_url = f"{AIRFLOW_BASE_URL}/dags/{dag_id}/dagRuns/{run_id}"
+    for key in [k for k in _dag_status_cache if k[1] == run_id]:
+        del _dag_status_cache[key]
+
+def invalidate_transaction_network(transaction_id: str) -> None:
+    """
+    Drop memoized network queries for a transaction, e.g. after its completion callback.
+    """
+    _network_cache.pop(transaction_id, None)
+
+def _request_dag_status(dag_id: str, run_id: str) -> asyncio.Future:
+    """
+    Queue a DAG run status lookup for the next batched Airflow request.
+    
+    The batch is flushed DAG_STATUS_BATCH_WINDOW seconds after the first lookup
+    is queued, or as soon as it holds DAG_STATUS_BATCH_SIZE lookups.
     
-    # Authentication credentials
-    auth = (AIRFLOW_USER, AIRFLOW_PASSWORD)
+    Returns:
+        A future resolved with the DAG run status
+    """
+    global _dag_status_flush_handle
+    
+    key = (dag_id, run_id)
+    future = _dag_status_batch.get(key)
+    if future is None:
+        future = _dag_status_batch[key] = asyncio.get_running_loop().create_future()
+    
+    if len(_dag_status_batch) >= DAG_STATUS_BATCH_SIZE:
+        _flush_dag_status_batch()
+    elif _dag_status_flush_handle is None:
+        _dag_status_flush_handle = asyncio.get_running_loop().call_later(
+            DAG_STATUS_BATCH_WINDOW, _flush_dag_status_batch
+        )
+    
+    return future
+
+def _flush_dag_status_batch() -> None:
+    """
+    Start fetching all queued DAG run status lookups.
+    """
+    global _dag_status_flush_handle
+    
+    if _dag_status_flush_handle is not None:
+        _dag_status_flush_handle.cancel()
+        _dag_status_flush_handle = None
+    
+    if not _dag_status_batch:
+        return
+    
+    # Group the lookups by DAG so each DAG needs a single list request
+    runs_by_dag: Dict[str, Dict[str, asyncio.Future]] = {}
+    for (dag_id, run_id), future in _dag_status_batch.items():
+        runs_by_dag.setdefault(dag_id, {})[run_id] = future
+    _dag_status_batch.clear()
+    
+    for dag_id, futures in runs_by_dag.items():
+        # Keep a reference so the task isn't garbage collected while running
+        task = asyncio.ensure_future(_fetch_dag_statuses(dag_id, futures))
+        _dag_status_batch_tasks.add(task)
+        task.add_done_callback(_dag_status_batch_tasks.discard)
+
+def _dag_run_listing_covers(run_ids: List[str]) -> bool:
+    """
+    Check whether the DAG_STATUS_LIST_LIMIT most recent DAG runs include all given runs.
+    
+    Runs are triggered by the API with the transaction ID as run ID, so the runs
+    triggered since the oldest of them are the transactions indexed since then.
+    
+    Args:
+        run_ids: The run IDs of the queued lookups
+        
+    Returns:
+        True if one listing request returns the status of every run
+    """
+    timestamps = []
+    for run_id in run_ids:
+        row = transaction_index.get(run_id)
+        if not row or not row.get("timestamp"):
+            return False
+        timestamps.append(row["timestamp"])
+    
+    return transaction_index.count(since=min(timestamps)) <= DAG_STATUS_LIST_LIMIT
+
+async def _fetch_dag_statuses(dag_id: str, futures: Dict[str, asyncio.Future]) -> None:
+    """
+    Fetch the status of several runs of a DAG and resolve their futures.
+    
+    When the most recent runs of the DAG include every queued run, they are
+    looked up in one listing request; otherwise, and for any run the listing
+    missed, runs are fetched individually. Every future is resolved, with an
+    error state if the fetch failed or was cancelled.
+    
+    Args:
+        dag_id: The DAG ID
+        futures: Futures to resolve, keyed by run ID
+    """
+    statuses = {}
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(airflow_api_url, auth=auth)
+        if len(futures) > 1 and await asyncio.to_thread(_dag_run_listing_covers, list(futures)):
+            try:
+                client = get_airflow_client()
+                response = await client.get(
+                    f"/dags/{dag_id}/dagRuns",
+                    params={"order_by": "-execution_date", "limit": DAG_STATUS_LIST_LIMIT}
+                )
+                
+                if response.status_code == 200:
+                    for dag_run in response.json().get("dag_runs", []):
+                        if dag_run.get("dag_run_id") in futures:
+                            statuses[dag_run["dag_run_id"]] = dag_run
+                else:
+                    logger.warning(f"Error listing DAG runs: {response.text}")
+            except Exception as e:
+                logger.error(f"Error listing DAG runs: {str(e)}")
+        
+        missing = [run_id for run_id in futures if run_id not in statuses]
+        results = await asyncio.gather(*(_fetch_dag_status(dag_id, run_id) for run_id in missing))
+        statuses.update(zip(missing, results))
+    finally:
+        # Waiters share these futures, so none may be left pending
+        for run_id, future in futures.items():
+            if not future.done():
+                future.set_result(statuses.get(run_id, {"state": "error"}))
+
+async def _fetch_dag_status(dag_id: str, run_id: str) -> Dict:
+    """
+    Fetch the status of a DAG run from the Airflow API
+    """
+    # Airflow API endpoint for checking DAG run status (relative to the client's base URL)
+    airflow_api_path = f"/dags/{dag_id}/dagRuns/{run_id}"
+    
+    try:
+        client = get_airflow_client()
+        response = await client.get(airflow_api_path)
         
         if response.status_code == 200:
             return response.json()
@@ -227,7 +838,116 @@ async def check_dag_status(dag_id: str, run_id: str) -> Dict:
         logger.error(f"Error checking DAG status: {str(e)}")
         return {"state": "error"}
 
-@app.post("/api/transaction", response_model=Union[RiskAssessmentResult, AirflowStatus])
+async def wait_for_completion(transaction_id: str, timeout: float) -> bool:
+    """
+    Wait until the Airflow callback for a transaction has been processed.
+    
+    All callers waiting on the same transaction share a single wait, so the
+    shared store is polled once per interval regardless of the number of waiters.
+    
+    Args:
+        transaction_id: The transaction ID
+        timeout: Maximum time to wait in seconds
+        
+    Returns:
+        True if the callback was processed, False on timeout
+    """
+    wait = _completion_waits.get(transaction_id)
+    if wait is None:
+        wait = _completion_waits[transaction_id] = asyncio.ensure_future(
+            _wait_for_completion(transaction_id, timeout)
+        )
+        wait.add_done_callback(lambda _: _completion_waits.pop(transaction_id, None))
+    
+    # Shield the shared wait so a disconnecting client doesn't cancel it for the others
+    return await asyncio.shield(wait)
+
+async def _wait_for_completion(transaction_id: str, timeout: float) -> bool:
+    """
+    Wait for the completion event of a transaction, checking the shared store with backoff.
+    
+    The local completion event is only set when the callback reaches this worker
+    process, so the shared transaction store is also checked periodically.
+    """
+    completion_event = pending_events.setdefault(transaction_id, asyncio.Event())
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    poll_interval = COMPLETION_POLL_INITIAL_INTERVAL
+    
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            
+            try:
+                await asyncio.wait_for(completion_event.wait(), timeout=min(poll_interval, remaining))
+                return True
+            except asyncio.TimeoutError:
+                pass
+            
+            transaction_info = await transaction_store.get(transaction_id)
+            if transaction_info and transaction_info.get("status") != "triggered":
+                return True
+            
+            poll_interval = min(poll_interval * COMPLETION_POLL_BACKOFF, COMPLETION_POLL_MAX_INTERVAL)
+    finally:
+        pending_events.pop(transaction_id, None)
+
+async def _wait_for_risk_assessment(transaction_id: str, status: AirflowStatus,
+                                    timeout: float) -> Tuple[Optional[Dict], bool, Optional[str]]:
+    """
+    Wait for a triggered transaction to complete and load its risk assessment.
+    
+    Args:
+        transaction_id: The transaction ID
+        status: The Airflow status returned when the DAG was triggered
+        timeout: Maximum time to wait for the callback in seconds
+        
+    Returns:
+        Tuple of the risk assessment (None if it is not available), whether the
+        callback arrived, and the DAG run state from the fallback status check
+    """
+    completed = await wait_for_completion(transaction_id, timeout)
+    
+    # The callback is sent by the last task, so the result is usually on disk
+    # before Airflow marks the run as successful; retry briefly if it isn't yet
+    if completed:
+        for attempt in range(COMPLETION_RESULT_RETRIES):
+            risk_assessment = await asyncio.to_thread(
+                load_transaction_data, RESULTS_FOLDER, transaction_id, "risk_assessment.json"
+            )
+            
+            if risk_assessment:
+                return risk_assessment, completed, None
+            
+            if attempt < COMPLETION_RESULT_RETRIES - 1:
+                await asyncio.sleep(COMPLETION_RESULT_RETRY_INTERVAL)
+    
+    # Fallback status check for failure detection
+    dag_status = await check_dag_status(status.dag_id, status.run_id)
+    state = dag_status.get('state')
+    
+    if state == 'success':
+        # Check for the risk assessment result in the transaction folder
+        risk_assessment = await asyncio.to_thread(
+            load_transaction_data, RESULTS_FOLDER, transaction_id, "risk_assessment.json"
+        )
+        
+        if risk_assessment:
+            return risk_assessment, completed, state
+        
+        # If the risk assessment is not in the transaction folder, try the old location
+        result_filename = f"result_{status.run_id}.json"
+        result_path = os.path.join(RESULTS_FOLDER, result_filename)
+        
+        if os.path.exists(result_path):
+            result = await asyncio.to_thread(read_json_file, result_path)
+            return result, completed, state
+    
+    return None, completed, state
+
+@app.post("/api/transaction")
 async def receive_transaction(request: Request, background_tasks: BackgroundTasks, wait: bool = False):
     """
     Endpoint to receive transaction data in text format.
@@ -238,76 +958,55 @@ async def receive_transaction(request: Request, background_tasks: BackgroundTask
     - wait: Boolean parameter to indicate whether to wait for processing to complete
     """
     try:
-        # Get raw bytes from the request body
-        data = await request.body()
-        
-        # Try different encodings to handle potential encoding issues
-        try:
-            text_data = data.decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                text_data = data.decode('latin-1')
-                logger.info("Decoded request body using latin-1 encoding")
-            except UnicodeDecodeError:
-                # If all else fails, decode with errors='replace'
-                text_data = data.decode('utf-8', errors='replace')
-                logger.warning("Decoded request body with replacement characters due to encoding issues")
-        
-        if not text_data:
-            raise HTTPException(status_code=400, detail="No transaction data provided")
-        
         # Generate a unique transaction ID
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         transaction_id = f"txn_{timestamp}_{uuid.uuid4().hex[:8]}"
         
-        # Trigger Airflow DAG directly with the transaction data
-        status = await trigger_airflow_dag(text_data, transaction_id)
+        # Stream the request body straight into the transaction folder
+        if not await _stream_transaction_file(request, transaction_id):
+            raise HTTPException(status_code=400, detail="No transaction data provided")
         
+        # Register the completion event before triggering so an early callback is not missed
         if wait:
-            # Poll for the DAG to complete
-            max_wait_time = 600  # 10 minutes
-            start_time = time.time()
+            pending_events[transaction_id] = asyncio.Event()
+        
+        try:
+            # Trigger Airflow DAG directly with the transaction data
+            status = await trigger_airflow_dag(None, transaction_id)
             
-            while time.time() - start_time < max_wait_time:
-                # Get the DAG run status
-                dag_status = await check_dag_status(status.dag_id, status.run_id)
-                
-                if dag_status.get('state') == 'success':
-                    # Check for the risk assessment result in the transaction folder
-                    risk_assessment = load_transaction_data(
-                        RESULTS_FOLDER, transaction_id, "risk_assessment.json"
-                    )
-                    
-                    if risk_assessment:
-                        return risk_assessment
-                    
-                    # If the risk assessment is not in the transaction folder, try the old location
-                    result_filename = f"result_{status.run_id}.json"
-                    result_path = os.path.join(RESULTS_FOLDER, result_filename)
-                    
-                    if os.path.exists(result_path):
-                        with open(result_path, 'r', encoding='utf-8') as f:
-                            result = json.load(f)
-                            
-                        return result
-                    
-                elif dag_status.get('state') in ['failed', 'error']:
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Airflow DAG {status.dag_id} with run_id {status.run_id} failed"
-                    )
-                
-                # Wait before checking again
-                await asyncio.sleep(5)
+            if not wait:
+                # Return immediately with the Airflow trigger status
+                return ORJSONResponse(content=status.model_dump())
             
-            # If we get here, the DAG didn't complete in time
+            # Wait for the Airflow callback instead of polling the DAG status
+            max_wait_time = 600  # 10 minutes
+            result, completed, state = await _wait_for_risk_assessment(transaction_id, status, max_wait_time)
+        finally:
+            pending_events.pop(transaction_id, None)
+        
+        if result:
+            return _risk_assessment_response(result)
+        
+        if state in ['failed', 'error']:
             raise HTTPException(
-                status_code=504,
-                detail=f"Timeout waiting for Airflow DAG {status.dag_id} with run_id {status.run_id} to complete"
+                status_code=500,
+                detail=f"Airflow DAG {status.dag_id} with run_id {status.run_id} failed"
             )
-        else:
-            # Return immediately with the Airflow trigger status
-            return status
+        
+        # The callback arrived but the run is still finishing; point the client at
+        # the status endpoint rather than reporting a timeout
+        if completed:
+            return ORJSONResponse(status_code=202, content={
+                **status.model_dump(),
+                "status": state or "processing",
+                "status_url": f"/api/transaction/{transaction_id}"
+            })
+        
+        # If we get here, the DAG didn't complete in time
+        raise HTTPException(
+            status_code=504,
+            detail=f"Timeout waiting for Airflow DAG {status.dag_id} with run_id {status.run_id} to complete"
+        )
     
     except HTTPException:
         raise
@@ -334,30 +1033,50 @@ async def process_callback(transaction_id: str, callback_data: CallbackRequest):
             logger.warning(f"Transaction ID mismatch: {transaction_id} vs {callback_data.transaction_id}")
             raise HTTPException(status_code=400, detail="Transaction ID mismatch")
         
+        # Timestamp used if the transaction's submission time is unknown
+        now_iso = datetime.now().isoformat()
+        
         # Update the transaction store with the new status
-        if transaction_id in transaction_store:
-            transaction_store[transaction_id].update({
+        transaction_info = await transaction_store.get(transaction_id)
+        if transaction_info is not None:
+            await transaction_store.update(transaction_id, {
                 "status": callback_data.status,
                 "result_path": callback_data.result_path
             })
         else:
-            transaction_store[transaction_id] = {
+            transaction_info = {
                 "dag_id": callback_data.dag_id,
                 "run_id": callback_data.run_id,
                 "status": callback_data.status,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso,
                 "result_path": callback_data.result_path
             }
+            await transaction_store.set(transaction_id, transaction_info)
         
-        # Update the metadata in the transaction folder
+        # Persist the final metadata to the transaction folder, keeping the submission time
         metadata = {
             "transaction_id": transaction_id,
             "dag_id": callback_data.dag_id,
             "run_id": callback_data.run_id,
             "status": callback_data.status,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": transaction_info.get("timestamp") or now_iso
         }
-        save_transaction_data(RESULTS_FOLDER, transaction_id, "metadata.json", metadata)
+        await asyncio.to_thread(save_transaction_data, RESULTS_FOLDER, transaction_id, "metadata.json", metadata)
+        
+        # Update the index with the final status and risk assessment
+        await asyncio.to_thread(_index_callback_result, transaction_id, callback_data.status, metadata["timestamp"])
+        
+        # New results are available, so cached statistics, DAG statuses, networks and
+        # folder trees are stale
+        _stats_cache["value"] = None
+        invalidate_dag_status(callback_data.run_id)
+        invalidate_transaction_network(transaction_id)
+        invalidate_knowledge_base_structure(RESULTS_FOLDER, transaction_id)
+        
+        # Wake up any request waiting on this transaction
+        completion_event = pending_events.get(transaction_id)
+        if completion_event:
+            completion_event.set()
         
         return {"status": "success", "message": f"Callback processed for transaction {transaction_id}"}
     
@@ -367,25 +1086,25 @@ async def process_callback(transaction_id: str, callback_data: CallbackRequest):
         logger.error(f"Error processing callback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/transaction/{transaction_id}", response_model=RiskAssessmentResult)
+@app.get("/api/transaction/{transaction_id}")
 async def get_transaction_status(transaction_id: str):
     """
     Get the status or result of a transaction processing.
+    
+    Stored results are returned in the RiskAssessmentResult shape without response
+    model validation; the DAG writes them using the Gemini function schema.
     """
     try:
         # First check if there's a transaction folder
         transaction_folder = os.path.join(RESULTS_FOLDER, transaction_id)
         if os.path.exists(transaction_folder):
             # Check for risk assessment in the transaction folder
-            risk_assessment = load_transaction_data(RESULTS_FOLDER, transaction_id, "risk_assessment.json")
+            risk_assessment = await asyncio.to_thread(load_transaction_data, RESULTS_FOLDER, transaction_id, "risk_assessment.json")
             if risk_assessment:
-                # If found, get transaction metadata for additional information
-                metadata = load_transaction_data(RESULTS_FOLDER, transaction_id, "metadata.json")
-                
-                return risk_assessment
+                return _risk_assessment_response(risk_assessment)
             
             # If no risk assessment yet, check for metadata to determine status
-            metadata = load_transaction_data(RESULTS_FOLDER, transaction_id, "metadata.json")
+            metadata = await asyncio.to_thread(load_transaction_data, RESULTS_FOLDER, transaction_id, "metadata.json")
             if metadata:
                 # If we have metadata, use it to check the DAG status
                 if "dag_id" in metadata and "run_id" in metadata:
@@ -405,18 +1124,17 @@ async def get_transaction_status(transaction_id: str):
                         "reason": f"Transaction is {airflow_status}"
                     }
                                         
-                    return base_result
+                    return ORJSONResponse(content=base_result)
         
-        # Next, check the in-memory store
-        transaction_info = transaction_store.get(transaction_id)
+        # Next, check the transaction store
+        transaction_info = await transaction_store.get(transaction_id)
         if transaction_info and transaction_info.get("status") == "completed":
             # If we have a completed transaction with a result path
             result_path = transaction_info.get("result_path")
             if result_path and os.path.exists(result_path):
-                with open(result_path, 'r', encoding='utf-8') as f:
-                    result = json.load(f)
+                result = await asyncio.to_thread(read_json_file, result_path)
                 
-                return result
+                return _risk_assessment_response(result)
             
         # If we have some information but not the full result yet
         if transaction_info:
@@ -430,23 +1148,24 @@ async def get_transaction_status(transaction_id: str):
                 # If the DAG is complete but we don't have the result, look for it
                 if dag_status.get("state") == "success":
                     # Check for results in transaction folder first
-                    risk_assessment = load_transaction_data(RESULTS_FOLDER, transaction_id, "risk_assessment.json")
+                    risk_assessment = await asyncio.to_thread(load_transaction_data, RESULTS_FOLDER, transaction_id, "risk_assessment.json")
                     if risk_assessment:
-                        return risk_assessment
+                        return _risk_assessment_response(risk_assessment)
                     
                     # Look for the legacy result file
                     result_filename = f"result_{transaction_info['run_id']}.json"
                     result_path = os.path.join(RESULTS_FOLDER, result_filename)
                     
                     if os.path.exists(result_path):
-                        with open(result_path, 'r', encoding='utf-8') as f:
-                            result = json.load(f)
+                        result = await asyncio.to_thread(read_json_file, result_path)
                         
                         # Update the transaction store
-                        transaction_info["status"] = "completed"
-                        transaction_info["result_path"] = result_path
+                        await transaction_store.update(transaction_id, {
+                            "status": "completed",
+                            "result_path": result_path
+                        })
                                                 
-                        return result
+                        return _risk_assessment_response(result)
             
             # Return a basic structure with what we know
             airflow_status = transaction_info.get("status", "processing")
@@ -462,35 +1181,30 @@ async def get_transaction_status(transaction_id: str):
                 "reason": f"Transaction is {airflow_status}"
             }
                         
-            return base_result
-        
-        # If we don't have the transaction in our store, check if it's a legacy transaction
-        # by looking directly for result files
-        result_files = []
-        if os.path.exists(RESULTS_FOLDER):
-            result_files = [f for f in os.listdir(RESULTS_FOLDER) 
-                        if f.startswith(f"result_") and transaction_id in f]
-        
-        if result_files:
-            # Return the latest result
-            result_path = os.path.join(RESULTS_FOLDER, result_files[-1])
-            with open(result_path, 'r', encoding='utf-8') as f:
-                result = json.load(f)
+            return ORJSONResponse(content=base_result)
+        
+        # If we don't have the transaction in our store, check the index for a legacy result file
+        indexed_transaction = await asyncio.to_thread(transaction_index.get, transaction_id)
+        if not indexed_transaction:
+            indexed_transaction = await asyncio.to_thread(_index_untracked_transaction, transaction_id)
+        result_path = indexed_transaction.get("result_path") if indexed_transaction else None
+        
+        if result_path and os.path.exists(result_path):
+            result = await asyncio.to_thread(read_json_file, result_path)
             
             # Extract run ID from the filename if possible
-            run_id = None
-            if result_files[-1].startswith("result_") and not result_files[-1].startswith("result_aml_run_"):
-                run_id = result_files[-1].replace("result_", "").split(".")[0]
+            match = LEGACY_RESULT_FILE_RE.match(os.path.basename(result_path))
+            run_id = match.group("id") if match and not match.group("aml_run") else None
             
             # Store the transaction info for future requests
-            transaction_store[transaction_id] = {
+            await transaction_store.set(transaction_id, {
                 "status": "completed",
                 "result_path": result_path,
                 "timestamp": datetime.now().isoformat(),
                 "run_id": run_id
-            }
+            })
                         
-            return result
+            return _risk_assessment_response(result)
         
         # Check with Airflow API directly as a last resort
         try:
@@ -501,12 +1215,13 @@ async def get_transaction_status(transaction_id: str):
             
             if dag_status.get("state"):
                 # We found the DAG run, store this info
-                transaction_store[transaction_id] = {
+                now_iso = datetime.now().isoformat()
+                await transaction_store.set(transaction_id, {
                     "dag_id": dag_id,
                     "run_id": run_id,
                     "status": dag_status.get("state"),
-                    "timestamp": datetime.now().isoformat()
-                }
+                    "timestamp": now_iso
+                })
                 
                 # Create or update metadata in transaction folder
                 metadata = {
@@ -514,9 +1229,9 @@ async def get_transaction_status(transaction_id: str):
                     "dag_id": dag_id,
                     "run_id": run_id,
                     "status": dag_status.get("state"),
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": now_iso
                 }
-                save_transaction_data(RESULTS_FOLDER, transaction_id, "metadata.json", metadata)
+                await asyncio.to_thread(save_transaction_data, RESULTS_FOLDER, transaction_id, "metadata.json", metadata)
                 
                 # Return a basic result with the status
                 base_result = {
@@ -530,7 +1245,7 @@ async def get_transaction_status(transaction_id: str):
                     "reason": f"Transaction is being processed by Airflow (status: {dag_status.get('state')})"
                 }
                                 
-                return base_result
+                return ORJSONResponse(content=base_result)
         except Exception as e:
             logger.warning(f"Could not find DAG run in Airflow: {str(e)}")
         
@@ -543,83 +1258,41 @@ async def get_transaction_status(transaction_id: str):
         logger.error(f"Error getting transaction status: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/dashboard/stats", response_model=DashboardStats)
+@app.get("/api/dashboard/stats")
 async def get_dashboard_stats():
     """
     Get statistics for the dashboard.
     """
     try:
-        # Find all transaction folders
-        all_results = []
+        # Serve from the cache if it is still fresh
+        if _stats_cache["value"] is not None and time.monotonic() - _stats_cache["ts"] < DASHBOARD_STATS_TTL:
+            return ORJSONResponse(content=_stats_cache["value"])
         
-        # Get all transaction folders
-        transaction_folders = list_transaction_results(RESULTS_FOLDER)
-        
-        # Process each transaction folder
-        for transaction_id in transaction_folders:
-            risk_assessment = load_transaction_data(RESULTS_FOLDER, transaction_id, "risk_assessment.json")
-            metadata = load_transaction_data(RESULTS_FOLDER, transaction_id, "metadata.json")
-            
-            if risk_assessment:
-                # Add timestamp from metadata if not present in risk assessment
-                if "timestamp" not in risk_assessment and metadata and "timestamp" in metadata:
-                    risk_assessment["timestamp"] = metadata["timestamp"]
-                
-                all_results.append(risk_assessment)
-        
-        # Then look for any legacy result files not in transaction folders
-        legacy_result_files = glob.glob(os.path.join(RESULTS_FOLDER, "result_*.json"))
-        
-        for result_file in legacy_result_files:
-            # Skip files we've already processed (transaction IDs we've seen)
-            file_txn_id = None
-            for prefix in ["result_", "result_aml_run_"]:
-                if os.path.basename(result_file).startswith(prefix):
-                    file_txn_id = os.path.basename(result_file).replace(prefix, "").split(".")[0]
-                    break
-            
-            if file_txn_id and file_txn_id in transaction_folders:
-                continue
-                
-            try:
-                with open(result_file, 'r', encoding='utf-8') as f:
-                    result = json.load(f)
-                
-                # Ensure the result has the necessary fields
-                if "transaction_id" in result and "risk_score" in result:
-                    # Add timestamp based on file creation time if not present
-                    if "timestamp" not in result:
-                        result["timestamp"] = datetime.fromtimestamp(
-                            os.path.getctime(result_file)
-                        ).isoformat()
-                    
-                    all_results.append(result)
-            except Exception as e:
-                logger.warning(f"Error reading result file {result_file}: {str(e)}")
-        
-        # Calculate dashboard statistics
-        total_transactions = len(all_results)
-        high_risk_transactions = sum(1 for r in all_results if r.get("risk_score", 0) >= 0.7)
-        medium_risk_transactions = sum(1 for r in all_results if 0.4 <= r.get("risk_score", 0) < 0.7)
-        low_risk_transactions = sum(1 for r in all_results if r.get("risk_score", 0) < 0.4)
+        # Aggregate the statistics in the transaction index, off the event loop
+        risk_stats = await asyncio.to_thread(transaction_index.get_risk_stats, 5)
         
         # Get recent transactions
         recent_transactions = []
-        for result in sorted(all_results, key=lambda x: x.get("timestamp", ""), reverse=True)[:5]:
+        for result in risk_stats["recent"]:
             recent_transactions.append({
-                "id": result.get("transaction_id", ""),
-                "timestamp": result.get("timestamp", datetime.now().isoformat()),
-                "risk": result.get("risk_score", 0),
+                "id": result["transaction_id"],
+                "timestamp": result["timestamp"],
+                "risk": result["risk_score"],
                 "status": "completed"
             })
         
-        return {
-            "totalTransactions": total_transactions,
-            "highRiskTransactions": high_risk_transactions,
-            "mediumRiskTransactions": medium_risk_transactions,
-            "lowRiskTransactions": low_risk_transactions,
+        stats = {
+            "totalTransactions": risk_stats["total"],
+            "highRiskTransactions": risk_stats["high"],
+            "mediumRiskTransactions": risk_stats["medium"],
+            "lowRiskTransactions": risk_stats["low"],
             "recentTransactions": recent_transactions
         }
+        _stats_cache["value"] = stats
+        _stats_cache["ts"] = time.monotonic()
+        
+        # Build the response directly; the counts and dicts are already well-formed
+        return ORJSONResponse(content=stats)
     
     except Exception as e:
         logger.error(f"Error getting dashboard stats: {traceback.format_exc()}")
@@ -632,144 +1305,76 @@ async def get_transactions(
     status: Optional[str] = None,
     search: Optional[str] = None,
     sort_by: Optional[str] = None,
-    sort_order: Optional[str] = None
+    sort_order: Optional[str] = None,
+    cursor: Optional[str] = None
 ):
     """
     Get a list of all transactions.
+    
+    With the default newest-first order, a full page carries an X-Next-Cursor
+    header; pass it back as `cursor` to fetch the next page. Cursor pagination
+    stays fast at any depth and is preferred over `offset`.
     """
     try:
-        all_transactions = []
-        
-        # Get all transaction folders from the results folder
-        transaction_folders = list_transaction_results(RESULTS_FOLDER)
-        
-        # Process each transaction folder
-        for transaction_id in transaction_folders:
-            risk_assessment = load_transaction_data(RESULTS_FOLDER, transaction_id, "risk_assessment.json")
-            metadata = load_transaction_data(RESULTS_FOLDER, transaction_id, "metadata.json")
-            
-            # Create transaction summary
-            summary = {
-                "transaction_id": transaction_id,
-                "timestamp": datetime.now().isoformat(),  # Default timestamp
-                "status": "processing",  # Default status
-                "risk_score": 0.0,  # Default risk score
-                "entities_count": 0  # Default entities count
-            }
-            
-            # Update with metadata information if available
-            if metadata:
-                if "timestamp" in metadata:
-                    summary["timestamp"] = metadata["timestamp"]
-                if "status" in metadata:
-                    summary["status"] = metadata["status"]
-            
-            # Update with risk assessment information if available
-            if risk_assessment:
-                summary["status"] = "completed"  # If we have a risk assessment, it's completed
-                summary["risk_score"] = risk_assessment.get("risk_score", 0.0)
-                summary["entities_count"] = len(risk_assessment.get("extracted_entities", []))
-            
-            all_transactions.append(summary)
-        
-        # Also check for legacy transaction records in the store
-        for transaction_id, info in transaction_store.items():
-            # Skip if already processed from folders
-            if transaction_id in transaction_folders:
-                continue
-                
-            summary = {
-                "transaction_id": transaction_id,
-                "timestamp": info.get("timestamp", datetime.now().isoformat()),
-                "status": info.get("status", "processing"),
-                "risk_score": 0.0,
-                "entities_count": 0
-            }
-            
-            # If it's completed and we have a result path, get more details
-            if info.get("status") == "completed" and info.get("result_path"):
-                try:
-                    with open(info["result_path"], 'r', encoding='utf-8') as f:
-                        result = json.load(f)
-                    
-                    summary["risk_score"] = result.get("risk_score", 0.0)
-                    summary["entities_count"] = len(result.get("extracted_entities", []))
-                except Exception as e:
-                    logger.warning(f"Error reading result file {info['result_path']}: {str(e)}")
-            
-            all_transactions.append(summary)
-        
-        # Look for any legacy result files not covered by folders or store
-        legacy_result_files = glob.glob(os.path.join(RESULTS_FOLDER, "result_*.json"))
-        
-        for result_file in legacy_result_files:
-            # Extract transaction ID from filename
-            file_txn_id = None
-            for prefix in ["result_", "result_aml_run_"]:
-                if os.path.basename(result_file).startswith(prefix):
-                    file_txn_id = os.path.basename(result_file).replace(prefix, "").split(".")[0]
-                    break
-            
-            # Skip if already processed
-            if file_txn_id and (file_txn_id in transaction_folders or 
-                              any(t["transaction_id"] == file_txn_id for t in all_transactions)):
-                continue
-                
+        after = None
+        if cursor:
+            if sort_by:
+                raise HTTPException(status_code=400, detail="cursor can't be combined with sort_by")
             try:
-                with open(result_file, 'r', encoding='utf-8') as f:
-                    result = json.load(f)
-                
-                transaction_id = result.get("transaction_id", os.path.basename(result_file).split('.')[0])
-                
-                # Skip if we already have this transaction
-                if any(t["transaction_id"] == transaction_id for t in all_transactions):
-                    continue
-                
-                # Get file creation time as a timestamp
-                file_timestamp = datetime.fromtimestamp(os.path.getctime(result_file)).isoformat()
-                
-                summary = {
-                    "transaction_id": transaction_id,
-                    "timestamp": result.get("timestamp", file_timestamp),
-                    "status": "completed",
-                    "risk_score": result.get("risk_score", 0.0),
-                    "entities_count": len(result.get("extracted_entities", []))
-                }
-                
-                all_transactions.append(summary)
-            except Exception as e:
-                logger.warning(f"Error reading result file {result_file}: {str(e)}")
-        
-        # Apply filters
-        filtered_transactions = all_transactions
-        
-        if status:
-            filtered_transactions = [t for t in filtered_transactions if t["status"] == status]
-        
-        if search:
-            filtered_transactions = [t for t in filtered_transactions if search.lower() in t["transaction_id"].lower()]
-        
-        # Apply sorting
-        if sort_by:
-            reverse = sort_order == "desc"
-            filtered_transactions.sort(key=lambda x: x.get(sort_by, ""), reverse=reverse)
-        else:
-            # Default sort by timestamp, newest first
-            filtered_transactions.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+                after = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        # Filter, sort and paginate in the transaction index so only the
+        # requested page is ever materialized
+        paginated_transactions = await asyncio.to_thread(
+            transaction_index.query_transactions,
+            status=status,
+            search=search,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            limit=limit,
+            offset=offset,
+            after=after
+        )
         
-        # Apply pagination
-        paginated_transactions = filtered_transactions[offset:offset + limit]
+        headers = {}
+        if not sort_by and len(paginated_transactions) == limit:
+            headers["X-Next-Cursor"] = encode_cursor(paginated_transactions[-1])
         
-        return paginated_transactions
+        return ORJSONResponse(content=paginated_transactions, headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting transactions: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
     
 # Add this to your api.py file, inside the FastAPI app
 
+def _conditional_json_response(request: Request, content: Any) -> fastapi.responses.Response:
+    """
+    Serialize content to JSON with an ETag, or answer 304 if the client already has it.
+    
+    Args:
+        request: The incoming request, checked for an If-None-Match header
+        content: The JSON-serializable response content
+        
+    Returns:
+        A 304 Not Modified response, or the JSON response with its ETag header
+    """
+    body = orjson.dumps(content)
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or
+                          etag in (tag.strip() for tag in if_none_match.split(","))):
+        return fastapi.responses.Response(status_code=304, headers={"ETag": etag})
+    
+    return fastapi.responses.Response(content=body, media_type="application/json", headers={"ETag": etag})
+
 @app.get("/api/transaction/{transaction_id}/files")
 @app.get("/api/transaction/{transaction_id}/files")
-async def get_transaction_files(transaction_id: str):
+async def get_transaction_files(transaction_id: str, request: Request):
     """
     Get all files and directories in the transaction folder with user-friendly names.
     """
@@ -777,13 +1382,15 @@ async def get_transaction_files(transaction_id: str):
         # Get the transaction folder path
         transaction_folder = os.path.join(RESULTS_FOLDER, transaction_id)
         
-        if not os.path.exists(transaction_folder):
+        if not await asyncio.to_thread(os.path.exists, transaction_folder):
             raise HTTPException(status_code=404, detail=f"Transaction folder for {transaction_id} not found")
         
-        # Use the knowledge base utility to get a structured view with display names
-        file_tree = get_knowledge_base_structure(RESULTS_FOLDER, transaction_id)
+        # Use the knowledge base utility to get a structured view with display names,
+        # off the event loop since it walks the folder
+        file_tree = await asyncio.to_thread(get_knowledge_base_structure, RESULTS_FOLDER, transaction_id)
         
-        return file_tree
+        # Polling clients get a 304 while the tree is unchanged
+        return _conditional_json_response(request, file_tree)
         
     except HTTPException:
         raise
@@ -791,8 +1398,29 @@ async def get_transaction_files(transaction_id: str):
         logger.error(f"Error getting transaction files: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error getting transaction files: {str(e)}")
     
+def _read_text_file(file_path: str) -> str:
+    """
+    Read a UTF-8 text file.
+    
+    This performs blocking file I/O and is meant to be run in a worker thread.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _is_indented_json(content: str) -> bool:
+    """
+    Check whether a JSON document is already pretty-printed, from its first line break.
+    """
+    content = content.lstrip()
+    if not content.startswith(('{', '[')):
+        return True
+    
+    rest = content[1:].lstrip(' \t')
+    return not rest or rest[0] in '\r\n' or rest[0] in '}]'
+
 @app.get("/api/transaction/{transaction_id}/files/{file_path:path}")
-async def get_transaction_file_content(transaction_id: str, file_path: str, download: bool = False):
+async def get_transaction_file_content(transaction_id: str, file_path: str, download: bool = False,
+                                       pretty: bool = True):
     """
     Get the content of a specific file in the transaction folder.
     
@@ -800,42 +1428,45 @@ async def get_transaction_file_content(transaction_id: str, file_path: str, down
         transaction_id: The ID of the transaction
         file_path: The relative path of the file within the transaction folder
         download: If True, returns the file as a download response
+        pretty: If True, JSON files that aren't already indented are pretty-printed
     """
     try:
         # Get the transaction folder path
         transaction_folder = os.path.join(RESULTS_FOLDER, transaction_id)
         file_full_path = os.path.join(transaction_folder, file_path)
         
-        if not os.path.exists(file_full_path):
+        # A single stat, off the event loop, answers existence, type and size
+        try:
+            file_stat = await asyncio.to_thread(os.stat, file_full_path)
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail=f"File {file_path} not found")
         
-        if os.path.isdir(file_full_path):
+        if stat.S_ISDIR(file_stat.st_mode):
             raise HTTPException(status_code=400, detail=f"{file_path} is a directory, not a file")
         
-        # For download mode, return the file as a download response
+        # For download mode, return the file as a download response; it is streamed
+        # in chunks and reuses the stat above instead of stat-ing the file again
         if download:
             return fastapi.responses.FileResponse(
                 path=file_full_path,
                 filename=os.path.basename(file_path),
-                media_type="application/octet-stream"
+                media_type="application/octet-stream",
+                stat_result=file_stat
             )
         
         # Check file size and reject if too large (e.g., > 5MB) for viewing
-        if os.path.getsize(file_full_path) > 5 * 1024 * 1024:
+        if file_stat.st_size > 5 * 1024 * 1024:
             return {"content": "[File too large to display. Use download option instead.]"}
         
         # For view mode, try to read file content as text
         try:
-            # First check if it's a JSON file
-            if file_path.lower().endswith('.json'):
-                with open(file_full_path, 'r', encoding='utf-8') as f:
-                    content = json.load(f)
-                    return {"content": json.dumps(content, indent=2)}
+            content = await asyncio.to_thread(_read_text_file, file_full_path)
             
-            # Otherwise read as plain text
-            with open(file_full_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                return {"content": content}
+            # JSON files are saved indented, so they are only re-formatted if needed
+            if pretty and file_path.lower().endswith('.json') and not _is_indented_json(content):
+                content = orjson.dumps(orjson.loads(content), option=orjson.OPT_INDENT_2).decode('utf-8')
+            
+            return {"content": content}
         except UnicodeDecodeError:
             # For binary files, return an appropriate message
             return {"content": "[Binary file content not displayed. Use the download option instead.]"}
@@ -846,6 +1477,90 @@ async def get_transaction_file_content(transaction_id: str, file_path: str, down
         logger.error(f"Error getting file content: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error getting file content: {str(e)}")
     
+async def _process_bulk_transaction(i: int, transaction_text: str, timestamp: str, wait: bool) -> Tuple[bool, Dict]:
+    """
+    Trigger (and optionally wait for) one transaction of a bulk upload.
+    
+    Args:
+        i: Index of the transaction in the upload
+        transaction_text: The transaction text
+        timestamp: Upload timestamp used in the transaction ID
+        wait: Whether to wait for processing to complete
+        
+    Returns:
+        Tuple of whether the transaction succeeded and its result or failure entry
+    """
+    try:
+        # Generate a unique transaction ID with timestamp and index
+        transaction_id = f"bulk_{timestamp}_{i}_{uuid.uuid4().hex[:8]}"
+        
+        # Register the completion event before triggering so an early callback is not missed
+        if wait:
+            pending_events[transaction_id] = asyncio.Event()
+        
+        try:
+            # Trigger Airflow DAG
+            status = await trigger_airflow_dag(transaction_text, transaction_id)
+            
+            if not wait:
+                # Just return the triggered status if not waiting
+                return True, {
+                    "transaction_id": transaction_id,
+                    "status": "processing",
+                    "run_id": status.run_id,
+                    "index": i
+                }
+            
+            # Wait for the Airflow callback if wait=True
+            max_wait_time = 600  # 10 minutes
+            risk_assessment, completed, state = await _wait_for_risk_assessment(
+                transaction_id, status, max_wait_time
+            )
+        finally:
+            pending_events.pop(transaction_id, None)
+        
+        if risk_assessment:
+            return True, {
+                "transaction_id": transaction_id,
+                "status": "completed",
+                "risk_score": risk_assessment.get("risk_score", 0),
+                "index": i
+            }
+        
+        if state in ['failed', 'error']:
+            return False, {
+                "transaction_id": transaction_id,
+                "status": "failed",
+                "error": f"Airflow DAG {status.dag_id} failed",
+                "index": i
+            }
+        
+        # The callback arrived but the run is still finishing; the result can be
+        # fetched from the status endpoint rather than reporting a timeout
+        if completed:
+            return True, {
+                "transaction_id": transaction_id,
+                "status": state or "processing",
+                "run_id": status.run_id,
+                "status_url": f"/api/transaction/{transaction_id}",
+                "index": i
+            }
+        
+        return False, {
+            "transaction_id": transaction_id,
+            "status": "timeout",
+            "error": "Timeout waiting for processing to complete",
+            "index": i
+        }
+        
+    except Exception as e:
+        logger.error(f"Error processing transaction {i}: {str(e)}")
+        return False, {
+            "index": i,
+            "error": str(e),
+            "status": "failed"
+        }
+
 @app.post("/api/transactions/bulk", response_model=Dict[str, Any])
 async def bulk_upload_transactions(
     request: Request,
@@ -916,76 +1631,26 @@ async def bulk_upload_transactions(
         results = []
         failed = []
         
-        for i, transaction_text in enumerate(transactions):
-            try:
-                # Generate a unique transaction ID with timestamp and index
-                timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-                transaction_id = f"bulk_{timestamp}_{i}_{uuid.uuid4().hex[:8]}"
-                
-                # Trigger Airflow DAG
-                status = await trigger_airflow_dag(transaction_text, transaction_id)
-                
-                if wait:
-                    # Start polling for completion if wait=True
-                    max_wait_time = 600  # 10 minutes
-                    start_time = time.time()
-                    
-                    while time.time() - start_time < max_wait_time:
-                        # Get the DAG run status
-                        dag_status = await check_dag_status(status.dag_id, status.run_id)
-                        
-                        if dag_status.get('state') == 'success':
-                            # Check for the risk assessment result
-                            risk_assessment = load_transaction_data(
-                                RESULTS_FOLDER, transaction_id, "risk_assessment.json"
-                            )
-                            
-                            if risk_assessment:
-                                results.append({
-                                    "transaction_id": transaction_id,
-                                    "status": "completed",
-                                    "risk_score": risk_assessment.get("risk_score", 0),
-                                    "index": i
-                                })
-                                break
-                        
-                        elif dag_status.get('state') in ['failed', 'error']:
-                            failed.append({
-                                "transaction_id": transaction_id,
-                                "status": "failed",
-                                "error": f"Airflow DAG {status.dag_id} failed",
-                                "index": i
-                            })
-                            break
-                        
-                        # Wait before checking again
-                        await asyncio.sleep(5)
-                    
-                    # If we timeout waiting
-                    if time.time() - start_time >= max_wait_time:
-                        failed.append({
-                            "transaction_id": transaction_id,
-                            "status": "timeout",
-                            "error": "Timeout waiting for processing to complete",
-                            "index": i
-                        })
-                
-                else:
-                    # Just return the triggered status if not waiting
-                    results.append({
-                        "transaction_id": transaction_id,
-                        "status": "processing",
-                        "run_id": status.run_id,
-                        "index": i
-                    })
-                    
-            except Exception as e:
-                logger.error(f"Error processing transaction {i}: {str(e)}")
-                failed.append({
-                    "index": i,
-                    "error": str(e),
-                    "status": "failed"
-                })
+        # Transactions in the batch share the upload timestamp; the index and
+        # random suffix keep their IDs unique
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        
+        # Process the transactions concurrently, with a bounded number in flight
+        semaphore = asyncio.Semaphore(BULK_UPLOAD_CONCURRENCY)
+        
+        async def process_bounded(i: int, transaction_text: str) -> Tuple[bool, Dict]:
+            async with semaphore:
+                return await _process_bulk_transaction(i, transaction_text, timestamp, wait)
+        
+        outcomes = await asyncio.gather(
+            *(process_bounded(i, transaction_text) for i, transaction_text in enumerate(transactions))
+        )
+        
+        for succeeded, outcome in outcomes:
+            if succeeded:
+                results.append(outcome)
+            else:
+                failed.append(outcome)
         
         # Return a summary of processed transactions
         return {
@@ -1005,8 +1670,6 @@ async def bulk_upload_transactions(
     
 # Add these endpoints to your api.py file
 
-from utils.neo4j_utils import get_entity_history_from_neo4j
-
 @app.get("/api/entity/history/{entity_name}")
 async def get_entity_history(entity_name: str, entity_type: str = None):
     """
@@ -1020,7 +1683,7 @@ async def get_entity_history(entity_name: str, entity_type: str = None):
         Historical data for the entity
     """
     try:
-        history = get_entity_history_from_neo4j(entity_name, entity_type)
+        history = await asyncio.to_thread(get_neo4j_manager().get_entity_history, entity_name, entity_type)
         return history
     except Exception as e:
         logger.error(f"Error retrieving entity history: {str(e)}")
@@ -1042,7 +1705,7 @@ async def get_transaction_entity_history(transaction_id: str):
     """
     try:
         # Load the entities from the transaction folder
-        entities = load_transaction_data(RESULTS_FOLDER, transaction_id, "entities.json")
+        entities = await asyncio.to_thread(load_transaction_data, RESULTS_FOLDER, transaction_id, "entities.json")
         
         if not entities:
             raise HTTPException(
@@ -1051,18 +1714,16 @@ async def get_transaction_entity_history(transaction_id: str):
             )
         
         # Load history if it exists
-        history = load_transaction_data(RESULTS_FOLDER, transaction_id, "entity_history.json")
+        history = await asyncio.to_thread(load_transaction_data, RESULTS_FOLDER, transaction_id, "entity_history.json")
         
         if history:
             return history
         
         # If history doesn't exist in the transaction folder, retrieve it from Neo4j
-        from utils.neo4j_utils import get_entities_history_from_neo4j
-        
-        history = get_entities_history_from_neo4j(entities)
+        history = await asyncio.to_thread(get_neo4j_manager().get_entities_history, entities)
         
         # Save the history data to the transaction folder
-        save_transaction_data(RESULTS_FOLDER, transaction_id, "entity_history.json", history)
+        await asyncio.to_thread(save_transaction_data, RESULTS_FOLDER, transaction_id, "entity_history.json", history)
         
         return history
     except HTTPException:
@@ -1074,8 +1735,95 @@ async def get_transaction_entity_history(transaction_id: str):
             detail=f"Error retrieving transaction entity history: {str(e)}"
         )
 
+def _query_transaction_network(transaction_id: str) -> Dict[str, List[Dict]]:
+    """
+    Query the network of a transaction from Neo4j.
+    
+    Args:
+        transaction_id: The ID of the transaction
+        
+    Returns:
+        Network visualization data (nodes and links)
+    """
+    # Query the transaction network over the shared Neo4j driver
+    neo4j = get_neo4j_manager()
+    if not neo4j.driver and not neo4j.connect():
+        raise HTTPException(
+            status_code=500, 
+            detail="Could not connect to Neo4j database"
+        )
+    
+    with neo4j.driver.session(database=neo4j.database) as session:
+        # Query to get the transaction network
+        result = session.run("""
+            MATCH (t:Transaction {id: $transaction_id})
+            CALL {
+                WITH t
+                MATCH path = (t)-[r1*1..2]-(e)
+                RETURN path
+                UNION
+                WITH t
+                MATCH path = (e1)-[r1]-(t)-[r2]-(e2)
+                RETURN path
+            }
+            WITH DISTINCT relationships(path) AS rels, nodes(path) AS nodes
+            UNWIND nodes AS node
+            UNWIND rels AS rel
+            WITH COLLECT(DISTINCT node) AS nodes, COLLECT(DISTINCT rel) AS relationships
+            // Only the properties the visualization uses are returned, not whole graph objects
+            RETURN [n IN nodes | {
+                       id: coalesce(n.id, toString(id(n))),
+                       labels: labels(n),
+                       name: n.name,
+                       risk: n.risk_score
+                   }] AS nodes,
+                   [r IN relationships | {
+                       source: coalesce(startNode(r).id, toString(id(startNode(r)))),
+                       target: coalesce(endNode(r).id, toString(id(endNode(r)))),
+                       label: coalesce(r.role, type(r))
+                   }] AS links
+        """, {"transaction_id": transaction_id})
+        
+        record = result.single()
+        if not record:
+            return {"nodes": [], "links": []}
+        
+        # Process nodes
+        nodes = []
+        node_ids = set()
+        for node in record["nodes"]:
+            node_id = node["id"]
+            
+            # Skip duplicates
+            if node_id in node_ids:
+                continue
+            
+            node_ids.add(node_id)
+            
+            # Determine node type based on labels
+            node_type = next((label for label in node["labels"] if label in NETWORK_NODE_TYPES), "Unknown")
+            
+            # Get node properties
+            node_info = {
+                "id": node_id,
+                "label": node_id if node_type == "Transaction" or node["name"] is None else node["name"],
+                "type": node_type
+            }
+            
+            # Add risk score if available
+            if node["risk"] is not None:
+                node_info["risk"] = node["risk"]
+            
+            nodes.append(node_info)
+        
+        # Relationships are already projected to links by the query
+        return {
+            "nodes": nodes,
+            "links": record["links"]
+        }
+
 @app.get("/api/transaction/{transaction_id}/network")
-async def get_transaction_network(transaction_id: str, depth: int = 2):
+async def get_transaction_network(transaction_id: str, request: Request, depth: int = 2):
     """
     Get the network visualization data for a transaction.
     
@@ -1087,95 +1835,26 @@ async def get_transaction_network(transaction_id: str, depth: int = 2):
         Network visualization data (nodes and links)
     """
     try:
-        # Connect to Neo4j and query the transaction network
-        with Neo4jManager() as neo4j:
-            if not neo4j.driver:
-                raise HTTPException(
-                    status_code=500, 
-                    detail="Could not connect to Neo4j database"
-                )
-                
-            with neo4j.driver.session(database=neo4j.database) as session:
-                # Query to get the transaction network
-                result = session.run("""
-                    MATCH (t:Transaction {id: $transaction_id})
-                    CALL {
-                        WITH t
-                        MATCH path = (t)-[r1*1..2]-(e)
-                        RETURN path
-                        UNION
-                        WITH t
-                        MATCH path = (e1)-[r1]-(t)-[r2]-(e2)
-                        RETURN path
-                    }
-                    WITH DISTINCT relationships(path) AS rels, nodes(path) AS nodes
-                    UNWIND nodes AS node
-                    UNWIND rels AS rel
-                    RETURN COLLECT(DISTINCT node) AS nodes, COLLECT(DISTINCT rel) AS relationships
-                """, {"transaction_id": transaction_id})
-                
-                record = result.single()
-                if not record:
-                    return {"nodes": [], "links": []}
-                
-                # Process nodes
-                nodes = []
-                node_ids = set()
-                for node in record["nodes"]:
-                    node_data = dict(node)
-                    node_id = node_data.get("id", str(node.id))
-                    
-                    # Skip duplicates
-                    if node_id in node_ids:
-                        continue
-                    
-                    node_ids.add(node_id)
-                    
-                    # Determine node type based on labels
-                    node_type = "Unknown"
-                    for label in node.labels:
-                        if label in ["Organization", "Person", "Transaction"]:
-                            node_type = label
-                            break
-                    
-                    # Get node properties
-                    node_info = {
-                        "id": node_id,
-                        "label": node_data.get("name", node_id) if node_type != "Transaction" else node_id,
-                        "type": node_type
-                    }
-                    
-                    # Add risk score if available
-                    if "risk_score" in node_data:
-                        node_info["risk"] = node_data["risk_score"]
-                    
-                    nodes.append(node_info)
-                
-                # Process relationships
-                links = []
-                for rel in record["relationships"]:
-                    rel_data = dict(rel)
-                    source_id = rel.start_node.get("id", str(rel.start_node.id))
-                    target_id = rel.end_node.get("id", str(rel.end_node.id))
-                    
-                    # Get relationship properties
-                    link_info = {
-                        "source": source_id,
-                        "target": target_id,
-                        "label": rel.type
-                    }
-                    
-                    # Add role if available
-                    if "role" in rel_data:
-                        link_info["label"] = rel_data["role"]
-                    
-                    links.append(link_info)
-                
-                return {
-                    "nodes": nodes,
-                    "links": links
-                }
-                
+        now = time.monotonic()
+        
+        # The query always spans two hops, so depth isn't part of the key
+        cached = _network_cache.get(transaction_id)
+        if cached and cached[0] > now:
+            return _conditional_json_response(request, cached[1])
+        
+        # Query Neo4j off the event loop, since the driver is synchronous
+        network = await asyncio.to_thread(_query_transaction_network, transaction_id)
+        
+        # Drop expired entries so the cache stays bounded
+        if len(_network_cache) >= NETWORK_CACHE_SIZE:
+            for expired_key in [k for k, (deadline, _) in _network_cache.items() if deadline <= now]:
+                del _network_cache[expired_key]
+        
+        if len(_network_cache) < NETWORK_CACHE_SIZE:
+            _network_cache[transaction_id] = (now + NETWORK_CACHE_TTL, network)
+        
+        return _conditional_json_response(request, network)
+        
     except Exception as e:
         logger.error(f"Error getting transaction network: {str(e)}")
         raise HTTPException(
@@ -1,13 +1,50 @@
 import os
-import json
 import logging
 import shutil
-from typing import Dict, List
+import functools
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+import orjson
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Folder trees built by get_knowledge_base_structure, keyed by transaction folder
+# and stored with the tree signature they were built from; least recently used
+# trees are evicted beyond FOLDER_TREE_CACHE_SIZE
+FOLDER_TREE_CACHE_SIZE = 256
+_folder_tree_cache: "OrderedDict[str, Tuple[tuple, List[Dict]]]" = OrderedDict()
+
+# Marker file written once the folder hierarchy of a transaction is complete
+KB_INITIALIZED_FILE = ".kb_initialized"
+
+
+def _flatten_structure(structure: Dict, parent_path: str = "") -> Tuple[Tuple[str, str, str], ...]:
+    """
+    Flatten a folder structure definition into (relative path, display name, description) tuples.
+
+    Parents are listed before their subfolders, so the folders can be created in order.
+
+    Args:
+        structure: The structure definition
+        parent_path: Path of the structure relative to the transaction folder
+
+    Returns:
+        A tuple of (relative path, display name, description) tuples
+    """
+    folders = []
+    for folder_name, folder_info in structure.items():
+        folder_path = os.path.join(parent_path, folder_name)
+        folders.append((
+            folder_path,
+            folder_info.get("display_name", folder_name),
+            folder_info.get("description", ""),
+        ))
+        folders.extend(_flatten_structure(folder_info.get("subfolders") or {}, folder_path))
+    return tuple(folders)
+
 
 class KnowledgeBaseFolderStructure:
     """
@@ -42,6 +79,9 @@ class KnowledgeBaseFolderStructure:
         "risk_assessments": {"display_name": "Risk Assessments", "subfolders": {}},
     }
 
+    # FOLDER_STRUCTURE flattened once, instead of walked on every transaction
+    FLATTENED_STRUCTURE = _flatten_structure(FOLDER_STRUCTURE)
+
     def __init__(self, results_folder: str):
         """
         Initialize with the base results folder path.
@@ -71,57 +111,44 @@ class KnowledgeBaseFolderStructure:
             # Create metadata file with folder descriptions
             self._create_folder_metadata(transaction_folder)
 
+        # The hierarchy of a transaction only needs to be created once
+        initialized_file = os.path.join(transaction_folder, KB_INITIALIZED_FILE)
+        if os.path.exists(initialized_file):
+            return transaction_folder
+
         # Create the structured subfolder hierarchy
         self._create_folder_hierarchy(transaction_folder)
+        open(initialized_file, "a").close()
 
         return transaction_folder
 
-    def _create_folder_hierarchy(
-        self, base_folder: str, structure: Dict = None, parent_path: str = ""
-    ):
+    def _create_folder_hierarchy(self, base_folder: str):
         """
-        Recursively create the folder hierarchy based on the defined structure.
+        Create the folder hierarchy based on the defined structure.
 
         Args:
             base_folder: The base folder where to create the structure
-            structure: The structure definition (defaults to FOLDER_STRUCTURE)
-            parent_path: Path relative to base_folder for nested calls
         """
-        if structure is None:
-            structure = self.FOLDER_STRUCTURE
-
-        for folder_name, folder_info in structure.items():
-            folder_path = os.path.join(base_folder, parent_path, folder_name)
-
-            # Create folder if it doesn't exist
-            if not os.path.exists(folder_path):
-                os.makedirs(folder_path, exist_ok=True)
-
-                # Create a .metadata.json file with display information
-                metadata_file = os.path.join(folder_path, ".metadata.json")
-                with open(metadata_file, "w", encoding="utf-8") as f:
-                    json.dump(
-                        {
-                            "display_name": folder_info.get(
-                                "display_name", folder_name
-                            ),
-                            "description": folder_info.get("description", ""),
-                            "created_at": datetime.now().isoformat(),
-                        },
-                        f,
-                        indent=2,
-                    )
-
-            # Process subfolders if any
-            if "subfolders" in folder_info and folder_info["subfolders"]:
-                new_parent = (
-                    os.path.join(parent_path, folder_name)
-                    if parent_path
-                    else folder_name
-                )
-                self._create_folder_hierarchy(
-                    base_folder, folder_info["subfolders"], new_parent
-                )
+        for folder_path, display_name, description in self.FLATTENED_STRUCTURE:
+            folder_path = os.path.join(base_folder, folder_path)
+
+            # Create folder if it doesn't exist, keeping the metadata of existing ones
+            try:
+                os.makedirs(folder_path)
+            except FileExistsError:
+                continue
+
+            # Create a .metadata.json file with display information
+            metadata_file = os.path.join(folder_path, ".metadata.json")
+            with open(metadata_file, "wb") as f:
+                f.write(orjson.dumps(
+                    {
+                        "display_name": display_name,
+                        "description": description,
+                        "created_at": datetime.now().isoformat(),
+                    },
+                    option=orjson.OPT_INDENT_2,
+                ))
 
     def _create_folder_metadata(self, folder_path: str) -> None:
         """
@@ -149,8 +176,8 @@ class KnowledgeBaseFolderStructure:
             },
         }
 
-        with open(metadata_file, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2)
+        with open(metadata_file, "wb") as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
 
     def migrate_existing_transaction(self, transaction_id: str) -> bool:
         """
@@ -219,63 +246,122 @@ class KnowledgeBaseFolderStructure:
             # Ensure target directory exists
             os.makedirs(os.path.dirname(target_path), exist_ok=True)
 
+            # Files and folders are moved with a rename, as source and target are in
+            # the same transaction folder; shutil.move only falls back to copying
+            # across filesystems
+
             # If it's a file, move it
             if os.path.isfile(source_path):
-                # Copy the file to new location if it doesn't already exist
+                # Move the file to new location if it doesn't already exist
                 if not os.path.exists(target_path):
-                    shutil.copy2(source_path, target_path)
-                # Remove the original file
-                os.remove(source_path)
+                    shutil.move(source_path, target_path)
+                else:
+                    # Remove the original file
+                    os.remove(source_path)
 
-            # If it's a directory, move its contents
+            # If it's a directory, move it with its contents
             elif os.path.isdir(source_path) and not os.path.exists(target_path):
-                shutil.copytree(source_path, target_path)
-                # Remove the original directory
-                shutil.rmtree(source_path)
+                shutil.move(source_path, target_path)
+
+
+# Display names of well-known folders without metadata
+_DISPLAY_NAMES = {
+    "organization_results": "Organizations",
+    "people_results": "People",
+    "opencorporates": "Corporate Registry",
+    "sanctions": "Sanctions Screening",
+    "wikidata": "Entity Network",
+    "news": "Adverse Media",
+    "pep": "Politically Exposed Persons",
+}
+
+# Descriptions of well-known folders without metadata
+_DESCRIPTIONS = {
+    "entity_data": "Detailed information about entities involved in the transaction",
+    "organization_results": "Data related to organizations identified in the transaction",
+    "people_results": "Data related to individuals identified in the transaction",
+    "analysis_reports": "Analytical reports generated during risk assessment",
+    "risk_assessments": "Final risk assessment results and supporting evidence",
+    "opencorporates": "Corporate registry information from official sources",
+    "sanctions": "Sanctions screening results from global sanctions lists",
+    "wikidata": "Entity network and relationship information",
+    "news": "Adverse media mentions and news articles",
+    "pep": "Politically Exposed Persons screening results",
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _read_metadata(metadata_path: str, mtime_ns: int) -> Dict:
+    """
+    Read a folder metadata file.
 
+    The modification time is part of the cache key, so a rewritten file is read again.
+
+    Args:
+        metadata_path: Path to the .metadata.json file
+        mtime_ns: Modification time of the file in nanoseconds
 
-def get_display_name_from_path(path: str) -> str:
+    Returns:
+        The metadata, or an empty dict if the file can't be read
+    """
+    try:
+        with open(metadata_path, "rb") as f:
+            metadata = orjson.loads(f.read())
+    except Exception:
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def _get_folder_metadata(path: str, is_dir: Optional[bool]) -> Dict:
+    """
+    Get the metadata of a folder.
+
+    Args:
+        path: The folder path
+        is_dir: Whether the path is a folder, if already known
+
+    Returns:
+        The metadata, or an empty dict if the path has none
+    """
+    if is_dir is False:
+        return {}
+
+    metadata_path = os.path.join(path, ".metadata.json")
+    try:
+        mtime_ns = os.stat(metadata_path).st_mtime_ns
+    except OSError:
+        # Also covers paths that are files rather than folders
+        return {}
+    return _read_metadata(metadata_path, mtime_ns)
+
+
+def get_display_name_from_path(path: str, is_dir: Optional[bool] = None) -> str:
     """
     Get a user-friendly display name from a folder path or filename.
 
     Args:
         path: The folder path or filename
+        is_dir: Whether the path is a folder rather than a file, if already known;
+            saves stat calls
 
     Returns:
         A user-friendly display name
     """
     # Check if it's a folder with metadata
-    metadata_path = os.path.join(path, ".metadata.json")
-    if os.path.isdir(path) and os.path.exists(metadata_path):
-        try:
-            with open(metadata_path, "r", encoding="utf-8") as f:
-                metadata = json.load(f)
-                if "display_name" in metadata:
-                    return metadata["display_name"]
-        except Exception:
-            pass
+    metadata = _get_folder_metadata(path, is_dir)
+    if "display_name" in metadata:
+        return metadata["display_name"]
 
     # Extract the base name
     base_name = os.path.basename(path)
 
     # Handle special cases
-    if base_name == "organization_results":
-        return "Organizations"
-    elif base_name == "people_results":
-        return "People"
-    elif base_name == "opencorporates":
-        return "Corporate Registry"
-    elif base_name == "sanctions":
-        return "Sanctions Screening"
-    elif base_name == "wikidata":
-        return "Entity Network"
-    elif base_name == "news":
-        return "Adverse Media"
-    elif base_name == "pep":
-        return "Politically Exposed Persons"
+    display_name = _DISPLAY_NAMES.get(base_name)
+    if display_name:
+        return display_name
 
     # For files, remove extension and transform to title case
-    if os.path.isfile(path):
+    if is_dir is False or (is_dir is None and os.path.isfile(path)):
         name_parts = os.path.splitext(base_name)[0].split("_")
         return " ".join(part.capitalize() for part in name_parts)
 
@@ -283,52 +369,24 @@ def get_display_name_from_path(path: str) -> str:
     return " ".join(word.capitalize() for word in base_name.split("_"))
 
 
-def get_folder_description(path: str) -> str:
+def get_folder_description(path: str, is_dir: Optional[bool] = None) -> str:
     """
     Get a description for a folder if available from metadata.
 
     Args:
         path: The folder path
+        is_dir: Whether the path is a folder, if already known; saves a stat call
 
     Returns:
         A description string or empty string if not available
     """
     # Check if it's a folder with metadata
-    metadata_path = os.path.join(path, ".metadata.json")
-    if os.path.isdir(path) and os.path.exists(metadata_path):
-        try:
-            with open(metadata_path, "r", encoding="utf-8") as f:
-                metadata = json.load(f)
-                if "description" in metadata:
-                    return metadata["description"]
-        except Exception:
-            pass
+    metadata = _get_folder_metadata(path, is_dir)
+    if "description" in metadata:
+        return metadata["description"]
 
     # Default descriptions for common folders
-    base_name = os.path.basename(path)
-
-    if base_name == "entity_data":
-        return "Detailed information about entities involved in the transaction"
-    elif base_name == "organization_results":
-        return "Data related to organizations identified in the transaction"
-    elif base_name == "people_results":
-        return "Data related to individuals identified in the transaction"
-    elif base_name == "analysis_reports":
-        return "Analytical reports generated during risk assessment"
-    elif base_name == "risk_assessments":
-        return "Final risk assessment results and supporting evidence"
-    elif base_name == "opencorporates":
-        return "Corporate registry information from official sources"
-    elif base_name == "sanctions":
-        return "Sanctions screening results from global sanctions lists"
-    elif base_name == "wikidata":
-        return "Entity network and relationship information"
-    elif base_name == "news":
-        return "Adverse media mentions and news articles"
-    elif base_name == "pep":
-        return "Politically Exposed Persons screening results"
-
-    return ""
+    return _DESCRIPTIONS.get(os.path.basename(path), "")
 
 def build_folder_tree_with_display_names(base_folder: str, parent_path: str = "") -> List[Dict]:
     """
@@ -344,18 +402,24 @@ def build_folder_tree_with_display_names(base_folder: str, parent_path: str = ""
     tree = []
     
     try:
-        for item in sorted(os.listdir(base_folder)):
+        # scandir entries carry their file type and cached stat, saving a stat call per item
+        with os.scandir(base_folder) as entries:
+            sorted_entries = sorted(entries, key=lambda entry: entry.name)
+
+        for entry in sorted_entries:
+            item = entry.name
+
             # Skip hidden files and metadata
             if item.startswith('.'):
                 continue
                 
-            item_path = os.path.join(base_folder, item)
+            item_path = entry.path
             current_path = os.path.join(parent_path, item) if parent_path else item
             
-            if os.path.isdir(item_path):
+            if entry.is_dir():
                 # It's a directory
-                display_name = get_display_name_from_path(item_path)
-                description = get_folder_description(item_path)
+                display_name = get_display_name_from_path(item_path, is_dir=True)
+                description = get_folder_description(item_path, is_dir=True)
                 
                 # Recursively get children
                 children = build_folder_tree_with_display_names(item_path, current_path)
@@ -370,8 +434,8 @@ def build_folder_tree_with_display_names(base_folder: str, parent_path: str = ""
                 })
             else:
                 # It's a file
-                display_name = get_display_name_from_path(item_path)
-                file_size = os.path.getsize(item_path)
+                display_name = get_display_name_from_path(item_path, is_dir=False)
+                file_size = entry.stat().st_size
                 
                 tree.append({
                     "name": item,
@@ -438,4 +502,55 @@ def get_knowledge_base_structure(
     if not os.path.exists(transaction_folder):
         return []
 
-    return build_folder_tree_with_display_names(transaction_folder)
+    # Reuse the previous tree unless an entry was added, removed or renamed in it;
+    # files rewritten in place are covered by invalidate_knowledge_base_structure
+    signature = _get_folder_tree_signature(transaction_folder)
+    cached = _folder_tree_cache.get(transaction_folder)
+    if cached and cached[0] == signature:
+        _folder_tree_cache.move_to_end(transaction_folder)
+        return cached[1]
+
+    tree = build_folder_tree_with_display_names(transaction_folder)
+    _folder_tree_cache[transaction_folder] = (signature, tree)
+    _folder_tree_cache.move_to_end(transaction_folder)
+    while len(_folder_tree_cache) > FOLDER_TREE_CACHE_SIZE:
+        _folder_tree_cache.popitem(last=False)
+    return tree
+
+
+def _get_folder_tree_signature(folder: str) -> tuple:
+    """
+    Get the modification times of a folder and all of its subfolders.
+
+    The signature changes whenever an entry is added, removed or renamed anywhere
+    in the tree. Only folders are stat'ed, so the cost doesn't grow with the
+    number of files.
+
+    Args:
+        folder: The root folder
+
+    Returns:
+        A tuple of (path, mtime) pairs for the folders
+    """
+    signature = []
+    pending = [folder]
+
+    while pending:
+        path = pending.pop()
+        signature.append((path, os.stat(path).st_mtime_ns))
+        with os.scandir(path) as entries:
+            # scandir entries carry their file type, so files are skipped without a stat call
+            pending.extend(entry.path for entry in entries if entry.is_dir())
+
+    return tuple(signature)
+
+
+def invalidate_knowledge_base_structure(results_folder: str, transaction_id: str) -> None:
+    """
+    Drop the cached folder tree of a transaction, e.g. after a file in it was rewritten.
+
+    Args:
+        results_folder: Base results folder path
+        transaction_id: Transaction ID
+    """
+    _folder_tree_cache.pop(os.path.join(results_folder, transaction_id), None)
@@ -26,12 +26,14 @@ NEO4J_URI = os.environ.get('NEO4J_URI', 'bolt://neo4j:7687')
 NEO4J_USER = os.environ.get('NEO4J_USER', 'neo4j')
 NEO4J_PASSWORD = os.environ.get('NEO4J_PASSWORD', 'password')
 NEO4J_DATABASE = os.environ.get('NEO4J_DATABASE', 'neo4j')
+NEO4J_MAX_CONNECTION_POOL_SIZE = int(os.environ.get('NEO4J_MAX_CONNECTION_POOL_SIZE', '50'))
 
 class Neo4jManager:
     """
     Manager class for Neo4j database operations.
     """
-    def __init__(self, uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD, database=NEO4J_DATABASE):
+    def __init__(self, uri=NEO4J_URI, user=NEO4J_USER, password=NEO4J_PASSWORD, database=NEO4J_DATABASE,
+                 max_connection_pool_size=NEO4J_MAX_CONNECTION_POOL_SIZE):
         """
         Initialize the Neo4j connection.
         
@@ -40,11 +42,13 @@ class Neo4jManager:
             user: Neo4j username
             password: Neo4j password
             database: Neo4j database name
+            max_connection_pool_size: Maximum number of pooled driver connections
         """
         self.uri = uri
         self.user = user
         self.password = password
         self.database = database
+        self.max_connection_pool_size = max_connection_pool_size
         self.driver = None
         
     def connect(self):
@@ -57,7 +61,8 @@ class Neo4jManager:
         try:
             self.driver = GraphDatabase.driver(
                 self.uri, 
-                auth=basic_auth(self.user, self.password)
+                auth=basic_auth(self.user, self.password),
+                max_connection_pool_size=self.max_connection_pool_size
             )
             # Test the connection
             with self.driver.session(database=self.database) as session:
@@ -103,9 +108,34 @@ class Neo4jManager:
                 if not self.connect():
                     return False
                     
-            with self.driver.session(database=self.database) as session:
+            timestamp = datetime.now().isoformat()
+            
+            # Create entity nodes and relationships
+            organizations = entities_data.get("organizations", [])
+            people = entities_data.get("people", [])
+            
+            org_rows = [
+                {
+                    "name": org.get("name", ""),
+                    "type": org.get("entity_type", "Corporation"),
+                    "jurisdiction": org.get("jurisdiction", ""),
+                    "role": org.get("role", "unknown")
+                }
+                for org in organizations if org.get("name", "")
+            ]
+            
+            person_rows = [
+                {
+                    "name": person.get("name", ""),
+                    "country": person.get("country", ""),
+                    "role": person.get("role", "unknown")
+                }
+                for person in people if person.get("name", "")
+            ]
+            
+            def write_transaction(tx):
                 # Create Transaction node
-                session.run("""
+                tx.run("""
                     CREATE (t:Transaction {
                         id: $transaction_id,
                         timestamp: $timestamp,
@@ -115,111 +145,62 @@ class Neo4jManager:
                     })
                 """, {
                     "transaction_id": transaction_id,
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": timestamp,
                     "risk_score": risk_assessment.get("risk_score", 0.0),
                     "confidence_score": risk_assessment.get("confidence_score", 0.0),
                     "reason": risk_assessment.get("reason", "")
                 })
                 
-                # Create entity nodes and relationships
-                organizations = entities_data.get("organizations", [])
-                people = entities_data.get("people", [])
-                
-                # Store organizations
-                for org in organizations:
-                    org_name = org.get("name", "")
-                    if not org_name:
-                        continue
-                        
-                    org_type = org.get("entity_type", "Corporation")
-                    jurisdiction = org.get("jurisdiction", "")
-                    role = org.get("role", "unknown")
-                    
-                    # Merge the organization node (create if not exists, update if exists)
-                    session.run("""
-                        MERGE (o:Organization {name: $name})
+                # Merge all organization nodes (create if not exists, update if exists)
+                if org_rows:
+                    tx.run("""
+                        UNWIND $rows AS row
+                        MERGE (o:Organization {name: row.name})
                         ON CREATE SET 
-                            o.type = $type,
-                            o.jurisdiction = $jurisdiction,
+                            o.type = row.type,
+                            o.jurisdiction = row.jurisdiction,
                             o.first_seen = $timestamp
                         ON MATCH SET 
                             o.last_seen = $timestamp,
-                            o.jurisdiction = CASE WHEN $jurisdiction <> '' 
-                                                THEN $jurisdiction 
+                            o.jurisdiction = CASE WHEN row.jurisdiction <> '' 
+                                                THEN row.jurisdiction 
                                                 ELSE o.jurisdiction 
                                            END
-                        WITH o
+                        WITH o, row
                         MATCH (t:Transaction {id: $transaction_id})
-                        MERGE (o)-[r:INVOLVED_IN {role: $role}]->(t)
+                        MERGE (o)-[r:INVOLVED_IN {role: row.role}]->(t)
                     """, {
-                        "name": org_name,
-                        "type": org_type,
-                        "jurisdiction": jurisdiction,
-                        "timestamp": datetime.now().isoformat(),
-                        "transaction_id": transaction_id,
-                        "role": role
+                        "rows": org_rows,
+                        "timestamp": timestamp,
+                        "transaction_id": transaction_id
                     })
-                    
-                # Store people
-                for person in people:
-                    person_name = person.get("name", "")
-                    if not person_name:
-                        continue
-                        
-                    role = person.get("role", "unknown")
-                    country = person.get("country", "")
-                    
-                    # Merge the person node
-                    session.run("""
-                        MERGE (p:Person {name: $name})
+                
+                # Merge all person nodes
+                if person_rows:
+                    tx.run("""
+                        UNWIND $rows AS row
+                        MERGE (p:Person {name: row.name})
                         ON CREATE SET 
-                            p.country = $country,
+                            p.country = row.country,
                             p.first_seen = $timestamp
                         ON MATCH SET 
                             p.last_seen = $timestamp,
-                            p.country = CASE WHEN $country <> '' 
-                                            THEN $country 
+                            p.country = CASE WHEN row.country <> '' 
+                                            THEN row.country 
                                             ELSE p.country 
                                        END
-                        WITH p
+                        WITH p, row
                         MATCH (t:Transaction {id: $transaction_id})
-                        MERGE (p)-[r:INVOLVED_IN {role: $role}]->(t)
+                        MERGE (p)-[r:INVOLVED_IN {role: row.role}]->(t)
                     """, {
-                        "name": person_name,
-                        "country": country,
-                        "timestamp": datetime.now().isoformat(),
-                        "transaction_id": transaction_id,
-                        "role": role
+                        "rows": person_rows,
+                        "timestamp": timestamp,
+                        "transaction_id": transaction_id
                     })
-                    
-                # Add discovered relationships between people and organizations
-                for org in organizations:
-                    org_name = org.get("name", "")
-                    if not org_name:
-                        continue
-                        
-                    # Look for related people in the data
-                    org_data = entities_data.get("organizations", {}).get(org_name, {})
-                    wikidata_result = org_data.get("wikidata", {})
-                    
-                    if wikidata_result and "associated_people" in wikidata_result:
-                        for related_person in wikidata_result["associated_people"]:
-                            person_name = related_person.get("name", "")
-                            person_role = related_person.get("role", "associated")
-                            
-                            if person_name:
-                                # Create relationship between person and organization
-                                session.run("""
-                                    MATCH (p:Person {name: $person_name})
-                                    MATCH (o:Organization {name: $org_name})
-                                    MERGE (p)-[r:ASSOCIATED_WITH {role: $role}]->(o)
-                                    ON CREATE SET r.since = $timestamp
-                                """, {
-                                    "person_name": person_name,
-                                    "org_name": org_name,
-                                    "role": person_role,
-                                    "timestamp": datetime.now().isoformat()
-                                })
+            
+            # All entities are written in one transaction, one statement per kind
+            with self.driver.session(database=self.database) as session:
+                session.execute_write(write_transaction)
                 
                 logger.info(f"Transaction {transaction_id} successfully stored in Neo4j")
                 return True
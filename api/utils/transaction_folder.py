@@ -1,12 +1,86 @@
 import os
 import json
+import uuid
 import logging
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Callable, Tuple
 
-from utils.knowledge_base_utils import initialize_knowledge_base
+import orjson
+
+from utils.knowledge_base_utils import initialize_knowledge_base, invalidate_knowledge_base_structure
 
 logger = logging.getLogger(__name__)
 
+# Map common subfolders to knowledge base structure
+_KB_SUBFOLDER_MAPPING: Dict[str, str] = {
+    "organization_results/opencorporates": "entity_data/organization_results/opencorporates",
+    "organization_results/sanctions": "entity_data/organization_results/sanctions",
+    "organization_results/wikidata": "entity_data/organization_results/wikidata",
+    "organization_results/news": "entity_data/organization_results/news",
+    "people_results/pep": "entity_data/people_results/pep",
+    "people_results/sanctions": "entity_data/people_results/sanctions",
+    "people_results/news": "entity_data/people_results/news",
+    "organization_results": "entity_data/organization_results",
+    "people_results": "entity_data/people_results"
+}
+
+# Map common root files to knowledge base structure
+_KB_FILE_MAPPING: Dict[str, str] = {
+    "entities.json": "entity_data/entities.json",
+    "risk_assessment.json": "risk_assessments/risk_assessment.json",
+    "raw_assessment_data.json": "analysis_reports/raw_assessment_data.json",
+    "entity_history.json": "analysis_reports/entity_history.json",
+    "wikidata_discovered_people.json": "entity_data/wikidata_discovered_people.json"
+}
+
+# Mapped file paths split into (folder, file name) once, for saving
+_KB_FILE_MAPPED_DIRS: Dict[str, Tuple[str, str]] = {
+    file_name: (os.path.dirname(mapped_path), os.path.basename(mapped_path))
+    for file_name, mapped_path in _KB_FILE_MAPPING.items()
+}
+
+def read_json_file(file_path: str, decoder: Optional[Callable[[bytes], Any]] = None) -> Any:
+    """
+    Read and parse a JSON file using orjson.
+    
+    Args:
+        file_path: Path to the JSON file
+        decoder: Optional function to decode the raw bytes instead of orjson.loads
+        
+    Returns:
+        The parsed JSON data
+    """
+    with open(file_path, 'rb') as f:
+        return (decoder or orjson.loads)(f.read())
+
+def write_json_file(file_path: str, data: Any) -> None:
+    """
+    Write data to a JSON file atomically, indented by two spaces.
+    
+    The data is serialized with orjson, falling back to the standard library for
+    objects orjson can't serialize, and written to a temporary file that then
+    replaces the target so readers never see a partially written file.
+    
+    Args:
+        file_path: Path to the JSON file
+        data: The data to write
+    """
+    try:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    except TypeError:
+        content = json.dumps(data, indent=2).encode('utf-8')
+    
+    temp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
 def get_transaction_folder(results_folder: str, transaction_id: str) -> str:
     """
     Get the path to the transaction folder, creating it if it doesn't exist.
@@ -45,39 +119,16 @@ def save_transaction_data(results_folder: str, transaction_id: str,
     """
     transaction_folder = get_transaction_folder(results_folder, transaction_id)
     
-    # Map common subfolders to knowledge base structure
-    kb_subfolder_mapping = {
-        "organization_results/opencorporates": "entity_data/organization_results/opencorporates",
-        "organization_results/sanctions": "entity_data/organization_results/sanctions",
-        "organization_results/wikidata": "entity_data/organization_results/wikidata",
-        "organization_results/news": "entity_data/organization_results/news",
-        "people_results/pep": "entity_data/people_results/pep",
-        "people_results/sanctions": "entity_data/people_results/sanctions",
-        "people_results/news": "entity_data/people_results/news",
-        "organization_results": "entity_data/organization_results",
-        "people_results": "entity_data/people_results"
-    }
-    
-    # Map common root files to knowledge base structure
-    kb_file_mapping = {
-        "entities.json": "entity_data/entities.json",
-        "risk_assessment.json": "risk_assessments/risk_assessment.json",
-        "raw_assessment_data.json": "analysis_reports/raw_assessment_data.json",
-        "entity_history.json": "analysis_reports/entity_history.json",
-        "wikidata_discovered_people.json": "entity_data/wikidata_discovered_people.json"
-    }
-    
     # If subfolder is specified, check if it has a knowledge base mapping
     if subfolder:
-        if subfolder in kb_subfolder_mapping:
-            subfolder = kb_subfolder_mapping[subfolder]
+        if subfolder in _KB_SUBFOLDER_MAPPING:
+            subfolder = _KB_SUBFOLDER_MAPPING[subfolder]
         save_folder = os.path.join(transaction_folder, subfolder)
     else:
         # If no subfolder but file has a mapping
-        if file_name in kb_file_mapping:
-            mapped_path = kb_file_mapping[file_name]
-            save_folder = os.path.join(transaction_folder, os.path.dirname(mapped_path))
-            file_name = os.path.basename(mapped_path)
+        if file_name in _KB_FILE_MAPPED_DIRS:
+            mapped_dir, file_name = _KB_FILE_MAPPED_DIRS[file_name]
+            save_folder = os.path.join(transaction_folder, mapped_dir)
         else:
             save_folder = transaction_folder
     
@@ -87,15 +138,18 @@ def save_transaction_data(results_folder: str, transaction_id: str,
     file_path = os.path.join(save_folder, file_name)
     
     # Save the data
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
+    write_json_file(file_path, data)
     
     logger.info(f"Saved transaction data to: {file_path}")
     
+    # Overwriting a file doesn't change any directory mtime, so drop the cached tree
+    invalidate_knowledge_base_structure(results_folder, transaction_id)
+    
     return file_path
 
 def load_transaction_data(results_folder: str, transaction_id: str, 
-                        file_name: str, subfolder: Optional[str] = None) -> Optional[Dict]:
+                        file_name: str, subfolder: Optional[str] = None,
+                        decoder: Optional[Callable[[bytes], Any]] = None) -> Optional[Dict]:
     """
     Load data from a file in the transaction folder.
     
@@ -104,82 +158,37 @@ def load_transaction_data(results_folder: str, transaction_id: str,
         transaction_id: The transaction ID
         file_name: The name of the file to load
         subfolder: Optional subfolder within the transaction folder
+        decoder: Optional function to decode the raw bytes instead of orjson.loads
         
     Returns:
         The loaded data, or None if the file doesn't exist
     """
     transaction_folder = os.path.join(results_folder, transaction_id)
     
-    # If the transaction folder doesn't exist, return None
-    if not os.path.exists(transaction_folder):
-        return None
-    
-    # Map common subfolders to knowledge base structure
-    kb_subfolder_mapping = {
-        "organization_results/opencorporates": "entity_data/organization_results/opencorporates",
-        "organization_results/sanctions": "entity_data/organization_results/sanctions",
-        "organization_results/wikidata": "entity_data/organization_results/wikidata",
-        "organization_results/news": "entity_data/organization_results/news",
-        "people_results/pep": "entity_data/people_results/pep",
-        "people_results/sanctions": "entity_data/people_results/sanctions",
-        "people_results/news": "entity_data/people_results/news",
-        "organization_results": "entity_data/organization_results",
-        "people_results": "entity_data/people_results"
-    }
-    
-    # Map common root files to knowledge base structure
-    kb_file_mapping = {
-        "entities.json": "entity_data/entities.json",
-        "risk_assessment.json": "risk_assessments/risk_assessment.json",
-        "raw_assessment_data.json": "analysis_reports/raw_assessment_data.json",
-        "entity_history.json": "analysis_reports/entity_history.json",
-        "wikidata_discovered_people.json": "entity_data/wikidata_discovered_people.json"
-    }
-    
-    # First try with the new structure
-    if subfolder:
-        if subfolder in kb_subfolder_mapping:
-            new_subfolder = kb_subfolder_mapping[subfolder]
-            new_load_folder = os.path.join(transaction_folder, new_subfolder)
-            new_file_path = os.path.join(new_load_folder, file_name)
-            
-            if os.path.exists(new_file_path):
-                try:
-                    with open(new_file_path, 'r', encoding='utf-8') as f:
-                        return json.load(f)
-                except Exception:
-                    pass
-    
-    # If no subfolder but file might be in new location
-    if not subfolder and file_name in kb_file_mapping:
-        new_path = os.path.join(transaction_folder, kb_file_mapping[file_name])
-        if os.path.exists(new_path):
-            try:
-                with open(new_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception:
-                pass
+    # Candidate paths, new knowledge base structure first; a missing transaction
+    # folder or file just fails the open, so nothing is probed with exists()
+    candidates = []
+    if subfolder and subfolder in _KB_SUBFOLDER_MAPPING:
+        candidates.append(os.path.join(transaction_folder, _KB_SUBFOLDER_MAPPING[subfolder], file_name))
+    elif not subfolder and file_name in _KB_FILE_MAPPING:
+        candidates.append(os.path.join(transaction_folder, _KB_FILE_MAPPING[file_name]))
     
     # Fall back to the old structure
     if subfolder:
-        load_folder = os.path.join(transaction_folder, subfolder)
+        candidates.append(os.path.join(transaction_folder, subfolder, file_name))
     else:
-        load_folder = transaction_folder
-    
-    file_path = os.path.join(load_folder, file_name)
-    
-    # Check if the file exists
-    if not os.path.exists(file_path):
-        return None
-    
-    # Load the data
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
-    except Exception as e:
-        logger.warning(f"Error loading transaction data from {file_path}: {str(e)}")
-        return None
+        candidates.append(os.path.join(transaction_folder, file_name))
+    
+    # Load the data from the first candidate that exists
+    for file_path in candidates:
+        try:
+            return read_json_file(file_path, decoder)
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            logger.warning(f"Error loading transaction data from {file_path}: {str(e)}")
+    
+    return None
 
 def list_transaction_results(results_folder: str) -> List[str]:
     """
@@ -194,17 +203,22 @@ def list_transaction_results(results_folder: str) -> List[str]:
     if not os.path.exists(results_folder):
         return []
     
-    # Get all subdirectories that could be transaction folders
+    # Markers of the expected transaction folder structure
+    structure_markers = {"entity_data", "risk_assessments", "organization_results", "people_results"}
+    
+    # Get all subdirectories that could be transaction folders; scandir entries
+    # carry their file type, so no extra stat call is needed per item
     transaction_ids = []
-    for item in os.listdir(results_folder):
-        item_path = os.path.join(results_folder, item)
-        if os.path.isdir(item_path) and not item.startswith('.'):
+    with os.scandir(results_folder) as items:
+        for item in items:
+            if not item.is_dir() or item.name.startswith('.'):
+                continue
+            
             # Check if it has the expected structure
-            if (os.path.exists(os.path.join(item_path, "entity_data")) or
-                os.path.exists(os.path.join(item_path, "risk_assessments")) or
-                os.path.exists(os.path.join(item_path, "organization_results")) or
-                os.path.exists(os.path.join(item_path, "people_results")) or
-                any(f.endswith('.json') for f in os.listdir(item_path) if os.path.isfile(os.path.join(item_path, f)))):
-                transaction_ids.append(item)
-    
-    return transaction_ids
\ No newline at end of file
+            with os.scandir(item.path) as children:
+                if any(child.name in structure_markers or
+                       (child.name.endswith('.json') and child.is_file())
+                       for child in children):
+                    transaction_ids.append(item.name)
+    
+    return transaction_ids
@@ -0,0 +1,331 @@
+"""
+SQLite-backed index of transaction summaries for the AML Risk Assessment API.
+
+The index keeps one row per transaction so that listing and dashboard endpoints
+can be served without walking the results folder and parsing every result file.
+It is rebuilt from the results folder on startup and kept up to date by the API
+when transactions are triggered and when Airflow callbacks arrive.
+"""
+import os
+import json
+import base64
+import sqlite3
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Columns stored for every transaction
+INDEX_COLUMNS = ("transaction_id", "timestamp", "status", "risk_score", "entities_count", "result_path")
+
+# Columns the transactions endpoint may sort by
+SORTABLE_COLUMNS = ("transaction_id", "timestamp", "status", "risk_score", "entities_count")
+
+def encode_cursor(transaction: Dict[str, Any]) -> str:
+    """
+    Encode the keyset pagination cursor pointing after a transaction.
+
+    Args:
+        transaction: The last transaction summary of a page
+
+    Returns:
+        An opaque URL-safe cursor string
+    """
+    key = json.dumps([transaction["timestamp"], transaction["transaction_id"]])
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a keyset pagination cursor.
+
+    Args:
+        cursor: A cursor returned by encode_cursor
+
+    Returns:
+        The (timestamp, transaction_id) key of the last transaction of the previous page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        timestamp, transaction_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    if not isinstance(timestamp, str) or not isinstance(transaction_id, str):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    return timestamp, transaction_id
+
+class TransactionIndex:
+    """
+    Manager class for the transaction summary index.
+    """
+    def __init__(self, db_path: str):
+        """
+        Initialize the index.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+
+    @contextmanager
+    def _connect(self):
+        """
+        Open a connection to the index, committing and closing it afterwards.
+
+        A new connection is used per operation so the index can be used safely
+        from worker threads and from multiple API worker processes.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def initialize(self) -> None:
+        """Create the index table and its secondary indexes if they don't exist."""
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS transactions (
+                    transaction_id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    risk_score REAL,
+                    entities_count INTEGER NOT NULL DEFAULT 0,
+                    result_path TEXT,
+                    transaction_id_lower TEXT
+                )
+            """)
+
+            # Indexes created before the search column existed are migrated in place
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(transactions)")}
+            if "transaction_id_lower" not in columns:
+                conn.execute("ALTER TABLE transactions ADD COLUMN transaction_id_lower TEXT")
+                conn.execute("UPDATE transactions SET transaction_id_lower = lower(transaction_id)")
+
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions (timestamp)")
+            # Serves status-filtered pages in timestamp order without a separate sort
+            conn.execute("DROP INDEX IF EXISTS idx_transactions_status")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_transactions_status_timestamp "
+                "ON transactions (status, timestamp)"
+            )
+            # Covers the risk statistics query, so bucket counts and the most recent
+            # assessments are read from one compact index instead of the table
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_transactions_assessed "
+                "ON transactions (timestamp, risk_score) WHERE risk_score IS NOT NULL"
+            )
+
+    def rebuild(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Replace the contents of the index with the given rows.
+
+        Args:
+            rows: Transaction summaries with the keys in INDEX_COLUMNS
+
+        Returns:
+            The number of rows written
+        """
+        values = [
+            tuple(row.get(column) for column in INDEX_COLUMNS) + (row["transaction_id"].lower(),)
+            for row in rows
+        ]
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM transactions")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO transactions ({', '.join(INDEX_COLUMNS)}, transaction_id_lower) "
+                f"VALUES ({', '.join('?' for _ in INDEX_COLUMNS)}, ?)",
+                values
+            )
+
+        logger.info(f"Rebuilt transaction index with {len(values)} transactions")
+        return len(values)
+
+    def upsert(self, transaction_id: str, **fields) -> None:
+        """
+        Insert a transaction or update the given fields of an existing one.
+
+        Args:
+            transaction_id: The transaction ID
+            fields: Column values to set (keys must be in INDEX_COLUMNS)
+        """
+        unknown = set(fields) - set(INDEX_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown transaction index columns: {sorted(unknown)}")
+
+        columns = list(fields)
+        insert_fields = {"timestamp": "", "status": "processing", "entities_count": 0, **fields}
+        insert_fields["transaction_id_lower"] = transaction_id.lower()
+        insert_columns = ["transaction_id"] + list(insert_fields)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns)
+
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO transactions ({', '.join(insert_columns)}) "
+                f"VALUES ({', '.join('?' for _ in insert_columns)}) "
+                f"ON CONFLICT(transaction_id) DO "
+                + (f"UPDATE SET {updates}" if updates else "NOTHING"),
+                [transaction_id] + list(insert_fields.values())
+            )
+
+    def count(self, since: Optional[str] = None) -> int:
+        """
+        Count the indexed transactions.
+
+        Args:
+            since: Only count transactions with this timestamp or a later one
+
+        Returns:
+            The number of matching rows in the index
+        """
+        with self._connect() as conn:
+            if since is None:
+                return conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            return conn.execute(
+                "SELECT COUNT(*) FROM transactions WHERE timestamp >= ?", (since,)
+            ).fetchone()[0]
+
+    def get_transaction_ids(self, status: Optional[str] = None) -> List[str]:
+        """
+        Get the IDs of all transactions with the given status.
+
+        Args:
+            status: The transaction status, or None for all transactions
+
+        Returns:
+            List of transaction IDs
+        """
+        with self._connect() as conn:
+            if status is None:
+                rows = conn.execute("SELECT transaction_id FROM transactions").fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT transaction_id FROM transactions WHERE status = ?", (status,)
+                ).fetchall()
+
+        return [row["transaction_id"] for row in rows]
+
+    def get(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the indexed summary for a transaction.
+
+        Args:
+            transaction_id: The transaction ID
+
+        Returns:
+            The transaction summary, or None if it is not indexed
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM transactions WHERE transaction_id = ?", (transaction_id,)
+            ).fetchone()
+
+        return dict(row) if row else None
+
+    def query_transactions(self, status: Optional[str] = None, search: Optional[str] = None,
+                           sort_by: Optional[str] = None, sort_order: Optional[str] = None,
+                           limit: int = 100, offset: int = 0,
+                           after: Optional[Tuple[str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Query a page of transaction summaries.
+
+        Args:
+            status: Only return transactions with this status
+            search: Only return transactions whose ID contains this text (case-insensitive)
+            sort_by: Column to sort by (one of SORTABLE_COLUMNS); defaults to newest first
+            sort_order: 'desc' for descending order, ascending otherwise
+            limit: Maximum number of transactions to return
+            offset: Number of transactions to skip
+            after: Keyset cursor (timestamp, transaction_id) to start after; only
+                valid with the default newest-first order
+
+        Returns:
+            List of transaction summaries as returned by the transactions endpoint
+        """
+        conditions = []
+        params: List[Any] = []
+
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+
+        if search:
+            # IDs are lowercased once when indexed rather than on every search
+            conditions.append("instr(transaction_id_lower, ?) > 0")
+            params.append(search.lower())
+
+        # Only whitelisted columns may be interpolated into the ORDER BY clause
+        if sort_by in SORTABLE_COLUMNS:
+            direction = "DESC" if sort_order == "desc" else "ASC"
+            order_by = f"{sort_by} {direction}, transaction_id"
+        else:
+            order_by = "timestamp DESC, transaction_id DESC"
+
+        # Keyset pagination seeks past the previous page instead of skipping rows
+        if after is not None:
+            if sort_by in SORTABLE_COLUMNS:
+                raise ValueError("Cursor pagination is only supported with the default sort order")
+            conditions.append("(timestamp, transaction_id) < (?, ?)")
+            params.extend(after)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.extend([limit, offset])
+
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                SELECT transaction_id, timestamp, status,
+                       COALESCE(risk_score, 0.0) AS risk_score, entities_count
+                FROM transactions
+                {where}
+                ORDER BY {order_by}
+                LIMIT ? OFFSET ?
+            """, params).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def get_risk_stats(self, recent_limit: int = 5) -> Dict[str, Any]:
+        """
+        Aggregate risk statistics over all transactions with a risk assessment.
+
+        Args:
+            recent_limit: Number of most recent assessed transactions to return
+
+        Returns:
+            Dict with the total/high/medium/low counts and the most recent transactions
+        """
+        with self._connect() as conn:
+            counts = conn.execute("""
+                SELECT COUNT(*) AS total,
+                       COALESCE(SUM(CASE WHEN risk_score >= 0.7 THEN 1 ELSE 0 END), 0) AS high,
+                       COALESCE(SUM(CASE WHEN risk_score >= 0.4 AND risk_score < 0.7 THEN 1 ELSE 0 END), 0) AS medium,
+                       COALESCE(SUM(CASE WHEN risk_score < 0.4 THEN 1 ELSE 0 END), 0) AS low
+                FROM transactions
+                WHERE risk_score IS NOT NULL
+            """).fetchone()
+
+            recent = conn.execute("""
+                SELECT transaction_id, timestamp, risk_score
+                FROM transactions
+                WHERE risk_score IS NOT NULL
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (recent_limit,)).fetchall()
+
+        return {
+            "total": counts["total"],
+            "high": counts["high"],
+            "medium": counts["medium"],
+            "low": counts["low"],
+            "recent": [dict(row) for row in recent]
+        }
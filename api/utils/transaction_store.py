@@ -0,0 +1,130 @@
+"""
+Transaction status store for the AML Risk Assessment API.
+
+Holds the short-lived status and metadata of transactions being processed by
+Airflow. By default the store lives in process memory; when a Redis URL is
+configured it is backed by Redis so that all API worker processes share it.
+"""
+import logging
+from typing import Dict, Any, Optional
+
+import orjson
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class TransactionStore:
+    """
+    In-memory transaction store, local to the current process.
+    """
+    # Whether stored information survives a restart of the API
+    persistent = False
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._data: Dict[str, Dict[str, Any]] = {}
+
+    async def get(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored information for a transaction.
+
+        Args:
+            transaction_id: The transaction ID
+
+        Returns:
+            A copy of the stored information, or None if the transaction is unknown
+        """
+        info = self._data.get(transaction_id)
+        return dict(info) if info is not None else None
+
+    async def set(self, transaction_id: str, info: Dict[str, Any]) -> None:
+        """
+        Replace the stored information for a transaction.
+
+        Args:
+            transaction_id: The transaction ID
+            info: The information to store
+        """
+        self._data[transaction_id] = dict(info)
+
+    async def update(self, transaction_id: str, fields: Dict[str, Any]) -> None:
+        """
+        Update some fields of a transaction, creating it if it doesn't exist.
+
+        Args:
+            transaction_id: The transaction ID
+            fields: The fields to set
+        """
+        self._data.setdefault(transaction_id, {}).update(fields)
+
+    async def close(self) -> None:
+        """Release any resources held by the store."""
+
+class RedisTransactionStore(TransactionStore):
+    """
+    Redis-backed transaction store shared by all API worker processes.
+
+    Each transaction is stored as a hash at ``txn:{transaction_id}`` with
+    JSON-encoded field values, and expires after ``ttl`` seconds.
+    """
+    persistent = True
+
+    def __init__(self, redis_url: str, ttl: int):
+        """
+        Initialize the Redis connection pool.
+
+        Args:
+            redis_url: Redis connection URL
+            ttl: Expiry of transaction entries in seconds
+        """
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(redis_url)
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(transaction_id: str) -> str:
+        """Get the Redis key for a transaction."""
+        return f"txn:{transaction_id}"
+
+    async def get(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.hgetall(self._key(transaction_id))
+        if not raw:
+            return None
+        return {field.decode("utf-8"): orjson.loads(value) for field, value in raw.items()}
+
+    async def set(self, transaction_id: str, info: Dict[str, Any]) -> None:
+        key = self._key(transaction_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping={field: orjson.dumps(value) for field, value in info.items()})
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def update(self, transaction_id: str, fields: Dict[str, Any]) -> None:
+        key = self._key(transaction_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={field: orjson.dumps(value) for field, value in fields.items()})
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+def create_transaction_store(redis_url: Optional[str] = None, ttl: int = 7 * 24 * 3600) -> TransactionStore:
+    """
+    Create the transaction store, using Redis if a URL is configured.
+
+    Args:
+        redis_url: Optional Redis connection URL
+        ttl: Expiry of Redis transaction entries in seconds
+
+    Returns:
+        The transaction store
+    """
+    if redis_url:
+        logger.info("Using Redis-backed transaction store")
+        return RedisTransactionStore(redis_url, ttl)
+
+    logger.info("Using in-memory transaction store")
+    return TransactionStore()
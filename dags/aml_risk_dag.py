@@ -1,11 +1,14 @@
 from airflow import DAG
-from airflow.decorators import task, task_group
+from airflow.decorators import task
 from airflow.operators.dummy import DummyOperator
 from airflow.utils.dates import days_ago
 from airflow.utils.trigger_rule import TriggerRule
+import os
 import logging
 import httpx
 from datetime import timedelta
+from functools import partial, lru_cache
+from itertools import chain
 
 # Import utilities
 from dags.utils.entity_extraction import extract_entities_from_text
@@ -14,18 +17,34 @@ from dags.utils.data_enrichment import (
     check_sanctions, 
     query_wikidata, 
     check_pep_list, 
-    check_adverse_news
+    check_adverse_news,
+    prefetch_sanctions,
+    run_lookups_concurrently,
+    process_entities_concurrently
 )
 from dags.utils.risk_assessment import generate_risk_assessment
 from dags.utils.knowledge_base_utils import initialize_knowledge_base, migrate_transaction_to_knowledge_base
 from dags.utils.neo4j_utils import retrieve_entity_history, store_transaction_results
 
 # Import settings
-from config.settings import RESULTS_FOLDER
+from config.settings import RESULTS_FOLDER, ENTITY_PROCESSING_CONCURRENCY, ENRICHMENT_POOL, GEMINI_POOL
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging; handlers and levels come from Airflow's logging config
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+@lru_cache(maxsize=None)
+def _callback_client():
+    """
+    Get the HTTP client used to send callbacks to the API.
+    
+    The client is created once per worker process and keeps its connections
+    alive; failed connection attempts are retried over the same pool.
+    """
+    return httpx.Client(
+        timeout=30.0,
+        transport=httpx.HTTPTransport(retries=2, limits=httpx.Limits(max_keepalive_connections=8))
+    )
 
 # Define default arguments for the DAG
 default_args = {
@@ -61,6 +80,13 @@ with DAG(
         transaction_id = conf.get('transaction_id')
         callback_url = conf.get('callback_url')
         
+        # The API writes the transaction to disk and passes it by path, relative
+        # to the results folder; transaction_data is still accepted for manual runs
+        transaction_path = conf.get('transaction_path')
+        if not transaction_data and transaction_path:
+            with open(os.path.join(RESULTS_FOLDER, transaction_path), 'r', encoding='utf-8') as f:
+                transaction_data = f.read()
+        
         if not transaction_data:
             raise ValueError("Transaction data not provided in DAG run configuration")
         
@@ -78,7 +104,7 @@ with DAG(
             "callback_url": callback_url
         }
     
-    @task
+    @task(pool=GEMINI_POOL)
     def extract_entities(transaction_info):
         """Extract organizations and people from transaction data."""
         transaction_data = transaction_info["transaction_data"]
@@ -99,153 +125,120 @@ with DAG(
     
     # ========== ENTITY PROCESSING TASKS ==========
     
-    @task_group
+    # Entities are processed inside one task per entity kind, a bounded number at
+    # a time, instead of one mapped task instance per entity
+    
+    @task(pool=ENRICHMENT_POOL)
     def process_organizations(transaction_info, entities, entity_history):
-        """Process all organizations in the transaction."""
-        
-        @task
-        def extract_organizations(entities_dict):
-            """Extract the list of organizations from the entities."""
-            return entities_dict.get("organizations", [])
+        """Process all organizations in the transaction with all relevant checks."""
+        transaction_id = transaction_info["transaction_id"]
         
-        @task
-        def process_organization(organization, history_map, **context):
+        def process_organization(organization):
             """Process a single organization with all relevant checks."""
             org_name = organization.get('name', '')
             logger.info(f"Processing organization: {org_name}")
             
-            transaction_id = context['dag_run'].conf.get('transaction_id')
-            
-            results = {
-                'opencorporates': get_open_corporates_data(organization, transaction_id=transaction_id, **context),
-                'sanctions': check_sanctions('Company', org_name, transaction_id=transaction_id, **context),
-                'wikidata': query_wikidata(org_name, transaction_id=transaction_id, **context),
-                'news': check_adverse_news(org_name, transaction_id=transaction_id, **context)
-            }
+            # The lookups are independent, so they run concurrently
+            results = run_lookups_concurrently({
+                'opencorporates': partial(get_open_corporates_data, organization, transaction_id=transaction_id),
+                'sanctions': partial(check_sanctions, 'Company', org_name, transaction_id=transaction_id),
+                'wikidata': partial(query_wikidata, org_name, transaction_id=transaction_id),
+                'news': partial(check_adverse_news, org_name, entity_type='Company', transaction_id=transaction_id)
+            })
             
             # Add discovered people from Wikidata
             results['discovered_people'] = results['wikidata'].get('associated_people', [])
             
             # Add historical data if available
-            if history_map and org_name in history_map:
-                results['history'] = history_map.get(org_name, {})
+            if entity_history and org_name in entity_history:
+                results['history'] = entity_history.get(org_name, {})
                 
             return {
                 "name": org_name,
                 "results": results
             }
-            
-        # Get the organizations list
-        orgs_list = extract_organizations(entities)
-        
-        # Process each organization and return results
-        org_results = process_organization.expand(
-            organization=orgs_list,
-            history_map=[entity_history]
-        )
         
-        return org_results
+        organizations = entities.get("organizations", [])
+        prefetch_sanctions('Company', [org.get('name', '') for org in organizations])
+        return process_entities_concurrently(process_organization, organizations, ENTITY_PROCESSING_CONCURRENCY)
     
-    @task_group
+    @task(pool=ENRICHMENT_POOL)
     def process_people(transaction_info, entities, entity_history):
-        """Process all people in the transaction."""
-        
-        @task
-        def extract_people(entities_dict):
-            """Extract the list of people from the entities."""
-            return entities_dict.get("people", [])
+        """Process all people in the transaction with all relevant checks."""
+        transaction_id = transaction_info["transaction_id"]
         
-        @task
-        def process_person(person, history_map, **context):
+        def process_person(person):
             """Process a single person with all relevant checks."""
             person_name = person.get('name', '')
             logger.info(f"Processing person: {person_name}")
             
-            transaction_id = context['dag_run'].conf.get('transaction_id')
-            
-            results = {
-                'pep': check_pep_list(person_name, transaction_id=transaction_id, **context),
-                'sanctions': check_sanctions('Person', person_name, transaction_id=transaction_id, **context),
-                'news': check_adverse_news(person_name, transaction_id=transaction_id, **context)
-            }
+            # The lookups are independent, so they run concurrently
+            results = run_lookups_concurrently({
+                'pep': partial(check_pep_list, person_name, transaction_id=transaction_id),
+                'sanctions': partial(check_sanctions, 'Person', person_name, transaction_id=transaction_id),
+                'news': partial(check_adverse_news, person_name, entity_type='Person', transaction_id=transaction_id)
+            })
             
             # Add historical data if available
-            if history_map and person_name in history_map:
-                results['history'] = history_map.get(person_name, {})
+            if entity_history and person_name in entity_history:
+                results['history'] = entity_history.get(person_name, {})
                 
             return {
                 "name": person_name,
                 "results": results
             }
-            
-        # Get the people list
-        people_list = extract_people(entities)
-        
-        # Process each person and return results
-        people_results = process_person.expand(
-            person=people_list,
-            history_map=[entity_history]
-        )
         
-        return people_results
+        people = entities.get("people", [])
+        prefetch_sanctions('Person', [person.get('name', '') for person in people])
+        return process_entities_concurrently(process_person, people, ENTITY_PROCESSING_CONCURRENCY)
     
-    @task_group
-    def process_discovered_people(transaction_info, org_results, entity_history):
+    @task(pool=ENRICHMENT_POOL)
+    def process_discovered_people(transaction_info, entities, org_results, entity_history):
         """Process people discovered from Wikidata that weren't in the original transaction."""
+        transaction_id = transaction_info["transaction_id"]
         
-        @task
-        def extract_discovered_people(org_results_list):
-            """Extract people discovered from organizations' Wikidata results."""
-            discovered_people = []
-            seen_names = set()
-            
-            for org_result in org_results_list:
-                results = org_result.get('results', {})
-                if 'discovered_people' in results:
-                    for person in results['discovered_people']:
-                        name = person.get('name', '').lower()
-                        if name and name not in seen_names:
-                            discovered_people.append(person)
-                            seen_names.add(name)
-            
-            logger.info(f"Discovered {len(discovered_people)} additional people from Wikidata")
-            return discovered_people
+        # People of the transaction itself are already enriched by process_people
+        transaction_people = {person.get('name', '').casefold() for person in entities.get("people", [])}
+        
+        # Extract people discovered from organizations' Wikidata results, keeping the
+        # first occurrence of each name
+        all_discovered = chain.from_iterable(
+            org_result.get('results', {}).get('discovered_people', ()) for org_result in org_results or ()
+        )
+        unique_people = {}
+        for person in all_discovered:
+            name = person.get('name', '').casefold()
+            if name and name not in transaction_people:
+                unique_people.setdefault(name, person)
+        discovered_people = list(unique_people.values())
         
-        @task
-        def process_discovered_person(person, history_map, **context):
+        logger.info(f"Discovered {len(discovered_people)} additional people from Wikidata")
+        
+        def process_discovered_person(person):
             """Process a single discovered person with all relevant checks."""
             person_name = person.get('name', '')
             logger.info(f"Processing discovered person: {person_name}")
             
-            transaction_id = context['dag_run'].conf.get('transaction_id')
-            
-            results = {
-                'pep': check_pep_list(person_name, transaction_id=transaction_id, **context),
-                'sanctions': check_sanctions('Person', person_name, transaction_id=transaction_id, **context),
-                'news': check_adverse_news(person_name, transaction_id=transaction_id, **context),
-                'source': person.get('source', 'wikidata'),
-                'entity_connection': person.get('entity_connection', '')
-            }
+            # The lookups are independent, so they run concurrently
+            results = run_lookups_concurrently({
+                'pep': partial(check_pep_list, person_name, transaction_id=transaction_id),
+                'sanctions': partial(check_sanctions, 'Person', person_name, transaction_id=transaction_id),
+                'news': partial(check_adverse_news, person_name, entity_type='Person', transaction_id=transaction_id)
+            })
+            results['source'] = person.get('source', 'wikidata')
+            results['entity_connection'] = person.get('entity_connection', '')
             
             # Add historical data if available
-            if history_map and person_name in history_map:
-                results['history'] = history_map.get(person_name, {})
+            if entity_history and person_name in entity_history:
+                results['history'] = entity_history.get(person_name, {})
                 
             return {
                 "name": person_name,
                 "results": results
             }
-            
-        # Extract discovered people
-        discovered_list = extract_discovered_people(org_results)
         
-        # Process each discovered person
-        discovered_results = process_discovered_person.expand(
-            person=discovered_list,
-            history_map=[entity_history]
-        )
-            
-        return discovered_results
+        prefetch_sanctions('Person', [person.get('name', '') for person in discovered_people])
+        return process_entities_concurrently(process_discovered_person, discovered_people, ENTITY_PROCESSING_CONCURRENCY)
     
     # ========== FINAL ASSESSMENT TASKS ==========
     
@@ -263,38 +256,26 @@ with DAG(
         transaction_id = transaction_info["transaction_id"]
         transaction_data = transaction_info["transaction_data"]
         
+        def results_by_name(entity_results):
+            """Map entity names to their results, skipping unnamed entities."""
+            return {
+                result['name']: result.get('results', {})
+                for result in entity_results or ()
+                if result.get('name')
+            }
+        
         # Build the complete results structure
-        all_results = {
+        return {
             "transaction_id": transaction_id,
             "transaction_data": transaction_data,
             "entities": entities,
             "entity_history": entity_history,
-            "organizations": {},
-            "people": {},
-            "discovered_people": {}
+            "organizations": results_by_name(org_results),
+            "people": results_by_name(people_results),
+            "discovered_people": results_by_name(discovered_people_results)
         }
-        
-        if org_results:
-            for org_result in org_results:
-                name = org_result.get('name')
-                if name:
-                    all_results["organizations"][name] = org_result.get('results', {})
-            
-        if people_results:
-            for person_result in people_results:
-                name = person_result.get('name')
-                if name:
-                    all_results["people"][name] = person_result.get('results', {})
-            
-        if discovered_people_results:
-            for person_result in discovered_people_results:
-                name = person_result.get('name')
-                if name:
-                    all_results["discovered_people"][name] = person_result.get('results', {})
-        
-        return all_results
     
-    @task
+    @task(pool=GEMINI_POOL)
     def assess_risk(transaction_info, all_results):
         """Generate the final risk assessment."""
         transaction_id = transaction_info["transaction_id"]
@@ -307,11 +288,8 @@ with DAG(
         )
         return risk_assessment
     
-    @task
-    def organize_knowledge_base(transaction_info, risk_assessment):
+    def organize_knowledge_base(transaction_id):
         """Organize the transaction data into a structured knowledge base."""
-        transaction_id = transaction_info["transaction_id"]
-        
         try:
             success = migrate_transaction_to_knowledge_base(RESULTS_FOLDER, transaction_id)
             logger.info(f"Knowledge base organization {'successful' if success else 'failed'} for transaction {transaction_id}")
@@ -320,15 +298,23 @@ with DAG(
             logger.error(f"Error organizing knowledge base: {str(e)}")
             return {"knowledge_base_organized": False, "error": str(e)}
     
-    @task
-    def store_in_neo4j(transaction_info, entities, risk_assessment):
+    def store_in_neo4j(transaction_id, entities, risk_assessment):
         """Store transaction results in Neo4j."""
-        transaction_id = transaction_info["transaction_id"]
         result = store_transaction_results(transaction_id, risk_assessment, entities)
         
         logger.info(f"Stored transaction results in Neo4j: {result}")
         return result
     
+    @task
+    def finalize(transaction_info, entities, risk_assessment):
+        """Organize the knowledge base and store the results in Neo4j, concurrently in one task."""
+        transaction_id = transaction_info["transaction_id"]
+        
+        return run_lookups_concurrently({
+            'knowledge_base': partial(organize_knowledge_base, transaction_id),
+            'neo4j': partial(store_in_neo4j, transaction_id, entities, risk_assessment)
+        })
+    
     @task(trigger_rule=TriggerRule.ALL_DONE)
     def send_callback(transaction_info, risk_assessment, **context):
         """Send callback to API with the results."""
@@ -351,9 +337,8 @@ with DAG(
         # Send the callback
         try:
             logger.info(f"Sending callback to {callback_url}")
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(callback_url, json=callback_data)
-                response.raise_for_status()
+            response = _callback_client().post(callback_url, json=callback_data)
+            response.raise_for_status()
                 
             logger.info(f"Callback sent successfully: {response.text}")
             return {"callback_sent": True}
@@ -371,7 +356,7 @@ with DAG(
     # Process entities
     org_results = process_organizations(transaction_info, entities, entity_history)
     people_results = process_people(transaction_info, entities, entity_history)
-    discovered_people_results = process_discovered_people(transaction_info, org_results, entity_history)
+    discovered_people_results = process_discovered_people(transaction_info, entities, org_results, entity_history)
     
     # Combine results and assess risk
     all_results = combine_results(
@@ -385,13 +370,12 @@ with DAG(
     
     risk_assessment = assess_risk(transaction_info, all_results)
     
-    # Final tasks - these can run in parallel
-    kb_result = organize_knowledge_base(transaction_info, risk_assessment)
-    neo4j_result = store_in_neo4j(transaction_info, entities, risk_assessment)
+    # Final writes - the knowledge base and Neo4j are updated in parallel
+    finalize_result = finalize(transaction_info, entities, risk_assessment)
     
     # Send callback should be the last task
     callback_result = send_callback(transaction_info, risk_assessment)
     
     # Define the task dependencies
-    [kb_result, neo4j_result] >> callback_result
+    finalize_result >> callback_result
     
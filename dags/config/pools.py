@@ -0,0 +1,48 @@
+"""
+Airflow pools bounding the concurrency of external API calls.
+
+Run once after the metadata database is initialized:
+
+    python -m dags.config.pools
+"""
+import logging
+
+from airflow.models import Pool
+
+from dags.config.settings import (
+    ENRICHMENT_POOL, ENRICHMENT_POOL_SLOTS, GEMINI_POOL, get_gemini_key_rotator
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def get_gemini_pool_slots():
+    """
+    Get the number of Gemini pool slots, one per configured API key
+
+    :return: Number of slots, at least 1
+    """
+    try:
+        return max(get_gemini_key_rotator().get_key_count(), 1)
+    except ValueError:
+        logger.warning("No Gemini API keys configured, using a single Gemini pool slot")
+        return 1
+
+def create_pools():
+    """
+    Create or update the pools used by the AML risk assessment DAG
+    """
+    pools = [
+        (ENRICHMENT_POOL, ENRICHMENT_POOL_SLOTS,
+         "Entity enrichment tasks calling OpenCorporates, OpenSanctions, Wikidata and news APIs"),
+        (GEMINI_POOL, get_gemini_pool_slots(),
+         "Tasks calling the Gemini API, one slot per API key"),
+    ]
+
+    for name, slots, description in pools:
+        Pool.create_or_update_pool(name, slots, description)
+        logger.info(f"Pool {name} set to {slots} slots")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    create_pools()
@@ -1,7 +1,9 @@
 import os
 from airflow.models import Variable
 from dotenv import load_dotenv
-import random
+import heapq
+import threading
+from functools import lru_cache
 load_dotenv()
 
 # Path configurations
@@ -12,9 +14,37 @@ RESULTS_FOLDER = os.environ.get('RESULTS_FOLDER', '/opt/airflow/data/results')
 SANCTION_DATA_FOLDER = os.environ.get('SANCTION_DATA_FOLDER', '/opt/airflow/data/sanctions')
 PEP_DATA_FILE = os.environ.get('PEP_DATA_FILE', '/opt/airflow/data/pep/pep_data.csv')
 
-# Create folders if they don't exist
-for folder in [TRANSACTION_FOLDER, PROCESSED_FOLDER, FAILED_FOLDER, RESULTS_FOLDER, SANCTION_DATA_FOLDER]:
-    os.makedirs(folder, exist_ok=True)
+# Persistent cache of enrichment API lookups, shared by all workers
+ENRICHMENT_CACHE_FOLDER = os.environ.get('ENRICHMENT_CACHE_FOLDER', '/opt/airflow/data/cache')
+ENRICHMENT_CACHE_TTL = int(os.environ.get('ENRICHMENT_CACHE_TTL', str(24 * 3600)))  # seconds
+
+# Per-API cache time-to-live in seconds, overriding ENRICHMENT_CACHE_TTL; sanctions
+# lists and news change faster than company registries and Wikidata
+ENRICHMENT_CACHE_API_TTLS = {
+    'opencorporates': int(os.environ.get('OPENCORPORATES_CACHE_TTL', str(24 * 3600))),
+    'opensanctions': int(os.environ.get('OPENSANCTIONS_CACHE_TTL', str(3600))),
+    'wikidata': int(os.environ.get('WIKIDATA_CACHE_TTL', str(24 * 3600))),
+    'gdelt': int(os.environ.get('GDELT_CACHE_TTL', str(30 * 60))),
+}
+
+# User-Agent sent with enrichment API requests; Wikimedia requires a descriptive one
+ENRICHMENT_USER_AGENT = os.environ.get('ENRICHMENT_USER_AGENT', 'eira-aml-enrichment/1.0 (AML risk assessment)')
+
+# Maximum number of entities of a transaction enriched at the same time
+ENTITY_PROCESSING_CONCURRENCY = int(os.environ.get('ENTITY_PROCESSING_CONCURRENCY', '8'))
+
+# Airflow pools bounding concurrent calls to external APIs across DAG runs
+# (created by dags.config.pools); the Gemini pool has one slot per API key
+ENRICHMENT_POOL = os.environ.get('ENRICHMENT_POOL', 'enrichment_api')
+ENRICHMENT_POOL_SLOTS = int(os.environ.get('ENRICHMENT_POOL_SLOTS', '4'))
+GEMINI_POOL = os.environ.get('GEMINI_POOL', 'gemini_api')
+
+# Create folders if they don't exist; settings are imported on every DAG parse,
+# so creation is only attempted when one of them is missing
+_DATA_FOLDERS = (TRANSACTION_FOLDER, PROCESSED_FOLDER, FAILED_FOLDER, RESULTS_FOLDER, SANCTION_DATA_FOLDER)
+if not all(os.path.isdir(folder) for folder in _DATA_FOLDERS):
+    for folder in _DATA_FOLDERS:
+        os.makedirs(folder, exist_ok=True)
 
 # API configurations
 OPENCORPORATES_API_KEY = os.environ.get('OPENCORPORATES_API_KEY', 
@@ -52,27 +82,36 @@ class GeminiKeyRotator:
         # Track key usage to help with load balancing
         self.key_usage = {key: 0 for key in self.keys}
         
+        # Min-heap of (usage, sequence, key) so the least-used key is found in
+        # O(log K); entries whose usage is outdated are skipped when popped
+        self._heap = [(0, index, key) for index, key in enumerate(self.keys)]
+        heapq.heapify(self._heap)
+        self._sequence = len(self.keys)
+        self._lock = threading.Lock()
+        
+    def _push(self, key):
+        """Push a key onto the heap with its current usage."""
+        heapq.heappush(self._heap, (self.key_usage[key], self._sequence, key))
+        self._sequence += 1
+        
     def get_key(self):
         """
-        Select a key using a weighted random approach that favors less-used keys
+        Select the least-used key, rotating through keys with equal usage
         
         :return: A Gemini API key
         """
         if len(self.keys) == 1:
             return self.keys[0]
         
-        # Find keys with minimum usage
-        min_usage = min(self.key_usage.values())
-        least_used_keys = [
-            key for key, usage in self.key_usage.items() 
-            if usage == min_usage
-        ]
-        
-        # Randomly select from least-used keys
-        selected_key = random.choice(least_used_keys)
-        
-        # Increment usage count
-        self.key_usage[selected_key] += 1
+        with self._lock:
+            while True:
+                usage, _, selected_key = heapq.heappop(self._heap)
+                if usage == self.key_usage[selected_key]:
+                    break
+            
+            # Increment usage count
+            self.key_usage[selected_key] += 1
+            self._push(selected_key)
         
         return selected_key
     
@@ -82,9 +121,11 @@ class GeminiKeyRotator:
         
         :param key: The API key that failed
         """
-        if key in self.key_usage:
-            # Increase usage count to reduce future selection probability
-            self.key_usage[key] += 10
+        with self._lock:
+            if key in self.key_usage:
+                # Increase usage count to reduce future selection probability
+                self.key_usage[key] += 10
+                self._push(key)
     
     def get_key_count(self):
         """
@@ -94,11 +135,29 @@ class GeminiKeyRotator:
         """
         return len(self.keys)
 
-# Global key rotator instance
-gemini_key_rotator = GeminiKeyRotator()
+@lru_cache(maxsize=1)
+def get_gemini_key_rotator():
+    """
+    Get the global key rotator instance, creating it on first use
+    
+    The rotator reads Airflow variables and raises if no key is configured, so it
+    isn't created at import time, which happens on every DAG parse.
+    
+    :return: The GeminiKeyRotator instance
+    """
+    return GeminiKeyRotator()
 
 GEMINI_MODEL = "gemini-1.5-pro"
 GEMINI_TEMPERATURE = 0.3
 GEMINI_TOP_P = 1
 GEMINI_TOP_K = 1
-GEMINI_MAX_OUTPUT_TOKENS = 8192
\ No newline at end of file
+GEMINI_MAX_OUTPUT_TOKENS = 8192
+
+# Persistent cache of Gemini function call results, keyed on the prompt and the
+# model configuration. Sampling at a non-zero temperature isn't deterministic, so
+# results are only cached at temperature 0 unless GEMINI_CACHE_ANY is set; with
+# the default GEMINI_TEMPERATURE of 0.3 the cache is opt-in through GEMINI_CACHE_ANY
+GEMINI_CACHE_ENABLED = os.environ.get('GEMINI_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+GEMINI_CACHE_ANY = os.environ.get('GEMINI_CACHE_ANY', 'false').lower() in ('1', 'true', 'yes')
+GEMINI_CACHE_FOLDER = os.environ.get('GEMINI_CACHE_FOLDER', os.path.join(ENRICHMENT_CACHE_FOLDER, 'llm'))
+GEMINI_CACHE_TTL = int(os.environ.get('GEMINI_CACHE_TTL', str(7 * 24 * 3600)))  # seconds
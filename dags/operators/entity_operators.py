@@ -10,6 +10,13 @@ from dags.utils.data_enrichment import (
 
 logger = logging.getLogger(__name__)
 
+# Characters of entity names that are not valid in task IDs
+_SPACE = str.maketrans({' ': '_', '/': '_', '.': '_'})
+
+# Task ID templates of the enrichment tasks created per entity
+ORG_TASK_TEMPLATES = ('opencorporates_{k}', 'sanctions_org_{k}', 'wikidata_{k}', 'news_org_{k}')
+PERSON_TASK_TEMPLATES = ('{p}pep_{k}', '{p}sanctions_person_{k}', '{p}news_person_{k}')
+
 class EntityTaskGroup:
     """
     Creates a group of tasks for processing entities (organizations or people).
@@ -37,12 +44,15 @@ class EntityTaskGroup:
                 if not org_name:
                     continue
                     
-                org_key = org_name.replace(' ', '_')
+                org_key = org_name.translate(_SPACE)
+                opencorporates_id, sanctions_id, wikidata_id, news_id = (
+                    template.format(k=org_key) for template in ORG_TASK_TEMPLATES
+                )
                 logger.info(f"Creating enrichment tasks for organization: {org_name}")
                 
                 # OpenCorporates task
                 opencorporates_task = PythonOperator(
-                    task_id=f'opencorporates_{org_key}',
+                    task_id=opencorporates_id,
                     python_callable=get_open_corporates_data,
                     op_args=[org],
                     provide_context=True,
@@ -51,7 +61,7 @@ class EntityTaskGroup:
                 
                 # Sanctions task for organization
                 sanctions_task = PythonOperator(
-                    task_id=f'sanctions_org_{org_key}',
+                    task_id=sanctions_id,
                     python_callable=check_sanctions,
                     op_args=['Company', org_name],
                     provide_context=True,
@@ -60,7 +70,7 @@ class EntityTaskGroup:
                 
                 # Wikidata task for organization
                 wikidata_task = PythonOperator(
-                    task_id=f'wikidata_{org_key}',
+                    task_id=wikidata_id,
                     python_callable=query_wikidata,
                     op_args=[org_name],
                     provide_context=True,
@@ -69,7 +79,7 @@ class EntityTaskGroup:
                 
                 # Adverse news task for organization
                 news_task = PythonOperator(
-                    task_id=f'news_org_{org_key}',
+                    task_id=news_id,
                     python_callable=check_adverse_news,
                     op_args=[org_name],
                     provide_context=True,
@@ -81,12 +91,7 @@ class EntityTaskGroup:
                 parent_task >> wikidata_task
                 parent_task >> news_task
                 
-                task_ids.extend([
-                    f'opencorporates_{org_key}',
-                    f'sanctions_org_{org_key}',
-                    f'wikidata_{org_key}',
-                    f'news_org_{org_key}'
-                ])
+                task_ids.extend([opencorporates_id, sanctions_id, wikidata_id, news_id])
                 
             return task_group, task_ids
     
@@ -115,15 +120,17 @@ class EntityTaskGroup:
                 if not person_name:
                     continue
                     
-                person_key = person_name.replace(' ', '_')
+                person_key = person_name.translate(_SPACE)
                 logger.info(f"Creating enrichment tasks for person: {person_name}")
                 
-                # Task ID prefix based on source
-                id_prefix = f"{prefix}" if prefix else ""
+                # Task IDs, prefixed based on source
+                pep_id, sanctions_id, news_id = (
+                    template.format(p=prefix, k=person_key) for template in PERSON_TASK_TEMPLATES
+                )
                 
                 # PEP task for person
                 pep_task = PythonOperator(
-                    task_id=f'{id_prefix}pep_{person_key}',
+                    task_id=pep_id,
                     python_callable=check_pep_list,
                     op_args=[person_name],
                     provide_context=True,
@@ -132,7 +139,7 @@ class EntityTaskGroup:
                 
                 # Sanctions task for person
                 sanctions_task = PythonOperator(
-                    task_id=f'{id_prefix}sanctions_person_{person_key}',
+                    task_id=sanctions_id,
                     python_callable=check_sanctions,
                     op_args=['Person', person_name],
                     provide_context=True,
@@ -141,7 +148,7 @@ class EntityTaskGroup:
                 
                 # Adverse news task for person
                 news_task = PythonOperator(
-                    task_id=f'{id_prefix}news_person_{person_key}',
+                    task_id=news_id,
                     python_callable=check_adverse_news,
                     op_args=[person_name],
                     provide_context=True,
@@ -152,10 +159,6 @@ class EntityTaskGroup:
                 parent_task >> sanctions_task
                 parent_task >> news_task
                 
-                task_ids.extend([
-                    f'{id_prefix}pep_{person_key}',
-                    f'{id_prefix}sanctions_person_{person_key}',
-                    f'{id_prefix}news_person_{person_key}'
-                ])
+                task_ids.extend([pep_id, sanctions_id, news_id])
                 
             return task_group, task_ids
\ No newline at end of file
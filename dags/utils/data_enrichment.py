@@ -1,11 +1,17 @@
 import os
-import json
+import orjson
 import logging
-import requests
+import httpx
 import pycountry
 import re
-import csv
-from SPARQLWrapper import SPARQLWrapper, JSON
+import pickle
+import uuid
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from rapidfuzz import fuzz, process
 
 from dags.config.settings import (
     RESULTS_FOLDER, OPENCORPORATES_API_KEY, OPENSANCTIONS_API_KEY, 
@@ -16,10 +22,38 @@ from dags.config.settings import (
 from dags.utils.transaction_folder import (
     get_transaction_folder, save_transaction_data, load_transaction_data
 )
+from dags.utils.http_cache import cached_lookup
+from dags.utils.http_pool import get_http_client
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Timeout of Wikidata SPARQL queries in seconds, so a stuck query doesn't hold up
+# the enrichment of an organization
+WIKIDATA_QUERY_TIMEOUT = 15.0
+
+# Maximum number of articles requested from GDELT per entity
+GDELT_MAX_RECORDS = 75
+
+# XCom key under which Wikidata tasks share the people associated with an organization
+WIKIDATA_PEOPLE_XCOM_KEY = 'associated_people'
+
+# Maximum number of entities matched against the sanctions lists per request
+SANCTIONS_BATCH_SIZE = 50
+
+# Minimum rapidfuzz similarity (0-100) of a PEP name to the searched name
+PEP_MATCH_THRESHOLD = 85
+
+# Version of the pickled PEP index format, so indexes in an older format are rebuilt
+_PEP_INDEX_VERSION = 2
+
+# Serializes loading the PEP index, so the entity threads of a task don't each
+# read or build it on a cold cache
+_PEP_INDEX_LOCK = threading.Lock()
+
+# Punctuation stripped from names before PEP matching
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
 def _get_transaction_id_from_context(context=None, obj=None):
     """
     Extract transaction ID from context, object, or default to 'unknown_transaction'.
@@ -35,8 +69,11 @@ def _get_transaction_id_from_context(context=None, obj=None):
     if obj and isinstance(obj, dict) and 'transaction_id' in obj:
         return obj['transaction_id']
         
-    # Then try to get it from the context
+    # Then try to get it from the context, preferring an explicitly passed ID
     if context:
+        if context.get('transaction_id'):
+            return context['transaction_id']
+        
         dag_run = context.get('dag_run')
         if dag_run and hasattr(dag_run, 'conf'):
             conf = dag_run.conf
@@ -45,6 +82,75 @@ def _get_transaction_id_from_context(context=None, obj=None):
     
     return "unknown_transaction"
 
+def run_lookups_concurrently(lookups):
+    """
+    Run independent enrichment lookups concurrently.
+    
+    The lookups are blocking network requests, so running them in threads makes
+    the total wall time that of the slowest lookup rather than their sum.
+    
+    Args:
+        lookups: Dict mapping result keys to zero-argument callables
+        
+    Returns:
+        Dict mapping the same keys to the results of the callables
+    """
+    with ThreadPoolExecutor(max_workers=len(lookups) or 1) as executor:
+        futures = {key: executor.submit(lookup) for key, lookup in lookups.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+def process_entities_concurrently(process_entity, entities, max_workers):
+    """
+    Process a list of entities concurrently, a bounded number at a time.
+    
+    Args:
+        process_entity: Function processing a single entity
+        entities: List of entities to process
+        max_workers: Maximum number of entities processed at the same time
+        
+    Returns:
+        List of the results of process_entity, in the order of the entities
+    """
+    if not entities:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(entities))) as executor:
+        return list(executor.map(process_entity, entities))
+
+@lru_cache(maxsize=None)
+def _country_alpha2(country_name):
+    """
+    Convert a country name to its lowercase ISO 3166 alpha-2 code.
+    
+    Exact names are tried first, then pycountry's lookup, which also matches
+    codes and official or common names.
+    
+    Args:
+        country_name: The country name
+        
+    Returns:
+        The country code, or None if the country is unknown
+    """
+    try:
+        country = pycountry.countries.get(name=country_name) or pycountry.countries.lookup(country_name)
+    except LookupError:
+        return None
+    return country.alpha_2.lower()
+
+@cached_lookup("opencorporates")
+def _search_open_corporates(organization_name, country_code):
+    """Search OpenCorporates for companies by name, optionally within a country."""
+    params = {
+        "q": organization_name,
+        "api_token": OPENCORPORATES_API_KEY
+    }
+    if country_code:
+        params["country_code"] = country_code
+    
+    response = get_http_client().get("https://api.opencorporates.com/v0.4/companies/search", params=params)
+    response.raise_for_status()
+    return orjson.loads(response.content)
+
 def get_open_corporates_data(organization_info, **context):
     """
     Get company information from OpenCorporates API.
@@ -58,24 +164,12 @@ def get_open_corporates_data(organization_info, **context):
             logger.warning("No organization name provided")
             return {"status": "failed", "reason": "No organization name provided", "data": None}
         
-        params = {
-            "q": organization_name,
-            "api_token": OPENCORPORATES_API_KEY
-        }
-        
-        # Add jurisdiction if available
-        if jurisdiction:
-            # Convert country name to code if needed
-            try:
-                country = pycountry.countries.get(name=jurisdiction)
-                if country:
-                    params["country_code"] = country.alpha_2.lower()
-            except:
-                logger.warning(f"Could not convert jurisdiction {jurisdiction} to country code")
+        # Add jurisdiction if available, converting the country name to a code
+        country_code = _country_alpha2(jurisdiction) if jurisdiction else None
+        if jurisdiction and not country_code:
+            logger.warning(f"Could not convert jurisdiction {jurisdiction} to country code")
         
-        response = requests.get("https://api.opencorporates.com/v0.4/companies/search", params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = _search_open_corporates(organization_name, country_code)
         
         # Get first result if available
         if (data 
@@ -99,13 +193,79 @@ def get_open_corporates_data(organization_info, **context):
             logger.warning(f"No results found for {organization_name}")
             return {"status": "no_results", "reason": f"No results found for {organization_name}", "data": None}
             
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error during OpenCorporates request: {str(e)}")
         return {"status": "failed", "reason": f"API request failed: {str(e)}", "data": None}
     except Exception as e:
         logger.error(f"Error getting OpenCorporates data: {str(e)}")
         return {"status": "failed", "reason": f"Unknown error: {str(e)}", "data": None}
 
+def _match_sanctions_batch(entity_type, entity_names):
+    """
+    Match entities against the OpenSanctions sanctions lists in a single request.
+    
+    Args:
+        entity_type: The schema of the entities ('Company' or 'Person')
+        entity_names: The names of the entities
+        
+    Returns:
+        List with the high confidence matches of each entity, in the order of entity_names
+    """
+    headers = {"Authorization": f"ApiKey {OPENSANCTIONS_API_KEY}"}
+    
+    queries = {
+        f"q{i}": {"schema": entity_type, "properties": {"name": [entity_name]}}
+        for i, entity_name in enumerate(entity_names)
+    }
+    
+    response = get_http_client().post(
+        "https://api.opensanctions.org/match/sanctions?algorithm=best", json={"queries": queries}, headers=headers
+    )
+    response.raise_for_status()
+    
+    data = orjson.loads(response.content)
+    responses = data.get("responses", {})
+    
+    # Filter for high confidence matches
+    return [
+        [res for res in responses.get(query_id, {}).get("results", []) if res.get("score", 0) > 0.70]
+        for query_id in queries
+    ]
+
+@cached_lookup("opensanctions")
+def _match_sanctions(entity_type, entity_name):
+    """Match an entity against the OpenSanctions sanctions lists, keeping high confidence matches."""
+    return _match_sanctions_batch(entity_type, [entity_name])[0]
+
+def prefetch_sanctions(entity_type, entity_names):
+    """
+    Match many entities against the sanctions lists with batched requests.
+    
+    The results are stored in the lookup cache, so the check_sanctions calls for
+    these entities that follow are answered without a request each. Entities
+    already cached are skipped; if a batch fails, its entities are left to be
+    looked up individually.
+    
+    Args:
+        entity_type: The schema of the entities ('Company' or 'Person')
+        entity_names: The names of the entities
+    """
+    names = list(dict.fromkeys(
+        name for name in entity_names if name and not _match_sanctions.is_cached(entity_type, name)
+    ))
+    
+    for start in range(0, len(names), SANCTIONS_BATCH_SIZE):
+        batch_names = names[start:start + SANCTIONS_BATCH_SIZE]
+        try:
+            batch_results = _match_sanctions_batch(entity_type, batch_names)
+        except Exception as e:
+            logger.warning(f"Batched sanctions check of {len(batch_names)} entities failed: {str(e)}")
+            continue
+        
+        for entity_name, results in zip(batch_names, batch_results):
+            _match_sanctions.prime((entity_type, entity_name), results)
+        logger.info(f"Checked {len(batch_names)} entities against sanctions lists in one request")
+
 def check_sanctions(entity_type, entity_name, **context):
     """
     Check if an entity is on sanctions lists using OpenSanctions API.
@@ -116,21 +276,7 @@ def check_sanctions(entity_type, entity_name, **context):
         if not entity_name:
             return {"status": "failed", "reason": "No entity name provided", "data": []}
         
-        session = requests.Session()
-        session.headers["Authorization"] = f"ApiKey {OPENSANCTIONS_API_KEY}"
-        
-        query = {"schema": entity_type, "properties": {"name": [entity_name]}}
-        batch = {"queries": {"q1": query}}
-        
-        response = session.post("https://api.opensanctions.org/match/sanctions?algorithm=best", json=batch)
-        response.raise_for_status()
-        
-        data = response.json()
-        responses = data.get("responses", {})
-        results = responses.get("q1", {}).get("results", [])
-        
-        # Filter for high confidence matches
-        high_confidence_results = [res for res in results if res.get("score", 0) > 0.70]
+        high_confidence_results = _match_sanctions(entity_type, entity_name)
         
         # Save the sanctions check results to the transaction folder
         subfolder = "entity_data/organization_results/sanctions" if entity_type == "Company" else "entity_data/people_results/sanctions"
@@ -145,13 +291,94 @@ def check_sanctions(entity_type, entity_name, **context):
             
         return {"status": "success", "data": high_confidence_results}
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error during OpenSanctions request: {str(e)}")
         return {"status": "failed", "reason": f"API request failed: {str(e)}", "data": []}
     except Exception as e:
         logger.error(f"Error checking sanctions: {str(e)}")
         return {"status": "failed", "reason": f"Unknown error: {str(e)}", "data": []}
 
+@cached_lookup("wikidata")
+def _query_wikidata_entity(entity_name):
+    """
+    Look up an entity in Wikidata with SPARQL.
+    
+    Returns:
+        Dict with the entity ID, its properties and its associated people (name
+        and role), or None if no entity was found
+    """
+    search_name = entity_name.replace('\\', '\\\\').replace('"', '\\"')
+    
+    # Find the entity and fetch its properties and associated people (founders,
+    # CEOs, key people) in a single query; ?kind tells the rows apart, and the
+    # "entity" row is returned even if the entity has neither
+    query = f"""
+    SELECT ?company ?kind ?propLabel ?valueLabel ?person ?personLabel ?roleLabel WHERE {{
+      SERVICE wikibase:mwapi {{
+        bd:serviceParam wikibase:endpoint "www.wikidata.org";
+                        wikibase:api "EntitySearch";
+                        wikibase:limit 1;
+                        mwapi:search "{search_name}";
+                        mwapi:language "en".
+        ?company wikibase:apiOutputItem mwapi:item.
+      }}
+      {{
+        BIND("entity" AS ?kind)
+      }} UNION {{
+        ?company ?p ?value .
+        ?prop wikibase:directClaim ?p .
+        FILTER(?prop IN (wdt:P17, wdt:P1454, wdt:P112, wdt:P169, wdt:P571, wdt:P856))
+        BIND("property" AS ?kind)
+      }} UNION {{
+        ?company ?rel ?person .
+        ?role wikibase:directClaim ?rel .
+        FILTER(?role IN (wdt:P169, wdt:P112, wdt:P3320))
+        ?person wdt:P31 wd:Q5 .  # Filter for humans
+        BIND("person" AS ?kind)
+      }}
+      SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
+    }}
+    """
+    
+    # Sent over the shared client, which keeps the connection to WDQS alive
+    response = get_http_client().post(
+        "https://query.wikidata.org/sparql",
+        data={"query": query},
+        headers={"Accept": "application/sparql-results+json"},
+        timeout=WIKIDATA_QUERY_TIMEOUT
+    )
+    response.raise_for_status()
+    bindings = orjson.loads(response.content)["results"]["bindings"]
+    
+    if not bindings:
+        return None
+    
+    # Get the entity ID
+    entity_id = bindings[0]["company"]["value"].split("/")[-1]
+    
+    properties = {}
+    people = []
+    seen_people = set()
+    for result in bindings:
+        kind = result["kind"]["value"]
+        
+        if kind == "property":
+            prop_label = result["propLabel"]["value"]
+            value_label = result.get("valueLabel", {}).get("value", "Unknown")
+            properties[prop_label] = value_label
+        
+        elif kind == "person":
+            person_name = result.get("personLabel", {}).get("value")
+            role = result.get("roleLabel", {}).get("value", "associated person")
+            
+            # Keep at most 10 distinct people
+            key = (result["person"]["value"], person_name, role)
+            if person_name and key not in seen_people and len(seen_people) < 10:
+                seen_people.add(key)
+                people.append({"name": person_name, "role": role})
+    
+    return {"entity_id": entity_id, "properties": properties, "people": people}
+
 def query_wikidata(entity_name, **context):
     """
     Query Wikidata for information about an organization using SPARQL.
@@ -159,87 +386,30 @@ def query_wikidata(entity_name, **context):
     """
     try:
         transaction_id = _get_transaction_id_from_context(context)
-            
-        sparql = SPARQLWrapper("https://query.wikidata.org/sparql")
-        
-        # First, find the entity ID in Wikidata
-        entity_query = f"""
-        SELECT ?company ?companyLabel WHERE {{
-          SERVICE wikibase:mwapi {{
-            bd:serviceParam wikibase:endpoint "www.wikidata.org";
-                            wikibase:api "EntitySearch";
-                            mwapi:search "{entity_name}";
-                            mwapi:language "en".
-            ?company wikibase:apiOutputItem mwapi:item.
-          }}
-          SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
-        }}
-        LIMIT 1
-        """
-        
-        sparql.setQuery(entity_query)
-        sparql.setReturnFormat(JSON)
-        results = sparql.query().convert()
-        
-        if not results["results"]["bindings"]:
-            logger.warning(f"No Wikidata entity found for {entity_name}")
-            return {"status": "no_results", "reason": f"No Wikidata entity found for {entity_name}", "data": None, "associated_people": []}
         
-        # Get the entity ID
-        entity_id = results["results"]["bindings"][0]["company"]["value"].split("/")[-1]
+        entity = _query_wikidata_entity(entity_name)
         
-        # Get detailed information about the entity
-        info_query = f"""
-        SELECT ?prop ?propLabel ?value ?valueLabel WHERE {{
-          wd:{entity_id} ?p ?value .
-          ?prop wikibase:directClaim ?p .
-          SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
-          FILTER((?prop = wdt:P17) || (?prop = wdt:P1454) || (?prop = wdt:P112) || (?prop = wdt:P169) || (?prop = wdt:P571) || (?prop = wdt:P856))
-        }}
-        """
-        
-        sparql.setQuery(info_query)
-        info_results = sparql.query().convert()
+        if not entity:
+            logger.warning(f"No Wikidata entity found for {entity_name}")
+            return {"status": "no_results", "reason": f"No Wikidata entity found for {entity_name}", "data": None, "associated_people": []}
         
         # Process the results
         entity_info = {
-            "entity_id": entity_id,
+            "entity_id": entity["entity_id"],
             "entity_name": entity_name,
-            "properties": {}
+            "properties": dict(entity["properties"])
         }
         
-        for result in info_results["results"]["bindings"]:
-            prop_label = result["propLabel"]["value"]
-            value_label = result.get("valueLabel", {}).get("value", "Unknown")
-            entity_info["properties"][prop_label] = value_label
-        
-        # Now look for associated people (founders, CEOs, key people)
-        people_query = f"""
-        SELECT DISTINCT ?person ?personLabel ?roleLabel WHERE {{
-          wd:{entity_id} ?rel ?person .
-          ?role wikibase:directClaim ?rel .
-          FILTER(?role IN (wdt:P169, wdt:P112, wdt:P3320))
-          ?person wdt:P31 wd:Q5 .  # Filter for humans
-          SERVICE wikibase:label {{ bd:serviceParam wikibase:language "en". }}
-        }}
-        LIMIT 10
-        """
-        
-        sparql.setQuery(people_query)
-        people_results = sparql.query().convert()
-        
         # Extract associated people
-        associated_people = []
-        for result in people_results["results"]["bindings"]:
-            person_name = result.get("personLabel", {}).get("value")
-            role = result.get("roleLabel", {}).get("value", "associated person")
-            if person_name:
-                associated_people.append({
-                    "name": person_name,
-                    "role": role,
-                    "source": "wikidata",
-                    "entity_connection": entity_name
-                })
+        associated_people = [
+            {
+                "name": person["name"],
+                "role": person["role"],
+                "source": "wikidata",
+                "entity_connection": entity_name
+            }
+            for person in entity["people"]
+        ]
             
         # Save the Wikidata information to the transaction folder
         full_result = {
@@ -254,6 +424,11 @@ def query_wikidata(entity_name, **context):
             full_result, 
             subfolder="entity_data/organization_results/wikidata"
         )
+        
+        # When run as its own task, share the people with process_wikidata_people
+        task_instance = context.get('ti')
+        if task_instance:
+            task_instance.xcom_push(key=WIKIDATA_PEOPLE_XCOM_KEY, value=associated_people)
             
         return {"status": "success", "data": entity_info, "associated_people": associated_people}
         
@@ -261,6 +436,117 @@ def query_wikidata(entity_name, **context):
         logger.error(f"Error querying Wikidata: {str(e)}")
         return {"status": "failed", "reason": f"Error querying Wikidata: {str(e)}", "data": None, "associated_people": []}
 
+def _simplify_name(name):
+    """Lowercase a name and strip punctuation for PEP matching."""
+    return _PUNCT_RE.sub('', name.lower())
+
+def _pep_name_score(name, pep_name, *, score_cutoff=None, **kwargs):
+    """
+    Score the similarity of a simplified search name and PEP name (0-100).
+    
+    The token set ratio matches names whose words are reordered or where one
+    name has extra words, e.g. a middle name. It scores 100 whenever one word
+    set contains the other, so a single word name would match every name with
+    that word; single word names are therefore compared as whole strings.
+    """
+    if ' ' not in name or ' ' not in pep_name:
+        return fuzz.ratio(name, pep_name, score_cutoff=score_cutoff)
+    return fuzz.token_set_ratio(name, pep_name, score_cutoff=score_cutoff)
+
+def _build_pep_index(pep_data_file):
+    """
+    Read the PEP list and index its rows by the words of their names and aliases.
+    
+    Args:
+        pep_data_file: Path to the PEP CSV file
+        
+    Returns:
+        Tuple of the list of PEP rows, the simplified name and aliases of each
+        row, and a dict mapping each word to the positions of the rows containing it
+    """
+    # Imported here since pandas is slow to import and only needed to build the index
+    import pandas as pd
+    
+    # The C parser reads the file much faster than csv.DictReader; all values are
+    # kept as strings, with empty strings for missing values
+    df = pd.read_csv(pep_data_file, dtype=str, keep_default_na=False, encoding='utf-8', engine='c')
+    pep_rows = df.to_dict('records')
+    
+    names = df['name'] if 'name' in df else [''] * len(df)
+    aliases = df['aliases'] if 'aliases' in df else [''] * len(df)
+    
+    pep_names = []
+    pep_index = defaultdict(set)
+    for position, (name, row_aliases) in enumerate(zip(names, aliases)):
+        # Names are simplified once here rather than on every lookup
+        row_names = tuple(
+            " ".join(_simplify_name(row_name).split())
+            for row_name in [name] + row_aliases.split(';') if row_name.strip()
+        )
+        pep_names.append(row_names)
+        
+        # Search name parts of 2 characters or less are never matched
+        for word in set(" ".join(row_names).split()):
+            if len(word) > 2:
+                pep_index[word].add(position)
+    
+    return pep_rows, pep_names, dict(pep_index)
+
+@lru_cache(maxsize=1)
+def _load_pep_index(pep_data_file, modified_time):
+    """
+    Load the PEP index, building it only when the PEP data file has changed.
+    
+    The index is kept in memory and pickled beside the PEP data file, so task
+    processes reuse the index built by earlier ones instead of parsing the CSV.
+    
+    Args:
+        pep_data_file: Path to the PEP CSV file
+        modified_time: Modification time of the file, so a changed file is reloaded
+        
+    Returns:
+        The PEP index, as returned by _build_pep_index
+    """
+    index_file = f"{pep_data_file}.index.pickle"
+    index_key = (_PEP_INDEX_VERSION, modified_time)
+    
+    try:
+        with open(index_file, 'rb') as f:
+            indexed_key, pep_data = pickle.load(f)
+        if indexed_key == index_key:
+            return pep_data
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not read PEP index {index_file}: {str(e)}")
+    
+    pep_data = _build_pep_index(pep_data_file)
+    logger.info(f"Indexed {len(pep_data[0])} PEP entries from {pep_data_file}")
+    
+    # Write to a temporary file first, so other processes never read a partial index
+    temp_file = f"{index_file}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_file, 'wb') as f:
+            pickle.dump((index_key, pep_data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, index_file)
+    except Exception as e:
+        logger.warning(f"Could not save PEP index {index_file}: {str(e)}")
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    
+    return pep_data
+
+def _get_pep_index(pep_data_file):
+    """
+    Get the PEP index of the current version of the PEP data file.
+    
+    Threads missing the in-memory index wait for the first one to load it,
+    then find it cached.
+    """
+    modified_time = os.path.getmtime(pep_data_file)
+    with _PEP_INDEX_LOCK:
+        return _load_pep_index(pep_data_file, modified_time)
+
 def check_pep_list(person_name, **context):
     """
     Check if a person is on the PEP (Politically Exposed Persons) list.
@@ -276,52 +562,34 @@ def check_pep_list(person_name, **context):
             return {"status": "failed", "reason": f"PEP data file {PEP_DATA_FILE} not found", "data": None}
         
         # Create a simplified name for matching
-        simplified_name = re.sub(r'[^\w\s]', '', person_name.lower())
+        simplified_name = _simplify_name(person_name)
         name_parts = simplified_name.split()
         
-        # Read the PEP data
-        pep_matches = []
+        # Look up the rows sharing a word with the search name in the PEP index,
+        # which is rebuilt only when the PEP data file changes
         try:
-            with open(PEP_DATA_FILE, 'r', encoding='utf-8') as csv_file:
-                # Changed delimiter from tab to comma based on the sample data
-                csv_reader = csv.DictReader(csv_file)
-                
-                for row in csv_reader:
-                    # Check for missing keys and use empty string as default
-                    row_name = row.get('name', '')
-                    row_aliases = row.get('aliases', '').split(';') if row.get('aliases') else []
-                    
-                    # Simplify the row name and aliases for matching
-                    simplified_row_name = re.sub(r'[^\w\s]', '', row_name.lower())
-                    simplified_aliases = [re.sub(r'[^\w\s]', '', alias.lower()) for alias in row_aliases]
-                    
-                    # Improved name matching logic
-                    # Check if any part of the search name appears in the PEP name
-                    name_match = False
-                    for part in name_parts:
-                        if part and len(part) > 2:  # Only consider parts with more than 2 characters
-                            if part in simplified_row_name.split():
-                                name_match = True
-                                break
-                    
-                    # Check if any part of the search name appears in any alias
-                    alias_match = False
-                    for alias in simplified_aliases:
-                        for part in name_parts:
-                            if part and len(part) > 2:
-                                if part in alias.split():
-                                    alias_match = True
-                                    break
-                        if alias_match:
-                            break
-                    
-                    if name_match or alias_match:
-                        pep_matches.append(row)
-        
+            pep_rows, pep_names, pep_index = _get_pep_index(PEP_DATA_FILE)
         except Exception as e:
             logger.error(f"Error reading PEP data file: {str(e)}")
             return {"status": "failed", "reason": f"Error reading PEP data: {str(e)}", "data": None}
         
+        # Only consider parts with more than 2 characters
+        candidates = set().union(*(pep_index.get(part, ()) for part in name_parts if len(part) > 2))
+        
+        # Keep the candidates whose name or one of whose aliases matches the whole
+        # search name closely, rather than sharing a single word with it
+        choices = {
+            (position, i): row_name
+            for position in candidates
+            for i, row_name in enumerate(pep_names[position])
+        }
+        scored = process.extract(
+            " ".join(name_parts), choices,
+            scorer=_pep_name_score, score_cutoff=PEP_MATCH_THRESHOLD, limit=None
+        )
+        positions = {key[0] for _, _, key in scored}
+        pep_matches = [pep_rows[position] for position in sorted(positions)]
+        
         # Save the PEP matches to the transaction folder
         save_transaction_data(
             RESULTS_FOLDER, 
@@ -337,9 +605,52 @@ def check_pep_list(person_name, **context):
         logger.error(f"Error checking PEP list: {str(e)}")
         return {"status": "failed", "reason": f"Error checking PEP list: {str(e)}", "data": None}
 
-def check_adverse_news(entity_name, **context):
+@cached_lookup("gdelt")
+def _fetch_adverse_news(entity_name):
+    """Fetch news articles with a negative tone about an entity from the GDELT API."""
+    # Build the query for fraud, scam, sanctions related news
+    query_terms = "fraud scam scandal sanctions corruption lawsuit investigation"
+    params = {
+        "query": f"{entity_name} {query_terms}",
+        "mode": "artlist",
+        "format": "json",
+        # Bound the response to the most recent articles
+        "maxrecords": GDELT_MAX_RECORDS,
+        "sort": "datedesc"
+    }
+    
+    logger.debug("Querying GDELT API for %s", entity_name)
+    
+    response = get_http_client().get("https://api.gdeltproject.org/api/v2/doc/doc", params=params)
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    
+    articles = data.get("articles", [])
+    
+    # Process and filter articles
+    filtered_articles = []
+    for article in articles:
+        article_info = {
+            "title": article.get("title", ""),
+            "url": article.get("url", ""),
+            "source": article.get("domain", ""),
+            "date": article.get("seendate", ""),
+            "tone": article.get("tone", 0),  # GDELT sentiment score
+            "themes": article.get("themes", [])
+        }
+        
+        # Filter for negative sentiment and relevant themes
+        if article_info["tone"] < -2:  # Negative tone
+            filtered_articles.append(article_info)
+    
+    return filtered_articles
+
+def check_adverse_news(entity_name, entity_type=None, **context):
     """
     Check for adverse news about an entity using the GDELT API.
+    
+    The entity_type ('Company' or 'Person') selects the results subfolder; if it
+    isn't given, it is inferred from the ID of the running task.
     """
     try:
         transaction_id = _get_transaction_id_from_context(context)
@@ -347,41 +658,15 @@ def check_adverse_news(entity_name, **context):
         if not entity_name:
             return {"status": "failed", "reason": "No entity name provided", "data": []}
             
-        # Format entity name for URL
-        formatted_name = entity_name.replace(' ', '+')
-        
-        # Build the query for fraud, scam, sanctions related news
-        query_terms = "fraud+scam+scandal+sanctions+corruption+lawsuit+investigation"
-        url = f"https://api.gdeltproject.org/api/v2/doc/doc?query={formatted_name}+{query_terms}&mode=artlist&format=json"
-        
-        print(f"Querying GDELT API with URL: {url}")
-        
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        articles = data.get("articles", [])
-        
-        # Process and filter articles
-        filtered_articles = []
-        for article in articles:
-            article_info = {
-                "title": article.get("title", ""),
-                "url": article.get("url", ""),
-                "source": article.get("domain", ""),
-                "date": article.get("seendate", ""),
-                "tone": article.get("tone", 0),  # GDELT sentiment score
-                "themes": article.get("themes", [])
-            }
-            
-            # Filter for negative sentiment and relevant themes
-            if article_info["tone"] < -2:  # Negative tone
-                filtered_articles.append(article_info)
-        
-        # Determine the correct subfolder based on the task ID or entity type
-        task_instance = context.get('task_instance')
-        task_id = task_instance.task_id if task_instance else ''
-        is_person = task_id and 'person' in task_id
+        filtered_articles = _fetch_adverse_news(entity_name)
+        
+        # Determine the correct subfolder based on the entity type or task ID
+        if entity_type:
+            is_person = entity_type == 'Person'
+        else:
+            task_instance = context.get('task_instance')
+            task_id = task_instance.task_id if task_instance else ''
+            is_person = task_id and 'person' in task_id
         subfolder = "entity_data/people_results/news" if is_person else "entity_data/organization_results/news"
         
         # Save the adverse news to the transaction folder
@@ -395,7 +680,7 @@ def check_adverse_news(entity_name, **context):
             
         return {"status": "success", "data": filtered_articles}
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error during GDELT request: {str(e)}")
         return {"status": "failed", "reason": f"GDELT API request failed: {str(e)}", "data": []}
     except Exception as e:
@@ -413,27 +698,28 @@ def process_wikidata_people(**context):
             return []
             
         transaction_id = _get_transaction_id_from_context(context)
-            
-        new_people = []
         
         # Get entity extraction result to get original people
-        original_entities = ti.xcom_pull(task_ids='extract_entities')
-        original_people = set()
-        if original_entities and 'people' in original_entities:
-            for person in original_entities['people']:
-                if 'name' in person:
-                    original_people.add(person['name'].lower())
-    
-        # Look for all wikidata results
-        for task_id in ti.xcom_pull(dag_id=context.get('dag').dag_id, include_prior_dates=True) or []:
-            if task_id.startswith('wikidata_'):
-                wikidata_result = ti.xcom_pull(task_ids=task_id)
-                if wikidata_result and 'status' in wikidata_result and wikidata_result['status'] == 'success':
-                    if 'associated_people' in wikidata_result:
-                        for person in wikidata_result['associated_people']:
-                            if person['name'].lower() not in original_people:
-                                new_people.append(person)
-                                original_people.add(person['name'].lower())  # Mark as processed to avoid duplicates
+        original_entities = ti.xcom_pull(task_ids='extract_entities') or {}
+        original_people = {
+            person['name'].lower() for person in original_entities.get('people', []) if 'name' in person
+        }
+        
+        # Pull the people of all Wikidata tasks of this run in a single query
+        dag = context.get('dag')
+        wikidata_task_ids = [
+            task_id for task_id in (dag.task_ids if dag else [])
+            if task_id.rsplit('.', 1)[-1].startswith('wikidata_')
+        ]
+        people_lists = ti.xcom_pull(task_ids=wikidata_task_ids, key=WIKIDATA_PEOPLE_XCOM_KEY) if wikidata_task_ids else []
+        
+        # Keep the first occurrence of each new person
+        discovered = {}
+        for person in chain.from_iterable(people_list or [] for people_list in people_lists or []):
+            name = person['name'].lower()
+            if name not in original_people:
+                discovered.setdefault(name, person)
+        new_people = list(discovered.values())
         
         # Save the new people list to the transaction folder
         save_transaction_data(
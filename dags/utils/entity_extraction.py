@@ -62,6 +62,18 @@ ENTITY_EXTRACTION_SCHEMA = {
     "required": ["transaction_id", "organizations", "people"]
 }
 
+# Prompt for entity extraction; the output structure is enforced by the function
+# schema, so the prompt only carries the instructions and the transaction text
+ENTITY_EXTRACTION_PROMPT = """You are a financial crime expert. Extract entities from the following transaction data:
+
+{transaction_text}
+
+Identify:
+1. Organizations involved (sender and recipient companies/entities)
+2. People mentioned (directors, approvers, beneficiaries)
+3. Transaction details (amount, currency, purpose)
+4. Jurisdictions mentioned (countries, territories)
+"""
 
 def extract_entities_from_text(transaction_text, transaction_id, **context):
     """
@@ -89,19 +101,7 @@ def extract_entities_from_text(transaction_text, transaction_id, **context):
             f.write(transaction_text)
         
         # Create a prompt for entity extraction
-        prompt = f"""
-        You are a financial crime expert. Extract entities from the following transaction data:
-
-        {transaction_text}
-
-        Please identify:
-        1. Organizations involved (sender and recipient companies/entities)
-        2. People mentioned (directors, approvers, beneficiaries)
-        3. Transaction details (amount, currency, purpose)
-        4. Jurisdictions mentioned (countries, territories)
-
-        Provide a structured response with all the entities you identified from the transaction data.
-        """
+        prompt = ENTITY_EXTRACTION_PROMPT.format(transaction_text=transaction_text)
 
         # Call Gemini with function calling
         entities = call_gemini_function(
@@ -1,40 +1,101 @@
+import time
+import random
 import logging
 import json
-from typing import Dict
-import google.generativeai as genai
+import threading
+from typing import Dict, Tuple
+import google.ai.generativelanguage as glm
+from google.api_core import exceptions as google_exceptions
 from google.protobuf.json_format import MessageToDict
 from config.settings import (
-    gemini_key_rotator,
+    get_gemini_key_rotator,
     GEMINI_MODEL,
     GEMINI_TEMPERATURE,
     GEMINI_TOP_P,
     GEMINI_TOP_K,
     GEMINI_MAX_OUTPUT_TOKENS,
 )
+from dags.utils.llm_cache import llm_cache, make_cache_key
 
-def create_genai_model(max_retries=3):
+# Safety settings to reduce blocking
+_SAFETY_SETTINGS = [
+    glm.SafetySetting(category=category, threshold=glm.SafetySetting.HarmBlockThreshold.BLOCK_NONE)
+    for category in (
+        glm.HarmCategory.HARM_CATEGORY_HARASSMENT,
+        glm.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+        glm.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+        glm.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+    )
+]
+
+_GENERATION_CONFIG = {
+    "temperature": GEMINI_TEMPERATURE,
+    "top_p": GEMINI_TOP_P,
+    "top_k": GEMINI_TOP_K,
+    "max_output_tokens": GEMINI_MAX_OUTPUT_TOKENS,
+}
+
+# Clients already created in this process, by API key; each client sends the
+# key it was created with, so no process-wide SDK configuration is involved
+_MODEL_CACHE = {}
+
+# Rate limiting and temporary server errors, retried on the same key after a backoff
+_TRANSIENT_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+# Errors of a rejected API key, which is marked failed and rotated out
+_KEY_ERRORS = (
+    google_exceptions.PermissionDenied,
+    google_exceptions.Unauthenticated,
+    google_exceptions.InvalidArgument,
+)
+
+# Backoff before retrying a transient error, in seconds; capped well below the
+# task timeout so the retries of a call never outlast it
+_BACKOFF_BASE = 0.5
+_BACKOFF_CAP = 8.0
+_BACKOFF_JITTER = 0.25
+
+# Guards the client cache when called from worker threads
+_MODEL_LOCK = threading.Lock()
+
+def _to_gemini_schema(schema: Dict) -> Dict:
     """
-    Create a Generative AI model with key rotation and retry logic.
+    Convert a JSON schema to the schema format of Gemini function declarations.
+
+    :param schema: JSON schema of the function parameters
+    :return: The schema as the fields of a Schema message
+    """
+    converted = {
+        field: schema[field]
+        for field in ("description", "format", "nullable", "enum", "required")
+        if field in schema
+    }
+    if "type" in schema:
+        converted["type_"] = glm.Type[schema["type"].upper()]
+    if "properties" in schema:
+        converted["properties"] = {
+            name: _to_gemini_schema(property_schema)
+            for name, property_schema in schema["properties"].items()
+        }
+    if "items" in schema:
+        converted["items"] = _to_gemini_schema(schema["items"])
+    return converted
+
+def create_genai_model(max_retries=3) -> Tuple[str, glm.GenerativeServiceClient]:
+    """
+    Create a Generative AI client with key rotation and retry logic.
 
     :param max_retries: Maximum number of key rotation attempts
-    :return: Configured GenerativeModel instance
+    :return: Tuple of the API key and the GenerativeServiceClient created with it
     """
     logger = logging.getLogger(__name__)
 
-    # Safety settings to reduce blocking
-    safety_settings = {
-        genai.types.HarmCategory.HARM_CATEGORY_HARASSMENT: genai.types.HarmBlockThreshold.BLOCK_NONE,
-        genai.types.HarmCategory.HARM_CATEGORY_HATE_SPEECH: genai.types.HarmBlockThreshold.BLOCK_NONE,
-        genai.types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: genai.types.HarmBlockThreshold.BLOCK_NONE,
-        genai.types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: genai.types.HarmBlockThreshold.BLOCK_NONE,
-    }
-
-    generation_config = {
-        "temperature": GEMINI_TEMPERATURE,
-        "top_p": GEMINI_TOP_P,
-        "top_k": GEMINI_TOP_K,
-        "max_output_tokens": GEMINI_MAX_OUTPUT_TOKENS,
-    }
+    gemini_key_rotator = get_gemini_key_rotator()
 
     # Track used keys to prevent repeated failures
     used_keys = set()
@@ -48,21 +109,22 @@ def create_genai_model(max_retries=3):
             if current_key in used_keys:
                 continue
 
-            # Configure Gemini with the current key
-            genai.configure(api_key=current_key)
+            with _MODEL_LOCK:
+                # Reuse the client created for this key, or create it
+                model = _MODEL_CACHE.get(current_key)
+                if model is None:
+                    model = glm.GenerativeServiceClient(client_options={"api_key": current_key})
+                    _MODEL_CACHE[current_key] = model
 
-            # Create model
-            model = genai.GenerativeModel(
-                model_name=GEMINI_MODEL,
-                generation_config=generation_config,
-                safety_settings=safety_settings,
-            )
-
-            return model
+            return current_key, model
 
         except Exception as e:
             logger.warning(f"Key rotation attempt {attempt + 1} failed: {e}")
 
+            # Drop any state for the key, so it is set up afresh next time
+            with _MODEL_LOCK:
+                _MODEL_CACHE.pop(current_key, None)
+
             # Mark the current key as failed
             gemini_key_rotator.mark_key_failed(current_key)
             used_keys.add(current_key)
@@ -92,65 +154,108 @@ def call_gemini_function(
         The function parameters returned by Gemini (JSON serializable)
     """
     logger = logging.getLogger(__name__)
-    model = create_genai_model()
-
-    # Define the function for Gemini
-    function_declarations = [
-        {
-            "name": function_name,
-            "description": function_schema.get(
-                "description", f"Call function {function_name}"
-            ),
-            "parameters": function_schema,
-        }
-    ]
-
-    # Create the request
-    for attempt in range(max_retries):
-        try:
-            logger.info(f"Calling Gemini function {function_name}, attempt {attempt + 1}")
 
-            response = model.generate_content(
-                prompt,
-                tools=[{"function_declarations": function_declarations}],
-                tool_config={"function_calling_config": {"mode": "any"}},
+    try:
+        # Identical calls at a deterministic temperature are answered from the cache
+        cache_key = None
+        if llm_cache.is_cacheable(_GENERATION_CONFIG):
+            cache_key = make_cache_key(
+                function_name, function_schema, prompt, GEMINI_MODEL, _GENERATION_CONFIG
             )
+            cached_args = llm_cache.get(cache_key)
+            if cached_args is not None:
+                logger.info(f"Using cached result of Gemini function {function_name}")
+                return cached_args
+
+        api_key, model = create_genai_model()
+
+        # Define the function for Gemini and require the model to call it
+        request = glm.GenerateContentRequest(
+            model=f"models/{GEMINI_MODEL}",
+            contents=[glm.Content(role="user", parts=[glm.Part(text=prompt)])],
+            tools=[glm.Tool(function_declarations=[glm.FunctionDeclaration(
+                name=function_name,
+                description=function_schema.get(
+                    "description", f"Call function {function_name}"
+                ),
+                parameters=glm.Schema(_to_gemini_schema(function_schema)),
+            )])],
+            tool_config=glm.ToolConfig(function_calling_config=glm.FunctionCallingConfig(
+                mode=glm.FunctionCallingConfig.Mode.ANY
+            )),
+            generation_config=glm.GenerationConfig(**_GENERATION_CONFIG),
+            safety_settings=_SAFETY_SETTINGS,
+        )
+
+        # Create the request
+        for attempt in range(max_retries):
+            try:
+                logger.info(f"Calling Gemini function {function_name}, attempt {attempt + 1}")
+
+                response = model.generate_content(request=request)
 
-            # Check if function was called
-            function_call = None
-            for candidate in response.candidates:
-                for part in candidate.content.parts:
-                    if (
-                        hasattr(part, "function_call")
-                        and part.function_call
-                    ):  # Changed to hasattr
-                        function_call = MessageToDict(part.function_call._pb)
+                # Check if the function was called; the name is read from the message
+                # directly and only the arguments of the matching call are converted
+                args = None
+                for candidate in response.candidates:
+                    for part in candidate.content.parts:
+                        function_call = getattr(part, "function_call", None)
+                        if function_call and function_call.name == function_name:
+                            args = MessageToDict(function_call._pb.args)
+                            break
+                    if args is not None:
                         break
-                if function_call:
-                    break
 
-            if not function_call:
+                if args is None:
+                    logger.warning(
+                        f"Gemini did not call the function on attempt {attempt + 1}"
+                    )
+                    continue
+
+                logger.debug("Gemini function call %s: %s", function_name, args)
+
+                if cache_key is not None:
+                    llm_cache.set(cache_key, args)
+                return args
+            except _TRANSIENT_ERRORS as e:
+                if attempt == max_retries - 1:
+                    logger.error(f"All function calling attempts for {function_name} have failed.")
+                    raise
+
+                # Retry on the same key; rotating wouldn't help a briefly overloaded API
+                delay = min(_BACKOFF_CAP, _BACKOFF_BASE * 2 ** attempt) + random.uniform(0, _BACKOFF_JITTER)
                 logger.warning(
-                    f"Gemini did not call the function on attempt {attempt + 1}"
+                    f"Function calling attempt {attempt + 1} hit a transient error: {e}, "
+                    f"retrying in {delay:.1f}s"
                 )
-                continue
-            
-            print(function_call)
+                time.sleep(delay)
+            except _KEY_ERRORS as e:
+                logger.warning(f"Function calling attempt {attempt + 1} was rejected: {e}")
 
-            # Parse the function response
-            if function_call.get("name") == function_name:
-                return function_call.get("args", {})
-        except Exception as e:
-            logger.warning(f"Function calling attempt {attempt + 1} failed: {e}")
+                if attempt == max_retries - 1:
+                    logger.error(f"All function calling attempts for {function_name} have failed.")
+                    raise
 
-            # If we've exhausted all retries, raise the last exception
-            if attempt == max_retries - 1:
-                logger.error(
-                    f"All function calling attempts for {function_name} have failed."
-                )
-                raise
+                # Penalize the key the model was created with and rotate to another one
+                with _MODEL_LOCK:
+                    _MODEL_CACHE.pop(api_key, None)
+                get_gemini_key_rotator().mark_key_failed(api_key)
+                api_key, model = create_genai_model()
+            except Exception as e:
+                logger.warning(f"Function calling attempt {attempt + 1} failed: {e}")
 
-    # If we get here, all attempts failed
-    raise RuntimeError(
-        f"Unable to call Gemini function {function_name} after {max_retries} attempts"
-    )
+                # If we've exhausted all retries, raise the last exception
+                if attempt == max_retries - 1:
+                    logger.error(
+                        f"All function calling attempts for {function_name} have failed."
+                    )
+                    raise
+
+        # If we get here, all attempts failed
+        raise RuntimeError(
+            f"Unable to call Gemini function {function_name} after {max_retries} attempts"
+        )
+    finally:
+        # Task processes exit without running atexit handlers, so the cache
+        # statistics are logged after every call
+        llm_cache.log_stats()
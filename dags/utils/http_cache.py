@@ -0,0 +1,79 @@
+"""
+Persistent cache for enrichment API lookups.
+
+Upstream data about an entity (company registries, sanctions lists, Wikidata,
+news) changes on the order of days, while the same counterparties recur across
+many transactions. Lookups are therefore cached on disk, shared by all Airflow
+workers, and keyed on the API name and the normalized lookup arguments.
+"""
+import logging
+import functools
+
+import diskcache
+
+from dags.config.settings import ENRICHMENT_CACHE_FOLDER, ENRICHMENT_CACHE_TTL, ENRICHMENT_CACHE_API_TTLS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+cache = diskcache.Cache(ENRICHMENT_CACHE_FOLDER)
+
+# Marks a cache miss, since None is a valid cached result
+_MISSING = object()
+
+def _normalize(value):
+    """Normalize a lookup argument so case and whitespace variants share a cache entry."""
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    return value
+
+def _cache_key(api_name, func, args):
+    """Build the cache key of a lookup from the API name, the function and its arguments."""
+    return (api_name, func.__qualname__) + tuple(_normalize(arg) for arg in args)
+
+def cached_lookup(api_name, expire=None):
+    """
+    Memoize a lookup function in the persistent cache.
+
+    Only results are cached; exceptions propagate and the next call retries.
+
+    The decorated function also gets an ``is_cached(*args)`` function and a
+    ``prime(args, result)`` function storing a result fetched some other way,
+    e.g. by a batched request covering many lookups.
+
+    Args:
+        api_name: Name of the API, used in the cache key and as the cache tag
+        expire: Time-to-live of cached results in seconds; defaults to the TTL
+            configured for the API, or ENRICHMENT_CACHE_TTL
+
+    Returns:
+        A decorator for the lookup function
+    """
+    if expire is None:
+        expire = ENRICHMENT_CACHE_API_TTLS.get(api_name, ENRICHMENT_CACHE_TTL)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = _cache_key(api_name, func, args)
+
+            result = cache.get(key, default=_MISSING)
+            if result is not _MISSING:
+                logger.info(f"Using cached {api_name} result for {args}")
+                return result
+
+            result = func(*args)
+            cache.set(key, result, expire=expire, tag=api_name)
+            return result
+
+        def is_cached(*args):
+            return _cache_key(api_name, func, args) in cache
+
+        def prime(args, result):
+            cache.set(_cache_key(api_name, func, args), result, expire=expire, tag=api_name)
+
+        wrapper.is_cached = is_cached
+        wrapper.prime = prime
+        return wrapper
+
+    return decorator
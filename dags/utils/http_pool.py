@@ -0,0 +1,92 @@
+"""
+Shared HTTP client for the enrichment API lookups.
+
+The lookups of many entities hit the same few hosts (OpenCorporates,
+OpenSanctions, GDELT) back to back from worker threads. A single client per
+worker process keeps its connections alive and multiplexes requests to a host
+over HTTP/2, instead of every lookup opening a new TCP and TLS connection.
+"""
+import time
+import logging
+import functools
+
+import httpx
+
+from dags.config.settings import ENRICHMENT_USER_AGENT
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Response statuses of rate limiting and transient server errors, which are retried
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+class RetryTransport(httpx.HTTPTransport):
+    """
+    HTTP transport retrying requests that fail with a transient status.
+
+    Retries back off exponentially, or wait as long as the Retry-After header of
+    the response asks, so a rate limited or briefly unavailable API doesn't fail
+    the whole enrichment of an entity.
+    """
+    def __init__(self, max_retries=5, backoff_factor=0.5, max_backoff=30.0, **kwargs):
+        """
+        Initialize the transport.
+
+        Args:
+            max_retries: Maximum number of retries of a request
+            backoff_factor: Delay before the first retry in seconds, doubled on each retry
+            max_backoff: Maximum delay before a retry in seconds
+            kwargs: Arguments of httpx.HTTPTransport
+        """
+        super().__init__(**kwargs)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+    def _retry_delay(self, response, attempt):
+        """Get the delay in seconds before retrying a failed response."""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), self.max_backoff)
+            except ValueError:
+                # HTTP-date values fall back to exponential backoff
+                pass
+        return min(self.backoff_factor * (2 ** attempt), self.max_backoff)
+
+    def handle_request(self, request):
+        for attempt in range(self.max_retries + 1):
+            response = super().handle_request(request)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                return response
+
+            delay = self._retry_delay(response, attempt)
+            response.close()
+            logger.warning(
+                f"{request.method} {request.url.host} returned {response.status_code}, "
+                f"retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})"
+            )
+            time.sleep(delay)
+
+@functools.lru_cache(maxsize=None)
+def get_http_client():
+    """
+    Get the HTTP client shared by the enrichment lookups.
+
+    The client is created once per worker process and is safe to use from
+    multiple threads. Failed connection attempts and transient error responses
+    are retried.
+
+    Returns:
+        The shared httpx.Client
+    """
+    return httpx.Client(
+        timeout=30.0,
+        headers={"User-Agent": ENRICHMENT_USER_AGENT},
+        follow_redirects=True,
+        transport=RetryTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=120)
+        )
+    )
@@ -0,0 +1,123 @@
+"""
+Persistent cache of Gemini function call results.
+
+Failed or retried DAG runs send the same transaction through entity extraction
+and risk assessment again, producing identical prompts. Caching the function
+arguments returned for a prompt skips the remote call, its latency and its
+quota on those reruns.
+"""
+import json
+import hashlib
+import logging
+
+import diskcache
+
+from dags.config.settings import (
+    GEMINI_CACHE_ENABLED, GEMINI_CACHE_ANY, GEMINI_CACHE_FOLDER, GEMINI_CACHE_TTL
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+def make_cache_key(function_name, function_schema, prompt, model, generation_config):
+    """
+    Build the cache key of a function call.
+
+    Args:
+        function_name: Name of the called function
+        function_schema: JSON schema of the function parameters
+        prompt: The prompt sent to the model
+        model: Name of the model
+        generation_config: Generation parameters of the model
+
+    Returns:
+        The SHA-256 hex digest of the call
+    """
+    payload = json.dumps({
+        "function_name": function_name,
+        "function_schema": function_schema,
+        "prompt": prompt,
+        "model": model,
+        "temperature": generation_config.get("temperature"),
+        "top_p": generation_config.get("top_p"),
+        "top_k": generation_config.get("top_k"),
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMCache:
+    """
+    Disk cache of function call arguments, shared by all workers.
+    """
+    def __init__(self, folder, ttl, enabled=True, cache_any=False):
+        """
+        Initialize the cache.
+
+        Args:
+            folder: Folder of the cache database
+            ttl: Time-to-live of cached results in seconds
+            enabled: Whether results are cached at all
+            cache_any: Cache results at any temperature, not only at temperature 0
+        """
+        self.folder = folder
+        self.ttl = ttl
+        self.enabled = enabled
+        self.cache_any = cache_any
+        self.stats = {"hits": 0, "misses": 0, "sets": 0}
+        self._cache = None
+
+    def _store(self):
+        """Open the cache database on first use."""
+        if self._cache is None:
+            self._cache = diskcache.Cache(self.folder)
+        return self._cache
+
+    def is_cacheable(self, generation_config):
+        """
+        Check whether results of calls with a generation config may be cached.
+
+        Args:
+            generation_config: Generation parameters of the model
+
+        Returns:
+            True if caching is enabled and sampling is deterministic or cache_any is set
+        """
+        return self.enabled and (self.cache_any or generation_config.get("temperature") == 0)
+
+    def get(self, key):
+        """
+        Get the cached function arguments of a call.
+
+        Args:
+            key: Cache key from make_cache_key
+
+        Returns:
+            The cached arguments, or None on a miss
+        """
+        args = self._store().get(key)
+        if args is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return args
+
+    def set(self, key, args, ttl=None):
+        """
+        Cache the function arguments of a call.
+
+        Args:
+            key: Cache key from make_cache_key
+            args: Function arguments returned by the model
+            ttl: Time-to-live in seconds; defaults to the cache TTL
+        """
+        self._store().set(key, args, expire=self.ttl if ttl is None else ttl)
+        self.stats["sets"] += 1
+
+    def log_stats(self):
+        """Log the hit and miss counts of this process so far, at debug level."""
+        if any(self.stats.values()):
+            logger.debug(
+                f"Gemini cache: {self.stats['hits']} hits, {self.stats['misses']} misses, "
+                f"{self.stats['sets']} stored"
+            )
+
+llm_cache = LLMCache(GEMINI_CACHE_FOLDER, GEMINI_CACHE_TTL, GEMINI_CACHE_ENABLED, GEMINI_CACHE_ANY)
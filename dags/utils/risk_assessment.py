@@ -10,7 +10,7 @@ from config.settings import (
 
 # Import the transaction folder utilities
 from dags.utils.transaction_folder import (
-    get_transaction_folder, save_transaction_data, load_transaction_data
+    get_transaction_folder, save_transaction_data, load_transaction_data, read_json_file
 )
 
 # Configure logging
@@ -53,6 +53,29 @@ RISK_ASSESSMENT_SCHEMA = {
     "required": ["extracted_entities", "entity_types", "risk_score", "supporting_evidence", "confidence_score", "reason"]
 }
 
+# Prompt for risk assessment, filled with the transaction text and the compact
+# JSON of the extracted entities and their verification results
+RISK_ASSESSMENT_PROMPT = """You are a financial crime expert specialized in Anti-Money Laundering (AML) risk assessment.
+
+Based on the following transaction data and associated information, generate a comprehensive risk assessment:
+
+TRANSACTION:
+{transaction_text}
+
+EXTRACTED ENTITIES AND VERIFICATION RESULTS:
+{assessment_data}
+
+Your task is to:
+1. Analyze the data and identify risk factors
+2. Determine if any parties are on sanctions lists
+3. Check if any individuals are Politically Exposed Persons (PEPs)
+4. Evaluate adverse news and negative publicity
+5. Assess jurisdictional risks
+6. Calculate an overall risk score between 0 and 1 (0 = low risk, 1 = high risk)
+
+For any data that couldn't be fetched successfully, acknowledge that but still make your best assessment with the available information.
+"""
+
 def generate_risk_assessment(transaction_data=None, transaction_id=None, transaction_filepath=None, all_results=None, **context):
     """
     Generate a final risk assessment based on all collected data using Gemini function calling.
@@ -114,15 +137,16 @@ def generate_risk_assessment(transaction_data=None, transaction_id=None, transac
                 for subfolder in ['opencorporates', 'sanctions', 'wikidata', 'news']:
                     subfolder_path = os.path.join(org_results_path, subfolder)
                     if os.path.exists(subfolder_path):
-                        for filename in os.listdir(subfolder_path):
-                            if filename.endswith('.json'):
-                                org_name = filename.replace('.json', '').replace('_', ' ')
-                                if org_name not in assessment_data["organizations"]:
-                                    assessment_data["organizations"][org_name] = {}
-                                
-                                with open(os.path.join(subfolder_path, filename), 'r', encoding='utf-8') as f:
+                        with os.scandir(subfolder_path) as entries:
+                            for entry in entries:
+                                filename = entry.name
+                                if filename.endswith('.json') and entry.is_file():
+                                    org_name = filename.replace('.json', '').replace('_', ' ')
+                                    if org_name not in assessment_data["organizations"]:
+                                        assessment_data["organizations"][org_name] = {}
+                                    
                                     try:
-                                        data = json.load(f)
+                                        data = read_json_file(entry.path)
                                         assessment_data["organizations"][org_name][subfolder] = data
                                     except Exception as e:
                                         logger.error(f"Error loading {subfolder} data for {org_name}: {str(e)}")
@@ -137,15 +161,16 @@ def generate_risk_assessment(transaction_data=None, transaction_id=None, transac
                 for subfolder in ['pep', 'sanctions', 'news']:
                     subfolder_path = os.path.join(people_results_path, subfolder)
                     if os.path.exists(subfolder_path):
-                        for filename in os.listdir(subfolder_path):
-                            if filename.endswith('.json'):
-                                person_name = filename.replace('.json', '').replace('_', ' ')
-                                if person_name not in assessment_data["people"]:
-                                    assessment_data["people"][person_name] = {}
-                                
-                                with open(os.path.join(subfolder_path, filename), 'r', encoding='utf-8') as f:
+                        with os.scandir(subfolder_path) as entries:
+                            for entry in entries:
+                                filename = entry.name
+                                if filename.endswith('.json') and entry.is_file():
+                                    person_name = filename.replace('.json', '').replace('_', ' ')
+                                    if person_name not in assessment_data["people"]:
+                                        assessment_data["people"][person_name] = {}
+                                    
                                     try:
-                                        data = json.load(f)
+                                        data = read_json_file(entry.path)
                                         assessment_data["people"][person_name][subfolder] = data
                                     except Exception as e:
                                         logger.error(f"Error loading {subfolder} data for {person_name}: {str(e)}")
@@ -154,8 +179,7 @@ def generate_risk_assessment(transaction_data=None, transaction_id=None, transac
         discovered_people_file = os.path.join(transaction_folder, "wikidata_discovered_people.json")
         if os.path.exists(discovered_people_file):
             try:
-                with open(discovered_people_file, 'r', encoding='utf-8') as f:
-                    assessment_data["wikidata_people"] = json.load(f)
+                assessment_data["wikidata_people"] = read_json_file(discovered_people_file)
             except Exception as e:
                 logger.error(f"Error loading discovered people data: {str(e)}")
         elif all_results and 'discovered_people' in all_results:
@@ -165,28 +189,12 @@ def generate_risk_assessment(transaction_data=None, transaction_id=None, transac
         save_transaction_data(RESULTS_FOLDER, transaction_id, "raw_assessment_data.json", assessment_data)
         logger.info(f"Saved raw assessment data to transaction folder")
         
-        # Create a prompt for risk assessment
-        prompt = f"""
-        You are a financial crime expert specialized in Anti-Money Laundering (AML) risk assessment.
-        
-        Based on the following transaction data and associated information, generate a comprehensive risk assessment:
-        
-        TRANSACTION:
-        {transaction_text}
-        
-        EXTRACTED ENTITIES AND VERIFICATION RESULTS:
-        {json.dumps(assessment_data, indent=2)}
-        
-        Your task is to:
-        1. Analyze the data and identify risk factors
-        2. Determine if any parties are on sanctions lists
-        3. Check if any individuals are Politically Exposed Persons (PEPs)
-        4. Evaluate adverse news and negative publicity
-        5. Assess jurisdictional risks
-        6. Calculate an overall risk score between 0 and 1 (0 = low risk, 1 = high risk)
-        
-        For any data that couldn't be fetched successfully, acknowledge that but still make your best assessment with the available information.
-        """
+        # Create a prompt for risk assessment; the data is sent as compact JSON,
+        # since indentation and escaped non-ASCII characters only add input tokens
+        prompt = RISK_ASSESSMENT_PROMPT.format(
+            transaction_text=transaction_text,
+            assessment_data=json.dumps(assessment_data, separators=(',', ':'), ensure_ascii=False)
+        )
         
         # Call Gemini with function calling
         risk_assessment = call_gemini_function(
@@ -202,6 +210,9 @@ def generate_risk_assessment(transaction_data=None, transaction_id=None, transac
         if "timestamp" not in risk_assessment or not risk_assessment["timestamp"]:
             risk_assessment["timestamp"] = datetime.now().isoformat()
         
+        # Store the entity count so readers of the summary don't need to parse the list
+        risk_assessment["entities_count"] = len(risk_assessment.get("extracted_entities") or [])
+        
         # Save the risk assessment to the transaction folder
         save_transaction_data(RESULTS_FOLDER, transaction_id, "risk_assessment.json", risk_assessment)
         logger.info(f"Saved risk assessment to transaction folder")
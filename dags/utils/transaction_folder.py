@@ -6,11 +6,66 @@ Each transaction is stored in its own folder with a standardized structure.
 """
 import os
 import json
+import uuid
 import logging
 from typing import Dict, List, Any, Optional
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# Folders this process has created or found to exist, so the many small saves of
+# an enrichment task don't each stat and mkdir the same folders again
+_existing_folders = set()
+
+def _ensure_folder(folder: str) -> None:
+    """Create a folder if it isn't known to exist yet."""
+    if folder not in _existing_folders:
+        os.makedirs(folder, exist_ok=True)
+        _existing_folders.add(folder)
+
+def read_json_file(file_path: str) -> Any:
+    """
+    Read and parse a JSON file using orjson.
+    
+    Args:
+        file_path: Path to the JSON file
+        
+    Returns:
+        The parsed JSON data
+    """
+    with open(file_path, 'rb') as f:
+        return orjson.loads(f.read())
+
+def write_json_file(file_path: str, data: Any) -> None:
+    """
+    Write data to a JSON file atomically, indented by two spaces.
+    
+    The data is serialized with orjson, falling back to the standard library for
+    objects orjson can't serialize, and written to a temporary file that then
+    replaces the target so readers never see a partially written file.
+    
+    Args:
+        file_path: Path to the JSON file
+        data: The data to write
+    """
+    try:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    except TypeError:
+        content = json.dumps(data, indent=2).encode('utf-8')
+    
+    temp_path = f"{file_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
 def get_transaction_folder(results_folder: str, transaction_id: str) -> str:
     """
     Get the path to the transaction folder, creating it if it doesn't exist.
@@ -25,7 +80,7 @@ def get_transaction_folder(results_folder: str, transaction_id: str) -> str:
     transaction_folder = os.path.join(results_folder, transaction_id)
     
     # Create the transaction folder if it doesn't exist
-    if not os.path.exists(transaction_folder):
+    if transaction_folder not in _existing_folders and not os.path.exists(transaction_folder):
         logger.info(f"Creating transaction folder: {transaction_folder}")
         os.makedirs(transaction_folder, exist_ok=True)
         
@@ -39,6 +94,7 @@ def get_transaction_folder(results_folder: str, transaction_id: str) -> str:
         os.makedirs(os.path.join(transaction_folder, "people_results", "sanctions"), exist_ok=True)
         os.makedirs(os.path.join(transaction_folder, "people_results", "news"), exist_ok=True)
     
+    _existing_folders.add(transaction_folder)
     return transaction_folder
 
 def save_transaction_data(results_folder: str, transaction_id: str, 
@@ -61,15 +117,20 @@ def save_transaction_data(results_folder: str, transaction_id: str,
     # If subfolder is specified, add it to the path
     if subfolder:
         save_folder = os.path.join(transaction_folder, subfolder)
-        os.makedirs(save_folder, exist_ok=True)
+        _ensure_folder(save_folder)
     else:
         save_folder = transaction_folder
     
     file_path = os.path.join(save_folder, file_name)
     
     # Save the data
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
+    try:
+        write_json_file(file_path, data)
+    except FileNotFoundError:
+        # The folder was removed since it was created; create it again
+        _existing_folders.difference_update({transaction_folder, save_folder})
+        os.makedirs(save_folder, exist_ok=True)
+        write_json_file(file_path, data)
     
     logger.info(f"Saved transaction data to: {file_path}")
     
@@ -91,10 +152,6 @@ def load_transaction_data(results_folder: str, transaction_id: str,
     """
     transaction_folder = os.path.join(results_folder, transaction_id)
     
-    # If the transaction folder doesn't exist, return None
-    if not os.path.exists(transaction_folder):
-        return None
-    
     # If subfolder is specified, add it to the path
     if subfolder:
         load_folder = os.path.join(transaction_folder, subfolder)
@@ -103,15 +160,11 @@ def load_transaction_data(results_folder: str, transaction_id: str,
     
     file_path = os.path.join(load_folder, file_name)
     
-    # Check if the file exists
-    if not os.path.exists(file_path):
-        return None
-    
-    # Load the data
+    # Load the data; a missing transaction folder or file just fails the open
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
+        return read_json_file(file_path)
+    except FileNotFoundError:
+        return None
     except Exception as e:
         logger.warning(f"Error loading transaction data from {file_path}: {str(e)}")
         return None
@@ -129,15 +182,22 @@ def list_transaction_results(results_folder: str) -> List[str]:
     if not os.path.exists(results_folder):
         return []
     
-    # Get all subdirectories that could be transaction folders
+    # Markers of the expected transaction folder structure
+    structure_markers = {"organization_results", "people_results"}
+
+    # Get all subdirectories that could be transaction folders; scandir entries
+    # carry their file type, so no extra stat call is needed per item
     transaction_ids = []
-    for item in os.listdir(results_folder):
-        item_path = os.path.join(results_folder, item)
-        if os.path.isdir(item_path) and not item.startswith('.'):
+    with os.scandir(results_folder) as items:
+        for item in items:
+            if not item.is_dir() or item.name.startswith('.'):
+                continue
+
             # Check if it has the expected structure
-            if (os.path.exists(os.path.join(item_path, "organization_results")) or
-                os.path.exists(os.path.join(item_path, "people_results")) or
-                any(f.endswith('.json') for f in os.listdir(item_path) if os.path.isfile(os.path.join(item_path, f)))):
-                transaction_ids.append(item)
+            with os.scandir(item.path) as children:
+                if any(child.name in structure_markers or
+                       (child.name.endswith('.json') and child.is_file())
+                       for child in children):
+                    transaction_ids.append(item.name)
     
-    return transaction_ids
\ No newline at end of file
+    return transaction_ids
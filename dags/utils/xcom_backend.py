@@ -0,0 +1,131 @@
+"""
+XCom backend that offloads large values to the shared data volume.
+
+Task results such as the combined enrichment results of a transaction can be
+several megabytes. Instead of storing them in the Airflow metadata database,
+values above a size threshold are written as JSON files to a folder shared by
+all Airflow containers, and only a reference to the file is stored as the XCom.
+
+Enable it with AIRFLOW__CORE__XCOM_BACKEND=dags.utils.xcom_backend.FileXComBackend.
+
+Only JSON-native values (dicts, lists, strings, numbers, booleans and None) are
+offloaded, so a value reads back the same as it was pushed; values containing
+e.g. datetimes are left to the default serialization.
+
+Clearing XComs or running ``airflow db clean`` only deletes the references, so
+the files of old DAG runs are removed by the xcom_file_cleanup DAG, which
+deletes run folders not written to for XCOM_RETENTION_DAYS days.
+"""
+import os
+import re
+import time
+import shutil
+import logging
+from typing import Any
+
+import orjson
+from airflow.models.xcom import BaseXCom
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Read directly from the environment rather than dags.config.settings, since the
+# backend is also imported by the scheduler and webserver
+XCOM_FOLDER = os.environ.get('XCOM_FOLDER', '/opt/airflow/data/xcom')
+XCOM_OFFLOAD_THRESHOLD = int(os.environ.get('XCOM_OFFLOAD_THRESHOLD', str(64 * 1024)))  # bytes
+XCOM_RETENTION_DAYS = float(os.environ.get('XCOM_RETENTION_DAYS', '7'))
+
+# Prefix of the XCom values that reference an offloaded file
+XCOM_FILE_PREFIX = "xcom-file://"
+
+# orjson serializes datetimes, dataclasses and subclasses of builtin types, which
+# wouldn't read back as the same type; these raise instead
+_ORJSON_NATIVE_ONLY = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_SUBCLASS
+)
+
+# Characters replaced in identifiers used as path components
+_UNSAFE_PATH_CHARS_RE = re.compile(r'[^A-Za-z0-9_.-]')
+
+def _safe_path_part(value: Any) -> str:
+    """Make a DAG, run or task identifier safe to use as a path component."""
+    return _UNSAFE_PATH_CHARS_RE.sub('_', str(value))
+
+class FileXComBackend(BaseXCom):
+    """
+    XCom backend storing values larger than XCOM_OFFLOAD_THRESHOLD as JSON files.
+    """
+
+    @staticmethod
+    def serialize_value(value: Any, *, key=None, task_id=None, dag_id=None, run_id=None, map_index=None, **kwargs):
+        try:
+            content = orjson.dumps(value, option=_ORJSON_NATIVE_ONLY)
+        except TypeError:
+            # Leave values that aren't JSON-native to the default serialization
+            content = None
+
+        if content is not None and len(content) > XCOM_OFFLOAD_THRESHOLD:
+            run_folder = os.path.join(XCOM_FOLDER, _safe_path_part(dag_id), _safe_path_part(run_id))
+            os.makedirs(run_folder, exist_ok=True)
+
+            file_name = _safe_path_part(task_id)
+            if map_index is not None and map_index >= 0:
+                file_name += f"_{map_index}"
+            file_path = os.path.join(run_folder, f"{file_name}_{_safe_path_part(key)}.json")
+
+            with open(file_path, 'wb') as f:
+                f.write(content)
+
+            logger.info(f"Offloaded {len(content)} byte XCom {key} of {task_id} to {file_path}")
+            value = f"{XCOM_FILE_PREFIX}{file_path}"
+
+        return BaseXCom.serialize_value(
+            value, key=key, task_id=task_id, dag_id=dag_id, run_id=run_id, map_index=map_index
+        )
+
+    @staticmethod
+    def deserialize_value(result) -> Any:
+        value = BaseXCom.deserialize_value(result)
+
+        if isinstance(value, str) and value.startswith(XCOM_FILE_PREFIX):
+            with open(value[len(XCOM_FILE_PREFIX):], 'rb') as f:
+                return orjson.loads(f.read())
+
+        return value
+
+    def orm_deserialize_value(self) -> Any:
+        # Show the file reference in the web UI instead of loading the file
+        return BaseXCom._deserialize_value(self, True)
+
+def purge_offloaded_xcoms(max_age_days: float = XCOM_RETENTION_DAYS) -> int:
+    """
+    Delete the offloaded XCom files of DAG runs not written to for a number of days.
+
+    Args:
+        max_age_days: Minimum age of a run folder in days
+
+    Returns:
+        The number of run folders deleted
+    """
+    cutoff = time.time() - max_age_days * 24 * 3600
+    removed = 0
+
+    try:
+        with os.scandir(XCOM_FOLDER) as dag_folders:
+            dag_paths = [entry.path for entry in dag_folders if entry.is_dir()]
+    except FileNotFoundError:
+        return 0
+
+    for dag_path in dag_paths:
+        with os.scandir(dag_path) as run_folders:
+            old_runs = [
+                entry.path for entry in run_folders
+                if entry.is_dir() and entry.stat().st_mtime < cutoff
+            ]
+
+        for run_path in old_runs:
+            shutil.rmtree(run_path, ignore_errors=True)
+            removed += 1
+
+    logger.info(f"Deleted offloaded XComs of {removed} DAG runs older than {max_age_days} days")
+    return removed
@@ -0,0 +1,40 @@
+from airflow import DAG
+from airflow.decorators import task
+from airflow.utils.dates import days_ago
+import logging
+from datetime import timedelta
+
+from dags.utils.xcom_backend import purge_offloaded_xcoms
+
+# Configure logging; handlers and levels come from Airflow's logging config
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# Define default arguments for the DAG
+default_args = {
+    'owner': 'airflow',
+    'depends_on_past': False,
+    'email_on_failure': False,
+    'email_on_retry': False,
+    'retries': 1,
+    'retry_delay': timedelta(minutes=5),
+}
+
+# Offloaded XCom files outlive their references, which XCom clearing and
+# `airflow db clean` delete from the metadata database only
+with DAG(
+    'xcom_file_cleanup',
+    default_args=default_args,
+    description='Delete the offloaded XCom files of old DAG runs',
+    schedule_interval='@daily',
+    start_date=days_ago(1),
+    tags=['maintenance'],
+    catchup=False,
+) as dag:
+    
+    @task
+    def purge_xcom_files():
+        """Delete the run folders of offloaded XComs older than the retention period."""
+        return purge_offloaded_xcoms()
+    
+    purge_xcom_files()
@@ -1,5 +1,6 @@
 # File: tests/conftest.py
 import os
+import importlib
 import pytest
 import requests
 from dotenv import load_dotenv
@@ -81,4 +82,23 @@ def after_scenario(context, scenario):
         print(f"Transaction ID: {context.transaction_id}")
         print(f"Risk Score: {context.result.get('risk_score')}")
         print(f"Entities: {context.result.get('extracted_entities')}")
-        print(f"Evidence: {context.result.get('supporting_evidence')}")
\ No newline at end of file
+        print(f"Evidence: {context.result.get('supporting_evidence')}")
+
+
+@pytest.fixture(scope="session")
+def data_folders(tmp_path_factory):
+    """Point the DAG data folders at a temporary directory before DAG modules are imported."""
+    base = tmp_path_factory.mktemp("data")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        for name in ("TRANSACTION_FOLDER", "PROCESSED_FOLDER", "FAILED_FOLDER", "RESULTS_FOLDER",
+                     "SANCTION_DATA_FOLDER", "ENRICHMENT_CACHE_FOLDER", "XCOM_FOLDER"):
+            monkeypatch.setenv(name, str(base / name.lower()))
+        monkeypatch.setenv("PEP_DATA_FILE", str(base / "pep" / "pep_data.csv"))
+        yield base
+
+
+@pytest.fixture(scope="session")
+def dag_module(data_folders):
+    """Import a module of the DAGs by name, skipping the test if Airflow is not installed."""
+    pytest.importorskip("airflow")
+    return importlib.import_module
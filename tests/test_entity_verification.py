@@ -28,36 +28,71 @@ def sample_transaction_id():
     return "TEST-UNIT-001"
 
 
+@pytest.fixture(autouse=True)
+def isolated_data(tmp_path, monkeypatch):
+    """Answer every lookup from the mocked API and write results to a temporary folder."""
+    import diskcache
+    from dags.utils import data_enrichment, http_cache
+
+    cache = diskcache.Cache(str(tmp_path / "lookup_cache"))
+    monkeypatch.setattr(http_cache, "cache", cache)
+    monkeypatch.setattr(data_enrichment, "RESULTS_FOLDER", str(tmp_path / "results"))
+    yield
+    cache.close()
+
+
+def mock_json_response(payload):
+    """Create a mock response with a JSON body."""
+    response = MagicMock()
+    response.status_code = 200
+    response.raise_for_status = MagicMock()
+    response.json.return_value = payload
+    response.content = json.dumps(payload).encode("utf-8")
+    return response
+
+
+def mock_client(payload):
+    """Create a mock of the shared HTTP client answering every request with a JSON payload."""
+    client = MagicMock()
+    client.get.return_value = mock_json_response(payload)
+    client.post.return_value = mock_json_response(payload)
+    return client
+
+
+def mock_sanctions_client(results):
+    """Create a mock of the shared HTTP client matching every sanctions query with the given results."""
+    def post(url, json=None, **kwargs):
+        return mock_json_response({
+            "responses": {query_id: {"results": results} for query_id in json["queries"]}
+        })
+
+    client = MagicMock()
+    client.post.side_effect = post
+    return client
+
+
 @pytest.fixture
-def mock_response():
-    """Create a mock response for API calls."""
-    mock = MagicMock()
-    mock.status_code = 200
-    mock.raise_for_status = MagicMock()
-    mock.json = MagicMock(return_value={})
-    return mock
+def pep_data_file(tmp_path, monkeypatch):
+    """Write a small PEP list and point the PEP check at it."""
+    from dags.utils import data_enrichment
+
+    pep_file = tmp_path / "pep_data.csv"
+    pep_file.write_text(
+        "name,aliases\n"
+        f"{SAMPLE_PEP},Viktor F. Yanukovych\n"
+        "Angela Merkel,\n",
+        encoding="utf-8"
+    )
+    monkeypatch.setattr(data_enrichment, "PEP_DATA_FILE", str(pep_file))
+    return pep_file
 
 
 @pytest.mark.unit
 class TestPEPDetection:
     """Tests for PEP detection functionality."""
 
-    @patch("dags.utils.data_enrichment.open")
-    @patch("os.path.exists")
-    def test_check_pep_list_positive(
-        self, mock_exists, mock_open, sample_transaction_id
-    ):
+    def test_check_pep_list_positive(self, pep_data_file, sample_transaction_id):
         """Test PEP detection with a known PEP."""
-        # Setup mocks
-        mock_exists.return_value = True
-        mock_file = MagicMock()
-        mock_file.__enter__.return_value = mock_file
-        mock_file.__iter__.return_value = [
-            "name\tposition\tcountry\talias\n",
-            f"{SAMPLE_PEP}\tFormer President\tUkraine\tViktor F. Yanukovych\n",
-        ]
-        mock_open.return_value = mock_file
-
         # Execute
         result = check_pep_list(SAMPLE_PEP, transaction_id=sample_transaction_id)
 
@@ -71,22 +106,8 @@ class TestPEPDetection:
                 break
         assert match, "PEP should be found in the results"
 
-    @patch("dags.utils.data_enrichment.open")
-    @patch("os.path.exists")
-    def test_check_pep_list_negative(
-        self, mock_exists, mock_open, sample_transaction_id
-    ):
+    def test_check_pep_list_negative(self, pep_data_file, sample_transaction_id):
         """Test PEP detection with a non-PEP."""
-        # Setup mocks
-        mock_exists.return_value = True
-        mock_file = MagicMock()
-        mock_file.__enter__.return_value = mock_file
-        mock_file.__iter__.return_value = [
-            "name\tposition\tcountry\talias\n",
-            f"{SAMPLE_PEP}\tFormer President\tUkraine\tViktor F. Yanukovych\n",
-        ]
-        mock_open.return_value = mock_file
-
         # Execute
         result = check_pep_list("John Doe", transaction_id=sample_transaction_id)
 
@@ -99,32 +120,20 @@ class TestPEPDetection:
 class TestSanctionsDetection:
     """Tests for sanctions detection functionality."""
 
-    @patch("requests.Session")
-    def test_check_sanctions_positive(self, mock_session, sample_transaction_id):
+    @patch("dags.utils.data_enrichment.get_http_client")
+    def test_check_sanctions_positive(self, mock_get_client, sample_transaction_id):
         """Test sanctions detection with a sanctioned entity."""
         # Setup mock
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "responses": {
-                "q1": {
-                    "results": [
-                        {
-                            "schema": "Company",
-                            "id": "123",
-                            "caption": SAMPLE_ORG,
-                            "score": 0.9,
-                            "properties": {"name": SAMPLE_ORG},
-                            "datasets": ["OFAC"],
-                        }
-                    ]
-                }
+        mock_get_client.return_value = mock_sanctions_client([
+            {
+                "schema": "Company",
+                "id": "123",
+                "caption": SAMPLE_ORG,
+                "score": 0.9,
+                "properties": {"name": SAMPLE_ORG},
+                "datasets": ["OFAC"],
             }
-        }
-        mock_response.raise_for_status = MagicMock()
-
-        mock_session_instance = MagicMock()
-        mock_session_instance.post.return_value = mock_response
-        mock_session.return_value = mock_session_instance
+        ])
 
         # Execute
         result = check_sanctions(
@@ -136,17 +145,11 @@ class TestSanctionsDetection:
         assert len(result["data"]) > 0
         assert result["data"][0]["caption"] == SAMPLE_ORG
 
-    @patch("requests.Session")
-    def test_check_sanctions_negative(self, mock_session, sample_transaction_id):
+    @patch("dags.utils.data_enrichment.get_http_client")
+    def test_check_sanctions_negative(self, mock_get_client, sample_transaction_id):
         """Test sanctions detection with a non-sanctioned entity."""
         # Setup mock
-        mock_response = MagicMock()
-        mock_response.json.return_value = {"responses": {"q1": {"results": []}}}
-        mock_response.raise_for_status = MagicMock()
-
-        mock_session_instance = MagicMock()
-        mock_session_instance.post.return_value = mock_response
-        mock_session.return_value = mock_session_instance
+        mock_get_client.return_value = mock_sanctions_client([])
 
         # Execute
         result = check_sanctions(
@@ -162,13 +165,13 @@ class TestSanctionsDetection:
 class TestCorporateRegistry:
     """Tests for corporate registry lookup functionality."""
 
-    @patch("requests.get")
+    @patch("dags.utils.data_enrichment.get_http_client")
     def test_open_corporates_lookup_positive(
-        self, mock_get, mock_response, sample_transaction_id
+        self, mock_get_client, sample_transaction_id
     ):
         """Test corporate registry lookup with a known entity."""
         # Setup mock
-        mock_response.json.return_value = {
+        mock_get_client.return_value = mock_client({
             "results": {
                 "companies": [
                     {
@@ -183,8 +186,7 @@ class TestCorporateRegistry:
                     }
                 ]
             }
-        }
-        mock_get.return_value = mock_response
+        })
 
         # Execute
         result = get_open_corporates_data(
@@ -196,14 +198,13 @@ class TestCorporateRegistry:
         assert result["status"] == "success"
         assert result["data"]["name"] == SAMPLE_ORG
 
-    @patch("requests.get")
+    @patch("dags.utils.data_enrichment.get_http_client")
     def test_open_corporates_lookup_negative(
-        self, mock_get, mock_response, sample_transaction_id
+        self, mock_get_client, sample_transaction_id
     ):
         """Test corporate registry lookup with an unknown entity."""
         # Setup mock
-        mock_response.json.return_value = {"results": {"companies": []}}
-        mock_get.return_value = mock_response
+        mock_get_client.return_value = mock_client({"results": {"companies": []}})
 
         # Execute
         result = get_open_corporates_data(
@@ -0,0 +1,62 @@
+from collections import Counter
+
+import pytest
+
+
+@pytest.fixture
+def settings(dag_module, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEYS", "key-a, key-b,key-c")
+    return dag_module("dags.config.settings")
+
+
+@pytest.fixture
+def rotator(settings):
+    return settings.GeminiKeyRotator()
+
+
+@pytest.mark.unit
+class TestGeminiKeyRotator:
+    """Tests for the load balancing of Gemini API keys."""
+
+    def test_rotates_through_keys(self, rotator):
+        """Consecutive calls rotate through all keys before reusing one."""
+        assert [rotator.get_key() for _ in range(6)] == ["key-a", "key-b", "key-c"] * 2
+
+    def test_usage_is_balanced(self, rotator):
+        """Every key is handed out equally often."""
+        usage = Counter(rotator.get_key() for _ in range(300))
+        assert usage == {"key-a": 100, "key-b": 100, "key-c": 100}
+
+    def test_failed_key_is_penalized(self, rotator):
+        """A failed key is skipped until the other keys have caught up with its penalty."""
+        for _ in range(3):
+            rotator.get_key()
+        rotator.mark_key_failed("key-a")
+
+        keys = [rotator.get_key() for _ in range(20)]
+        assert "key-a" not in keys
+        assert Counter(keys) == {"key-b": 10, "key-c": 10}
+        assert rotator.get_key() == "key-a"
+
+    def test_unknown_failed_key_is_ignored(self, rotator):
+        """Marking a key that isn't configured doesn't affect the rotation."""
+        rotator.mark_key_failed("key-unknown")
+        assert [rotator.get_key() for _ in range(3)] == ["key-a", "key-b", "key-c"]
+
+    def test_single_key(self, settings, monkeypatch):
+        """GEMINI_API_KEY is used when no key list is configured."""
+        monkeypatch.delenv("GEMINI_API_KEYS", raising=False)
+        monkeypatch.setenv("GEMINI_API_KEY", "only-key")
+
+        rotator = settings.GeminiKeyRotator()
+        rotator.mark_key_failed("only-key")
+        assert rotator.get_key() == "only-key"
+        assert rotator.get_key_count() == 1
+
+    def test_no_keys(self, settings, monkeypatch):
+        """A missing key configuration is reported when the rotator is created."""
+        monkeypatch.delenv("GEMINI_API_KEYS", raising=False)
+        monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+
+        with pytest.raises(ValueError):
+            settings.GeminiKeyRotator()
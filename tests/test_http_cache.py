@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+
+@pytest.fixture
+def http_cache(dag_module, tmp_path, monkeypatch):
+    import diskcache
+
+    http_cache = dag_module("dags.utils.http_cache")
+    cache = diskcache.Cache(str(tmp_path / "lookup_cache"))
+    monkeypatch.setattr(http_cache, "cache", cache)
+    yield http_cache
+    cache.close()
+
+
+@pytest.mark.unit
+class TestCachedLookup:
+    """Tests for the persistent cache of enrichment API lookups."""
+
+    def test_case_and_whitespace_variants_share_an_entry(self, http_cache):
+        """Lookups differing only in case and whitespace hit the same cache entry."""
+        calls = []
+
+        @http_cache.cached_lookup("test_api")
+        def lookup(name):
+            calls.append(name)
+            return {"name": name}
+
+        assert lookup("Acme  Corp") == {"name": "Acme  Corp"}
+        assert lookup("acme corp") == {"name": "Acme  Corp"}
+        assert lookup(" ACME CORP\t") == {"name": "Acme  Corp"}
+        assert calls == ["Acme  Corp"]
+        assert lookup.is_cached("ACME corp")
+
+    def test_distinct_arguments_and_apis_are_cached_separately(self, http_cache):
+        """The key covers the API name and every argument, not only the first one."""
+        calls = []
+
+        @http_cache.cached_lookup("test_api")
+        def lookup(name, jurisdiction):
+            calls.append((name, jurisdiction))
+            return len(calls)
+
+        @http_cache.cached_lookup("other_api")
+        def other_lookup(name, jurisdiction):
+            return "other"
+
+        assert lookup("Acme", "gb") == 1
+        assert lookup("Acme", "us") == 2
+        assert lookup("acme", "GB") == 1
+        assert other_lookup("Acme", "gb") == "other"
+        assert len(calls) == 2
+
+    def test_none_results_are_cached(self, http_cache):
+        """None is a valid result and must not be mistaken for a miss."""
+        calls = []
+
+        @http_cache.cached_lookup("test_api")
+        def lookup(name):
+            calls.append(name)
+            return None
+
+        assert lookup("nobody") is None
+        assert lookup("nobody") is None
+        assert calls == ["nobody"]
+
+    def test_exceptions_are_not_cached(self, http_cache):
+        """A failed lookup is retried on the next call."""
+        calls = []
+
+        @http_cache.cached_lookup("test_api")
+        def lookup(name):
+            calls.append(name)
+            if len(calls) == 1:
+                raise RuntimeError("API unavailable")
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            lookup("Acme")
+        assert lookup("Acme") == "ok"
+        assert lookup("Acme") == "ok"
+        assert len(calls) == 2
+
+    def test_entries_expire_after_ttl(self, http_cache):
+        """Results are fetched again once their time-to-live has passed."""
+        calls = []
+
+        @http_cache.cached_lookup("test_api", expire=0.2)
+        def lookup(name):
+            calls.append(name)
+            return len(calls)
+
+        assert lookup("Acme") == 1
+        assert lookup("Acme") == 1
+
+        time.sleep(0.3)
+        assert not lookup.is_cached("Acme")
+        assert lookup("Acme") == 2
+
+    def test_prime_stores_a_result(self, http_cache):
+        """Results primed from a batched request are served without calling the lookup."""
+        @http_cache.cached_lookup("test_api")
+        def lookup(name):
+            raise AssertionError("lookup should not be called")
+
+        lookup.prime(("Acme Corp",), {"id": 1})
+        assert lookup("acme corp") == {"id": 1}
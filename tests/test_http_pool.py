@@ -0,0 +1,102 @@
+import httpx
+import pytest
+
+
+@pytest.fixture
+def http_pool(dag_module):
+    return dag_module("dags.utils.http_pool")
+
+
+@pytest.fixture
+def sleeps(http_pool, monkeypatch):
+    """Record the retry delays instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(http_pool.time, "sleep", delays.append)
+    return delays
+
+
+def scripted_responses(monkeypatch, responses):
+    """Answer the requests of the underlying transport with the given responses in order."""
+    requests = []
+
+    def handle_request(self, request):
+        requests.append(request)
+        return responses[len(requests) - 1]
+
+    monkeypatch.setattr(httpx.HTTPTransport, "handle_request", handle_request)
+    return requests
+
+
+@pytest.mark.unit
+class TestRetryTransport:
+    """Tests for the retries of transient error responses."""
+
+    def test_retries_server_errors_with_exponential_backoff(self, http_pool, sleeps, monkeypatch):
+        """5xx responses are retried with doubling delays until a request succeeds."""
+        requests = scripted_responses(monkeypatch, [
+            httpx.Response(503),
+            httpx.Response(502),
+            httpx.Response(500),
+            httpx.Response(200, json={"ok": True}),
+        ])
+        transport = http_pool.RetryTransport(max_retries=5, backoff_factor=0.5)
+
+        with httpx.Client(transport=transport) as client:
+            response = client.get("https://api.example.com/search")
+
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
+        assert len(requests) == 4
+        assert sleeps == [0.5, 1.0, 2.0]
+
+    def test_backoff_is_capped(self, http_pool, sleeps, monkeypatch):
+        """The exponential delay never exceeds max_backoff."""
+        scripted_responses(monkeypatch, [httpx.Response(504)] * 4 + [httpx.Response(200)])
+        transport = http_pool.RetryTransport(max_retries=5, backoff_factor=1.0, max_backoff=3.0)
+
+        with httpx.Client(transport=transport) as client:
+            client.get("https://api.example.com/search")
+
+        assert sleeps == [1.0, 2.0, 3.0, 3.0]
+
+    def test_honours_retry_after(self, http_pool, sleeps, monkeypatch):
+        """Rate limited responses wait as long as Retry-After asks, within max_backoff."""
+        scripted_responses(monkeypatch, [
+            httpx.Response(429, headers={"Retry-After": "7"}),
+            httpx.Response(429, headers={"Retry-After": "120"}),
+            httpx.Response(503, headers={"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}),
+            httpx.Response(200),
+        ])
+        transport = http_pool.RetryTransport(max_retries=5, backoff_factor=0.5, max_backoff=30.0)
+
+        with httpx.Client(transport=transport) as client:
+            response = client.get("https://api.example.com/search")
+
+        assert response.status_code == 200
+        # An HTTP-date Retry-After falls back to the exponential backoff of the attempt
+        assert sleeps == [7.0, 30.0, 2.0]
+
+    def test_returns_last_response_when_retries_are_exhausted(self, http_pool, sleeps, monkeypatch):
+        """After max_retries the transient response is returned to the caller."""
+        requests = scripted_responses(monkeypatch, [httpx.Response(503)] * 3)
+        transport = http_pool.RetryTransport(max_retries=2, backoff_factor=0.1)
+
+        with httpx.Client(transport=transport) as client:
+            response = client.get("https://api.example.com/search")
+
+        assert response.status_code == 503
+        assert len(requests) == 3
+        assert len(sleeps) == 2
+
+    @pytest.mark.parametrize("status_code", [200, 400, 404, 501])
+    def test_other_statuses_are_not_retried(self, http_pool, sleeps, monkeypatch, status_code):
+        """Successful responses and permanent errors are returned immediately."""
+        requests = scripted_responses(monkeypatch, [httpx.Response(status_code)])
+        transport = http_pool.RetryTransport(max_retries=5)
+
+        with httpx.Client(transport=transport) as client:
+            response = client.get("https://api.example.com/search")
+
+        assert response.status_code == status_code
+        assert len(requests) == 1
+        assert sleeps == []
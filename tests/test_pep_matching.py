@@ -0,0 +1,55 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def data_enrichment(dag_module):
+    return dag_module("dags.utils.data_enrichment")
+
+
+@pytest.mark.unit
+class TestPepMatching:
+    """Tests for the fuzzy matching of names against the PEP list."""
+
+    @pytest.mark.parametrize("name, pep_name", [
+        ("john brown", "john"),
+        ("john", "john brown"),
+        ("maria garcia", "garcia"),
+        ("garcia", "maria garcia"),
+    ])
+    def test_single_word_subset_does_not_match(self, data_enrichment, name, pep_name):
+        """A single word name must not match every name containing that word."""
+        score = data_enrichment._pep_name_score(name, pep_name)
+        assert score < data_enrichment.PEP_MATCH_THRESHOLD
+
+    @pytest.mark.parametrize("name, pep_name", [
+        ("john brown", "john brown"),
+        ("john brown", "brown john"),
+        ("john brown", "john michael brown"),
+        ("john brown", "jon brown"),
+        ("garcia", "garcia"),
+    ])
+    def test_close_names_match(self, data_enrichment, name, pep_name):
+        """Reordered, slightly misspelled or middle-named variants still match."""
+        score = data_enrichment._pep_name_score(name, pep_name)
+        assert score >= data_enrichment.PEP_MATCH_THRESHOLD
+
+    def test_check_pep_list(self, data_enrichment, data_folders, monkeypatch):
+        """Only rows whose name or an alias matches the whole search name are returned."""
+        pep_file = data_folders / "pep_matching.csv"
+        pep_file.write_text(
+            "id,name,aliases\n"
+            "1,John Brown,\n"
+            "2,Johnny Walker,John\n"
+            "3,Maria Garcia,\n"
+            "4,Ana Lopez,Garcia\n",
+            encoding="utf-8"
+        )
+        monkeypatch.setattr(data_enrichment, "PEP_DATA_FILE", str(pep_file))
+        monkeypatch.setattr(data_enrichment, "RESULTS_FOLDER", str(data_folders / "results"))
+
+        result = data_enrichment.check_pep_list("John Brown", transaction_id="txn_pep_test")
+        assert result["status"] == "success"
+        assert [row["id"] for row in result["data"]] == ["1"]
+
+        result = data_enrichment.check_pep_list("Garcia", transaction_id="txn_pep_test")
+        assert [row["id"] for row in result["data"]] == ["4"]
@@ -0,0 +1,79 @@
+import pytest
+
+from api.utils.transaction_index import TransactionIndex, encode_cursor, decode_cursor
+
+
+@pytest.fixture
+def transaction_index(tmp_path):
+    index = TransactionIndex(str(tmp_path / "index.sqlite3"))
+    index.initialize()
+    # Several transactions share a timestamp, so pages must be ordered by ID as well
+    index.rebuild([
+        {"transaction_id": f"TXN-{i:03d}", "timestamp": f"2024-01-{1 + i // 3:02d}T00:00:00",
+         "status": "completed" if i % 2 else "processing", "risk_score": i / 20, "entities_count": i}
+        for i in range(20)
+    ])
+    return index
+
+
+def read_all_pages(index, page_size, **filters):
+    """Read every page of the default order by following the cursors."""
+    pages = []
+    after = None
+    while True:
+        page = index.query_transactions(limit=page_size, after=after, **filters)
+        if not page:
+            return pages
+        pages.append(page)
+        after = decode_cursor(encode_cursor(page[-1]))
+
+
+@pytest.mark.unit
+class TestTransactionIndexPagination:
+    """Tests for the keyset pagination of the transaction index."""
+
+    @pytest.mark.parametrize("page_size", [1, 3, 7, 20, 50])
+    def test_pages_cover_every_transaction_once(self, transaction_index, page_size):
+        """Following the cursors yields the same rows as one unpaginated query."""
+        expected = transaction_index.query_transactions(limit=100)
+        pages = read_all_pages(transaction_index, page_size)
+
+        rows = [row for page in pages for row in page]
+        assert rows == expected
+        assert len({row["transaction_id"] for row in rows}) == 20
+        assert all(len(page) <= page_size for page in pages)
+
+    def test_default_order_is_newest_first(self, transaction_index):
+        """Pages are ordered by timestamp, then transaction ID, descending."""
+        rows = transaction_index.query_transactions(limit=100)
+        keys = [(row["timestamp"], row["transaction_id"]) for row in rows]
+        assert keys == sorted(keys, reverse=True)
+
+    def test_pages_with_status_filter(self, transaction_index):
+        """The cursor combines with the status filter."""
+        pages = read_all_pages(transaction_index, 4, status="completed")
+
+        rows = [row for page in pages for row in page]
+        assert [row["transaction_id"] for row in rows] == [f"TXN-{i:03d}" for i in range(19, 0, -2)]
+
+    def test_rows_inserted_before_the_cursor_do_not_shift_pages(self, transaction_index):
+        """Unlike offsets, a cursor isn't affected by transactions added after the first page."""
+        first_page = transaction_index.query_transactions(limit=5)
+        transaction_index.upsert("TXN-NEW", timestamp="2024-02-01T00:00:00", status="triggered")
+
+        second_page = transaction_index.query_transactions(
+            limit=5, after=decode_cursor(encode_cursor(first_page[-1]))
+        )
+
+        assert second_page == transaction_index.query_transactions(limit=5, offset=6)
+
+    def test_cursor_requires_default_order(self, transaction_index):
+        """Cursors are rejected with an explicit sort column."""
+        with pytest.raises(ValueError):
+            transaction_index.query_transactions(sort_by="risk_score", after=("2024-01-01T00:00:00", "TXN-001"))
+
+    @pytest.mark.parametrize("cursor", ["", "not a cursor", encode_cursor({"timestamp": 1, "transaction_id": "x"})])
+    def test_malformed_cursor(self, cursor):
+        """Malformed cursors raise ValueError."""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
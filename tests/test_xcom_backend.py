@@ -0,0 +1,96 @@
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def xcom_backend(dag_module, tmp_path, monkeypatch):
+    xcom_backend = dag_module("dags.utils.xcom_backend")
+    monkeypatch.setattr(xcom_backend, "XCOM_FOLDER", str(tmp_path / "xcom"))
+    monkeypatch.setattr(xcom_backend, "XCOM_OFFLOAD_THRESHOLD", 1024)
+    return xcom_backend
+
+
+def push(xcom_backend, value, run_id="manual__2024-01-01T00:00:00+00:00"):
+    """Serialize a value as the return value of a task."""
+    return xcom_backend.FileXComBackend.serialize_value(
+        value, key="return_value", task_id="enrich_entities", dag_id="aml_processing", run_id=run_id
+    )
+
+
+def pull(xcom_backend, stored):
+    """Deserialize a value as read back from the XCom table."""
+    return xcom_backend.FileXComBackend.deserialize_value(SimpleNamespace(value=stored))
+
+
+def offloaded_files(xcom_backend):
+    """List the files offloaded to the XCom folder."""
+    return sorted(Path(xcom_backend.XCOM_FOLDER).rglob("*.json"))
+
+
+@pytest.mark.unit
+class TestFileXComBackend:
+    """Tests for the offloading of large XCom values to files."""
+
+    def test_large_value_round_trip(self, xcom_backend):
+        """Values above the threshold are stored as a file reference and read back unchanged."""
+        value = {
+            "organizations": [{"name": f"Company {i}", "score": i / 10, "sanctioned": i % 2 == 0}
+                              for i in range(100)],
+            "people": None,
+            "note": "Ünïcode ✓",
+        }
+
+        stored = push(xcom_backend, value)
+
+        assert xcom_backend.XCOM_FILE_PREFIX.encode() in stored
+        files = offloaded_files(xcom_backend)
+        assert len(files) == 1
+        assert files[0].name == "enrich_entities_return_value.json"
+        assert pull(xcom_backend, stored) == value
+
+    def test_small_value_is_not_offloaded(self, xcom_backend):
+        """Values below the threshold stay in the XCom table."""
+        stored = push(xcom_backend, {"status": "ok"})
+
+        assert xcom_backend.XCOM_FILE_PREFIX.encode() not in stored
+        assert offloaded_files(xcom_backend) == []
+        assert pull(xcom_backend, stored) == {"status": "ok"}
+
+    def test_non_json_native_value_is_not_offloaded(self, xcom_backend):
+        """Values that wouldn't read back as the same types are left to the default serialization."""
+        value = {"timestamps": [datetime(2024, 1, 1).isoformat()] * 100, "at": datetime(2024, 1, 1)}
+
+        push(xcom_backend, value)
+
+        assert offloaded_files(xcom_backend) == []
+
+    def test_run_identifiers_are_safe_path_parts(self, xcom_backend):
+        """Run IDs containing separators can't escape the XCom folder."""
+        stored = push(xcom_backend, ["x" * 2048], run_id="../../etc/run:1")
+
+        files = offloaded_files(xcom_backend)
+        assert [file.parent.name for file in files] == [".._.._etc_run_1"]
+        assert files[0].is_relative_to(xcom_backend.XCOM_FOLDER)
+        assert pull(xcom_backend, stored) == ["x" * 2048]
+
+    def test_purge_deletes_old_runs(self, xcom_backend):
+        """Run folders older than the retention period are deleted, newer ones are kept."""
+        push(xcom_backend, ["x" * 2048], run_id="old_run")
+        push(xcom_backend, ["x" * 2048], run_id="new_run")
+
+        dag_folder = Path(xcom_backend.XCOM_FOLDER) / "aml_processing"
+        old_time = time.time() - 10 * 24 * 3600
+        os.utime(dag_folder / "old_run", (old_time, old_time))
+
+        assert xcom_backend.purge_offloaded_xcoms(max_age_days=7) == 1
+        assert not (dag_folder / "old_run").exists()
+        assert (dag_folder / "new_run").exists()
+
+    def test_purge_without_folder(self, xcom_backend):
+        """Purging before anything was offloaded is a no-op."""
+        assert xcom_backend.purge_offloaded_xcoms() == 0